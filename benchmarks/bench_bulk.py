@@ -0,0 +1,99 @@
+"""Bulk header download: one sequential cursor walk per chain against `BulkDownloader`.
+
+    python -m benchmarks.bench_bulk
+    python -m benchmarks.bench_bulk --height 20000 --latency 0.01 --concurrency 4 16 64
+
+The simulated node runs in a child process with the given per-request latency, so the timings show how much of the round trip time the concurrent shards hide.
+"""
+
+import argparse
+import sys
+import time
+from typing import List
+
+from benchmarks.simnode import SimulatedNodeProcess
+
+
+def sequential(headers, chains: int, height: int, limit: int) -> int:
+    count = 0
+    for chain in range(chains):
+        page = headers.get_block_headers(
+            chain, limit=limit, minheight=0, maxheight=height - 1
+        )
+        count += len(page["items"])
+        while page["next"]:
+            page = headers.get_block_headers(
+                chain,
+                limit=limit,
+                next=page["next"],
+                minheight=0,
+                maxheight=height - 1,
+            )
+            count += len(page["items"])
+    return count
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chains", type=int, default=10, choices=(10, 20))
+    parser.add_argument("--height", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 8, 32]
+    )
+    parser.add_argument(
+        "--schema", default="object", choices=("object", "records")
+    )
+    args = parser.parse_args(argv)
+
+    from chainwebpy.bulk import BulkDownloader
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+
+    with SimulatedNodeProcess(
+        chains=args.chains,
+        height=args.height,
+        latency=args.latency,
+        page_limit=args.limit,
+        warm=True,
+    ) as node:
+        headers = BlockHeaderEndpoints(node.api())
+        total = args.chains * args.height
+
+        print(
+            f"{'downloader':<24}{'seconds':>10}{'headers/s':>12}{'steals':>8}"
+        )
+        started = time.perf_counter()
+        count = sequential(headers, args.chains, args.height, args.limit)
+        seconds = time.perf_counter() - started
+        assert count == total
+        print(f"{'sequential':<24}{seconds:>10.2f}{count / seconds:>12.0f}")
+
+        for concurrency in args.concurrency:
+            dl = BulkDownloader(
+                headers,
+                concurrency=concurrency,
+                shard_size=args.shard_size,
+                limit=args.limit,
+                responseSchema=args.schema,
+            )
+            stats = dl.run(
+                lambda chain, items: None,
+                range(args.chains),
+                0,
+                args.height - 1,
+            )
+            assert stats.items == total
+            name = f"bulk concurrency={concurrency}"
+            print(
+                f"{name:<24}{stats.seconds:>10.2f}"
+                f"{stats.items / stats.seconds:>12.0f}{stats.steals:>8}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+"""Throughput, latency and memory benchmarks of the endpoint classes against a local simulated Chainweb node.
+
+    python -m benchmarks.bench_endpoints
+    python -m benchmarks.bench_endpoints --concurrency 1 8 --latency 0.002 --json results.json
+    python -m benchmarks.bench_endpoints --compare results.json
+
+With `--compare`, the run fails (exit status 1) if the throughput of a workload dropped, or its p50 latency or peak memory grew, by more than `--tolerance`.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from benchmarks.simnode import SimulatedNode, SimulatedNodeProcess
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    if not values:
+        return float("nan")
+    index = max(0, min(len(values) - 1, int(round(q / 100 * len(values))) - 1))
+    return values[index]
+
+
+class Context:
+    """Endpoint objects and sample data shared by the workloads."""
+
+    def __init__(self, node, transport=None):
+        from chainwebpy.chainweb_p2p.block_hashes_endpoints import (
+            BlockHashesEndpoints,
+        )
+        from chainwebpy.chainweb_p2p.block_header_endpoints import (
+            BlockHeaderEndpoints,
+        )
+        from chainwebpy.chainweb_p2p.block_payload_endpoints import (
+            BlockPayloadEndpoints,
+        )
+        from chainwebpy.chainweb_p2p.config_endpoints import ConfigEndpoints
+        from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+        from chainwebpy.chainweb_p2p.mempool_endpoints import MempoolEndpoints
+        from chainwebpy.chainweb_p2p.peer_endpoints import PeerEndpoints
+        from chainwebpy.chainweb_service.miscellaneous_endpoints import (
+            MiscellaneousEndpoints,
+        )
+        from chainwebpy.transport import Transport
+
+        api = node.api()
+        self.node = node
+        self.transport = transport if transport is not None else Transport()
+        self.cut = CutEndpoints(api, self.transport)
+        self.config = ConfigEndpoints(api, self.transport)
+        self.hashes = BlockHashesEndpoints(api, self.transport)
+        self.headers = BlockHeaderEndpoints(api, self.transport)
+        self.payloads = BlockPayloadEndpoints(api, self.transport)
+        self.mempool = MempoolEndpoints(api, self.transport)
+        self.peers = PeerEndpoints(api, self.transport)
+        self.misc = MiscellaneousEndpoints(api, self.transport)
+        self.api = api
+
+        data = node.data
+        self.chains = data.chains
+        self.tip = min(data.tips.values())
+        self.random = random.Random(0)
+        self.block_hashes = {
+            c: [data.block_hash(c, h) for h in range(self.tip + 1)]
+            for c in range(self.chains)
+        }
+        self.payload_hashes = {
+            c: [data.header(c, h)["payloadHash"] for h in range(self.tip + 1)]
+            for c in range(self.chains)
+        }
+        self.pending = {
+            c: [tx["hash"] for tx in data.pending(c)[:10]]
+            for c in range(self.chains)
+        }
+
+    def chain(self) -> int:
+        return self.random.randrange(self.chains)
+
+    def height(self) -> int:
+        return self.random.randrange(self.tip + 1)
+
+
+def _walk_headers(ctx: Context):
+    page = ctx.headers.get_block_headers(ctx.chain(), limit=100)
+    count = len(page["items"])
+    chain = page["items"][0]["chainId"]
+    while page["next"]:
+        page = ctx.headers.get_block_headers(
+            chain, limit=100, next=page["next"]
+        )
+        count += len(page["items"])
+    return count
+
+
+def _header_stream(ctx: Context, events: int = 100):
+    from chainwebpy.transport import Request
+
+    request = Request(
+        "blocks_event_stream",
+        "GET",
+        ctx.api.endpoint + "/header/updates",
+        params={"limit": events},
+        stream=True,
+    )
+    r = ctx.transport.send(request)
+    blocks = -(-events // ctx.chains)
+    threading.Thread(target=ctx.node.advance, kwargs={"blocks": blocks}).start()
+    received = 0
+    for line in r.iter_lines():
+        if line.startswith(b"data:"):
+            json.loads(line[5:])
+            received += 1
+    r.close()
+    return received
+
+
+def _batch(hashes: List[str], ctx: Context, size: int = 20) -> List[str]:
+    start = ctx.random.randrange(max(1, len(hashes) - size))
+    return hashes[start : start + size]
+
+
+WORKLOADS: Dict[str, Callable[[Context], object]] = {
+    "cut": lambda ctx: ctx.cut.get_current_cut(),
+    "cut/maxheight": lambda ctx: ctx.cut.get_current_cut(
+        maxheight=ctx.tip * ctx.chains // 2
+    ),
+    "config": lambda ctx: ctx.config.get_config(),
+    "info": lambda ctx: ctx.misc.general_node_info(),
+    "hashes/page": lambda ctx: ctx.hashes.get_block_hashes(
+        ctx.chain(), limit=100, minheight=ctx.height()
+    ),
+    "hashes/branch": lambda ctx: ctx.hashes.get_block_hash_branches(
+        0, lower=[], upper=[ctx.block_hashes[0][ctx.height()]], limit=100
+    ),
+    "headers/page": lambda ctx: ctx.headers.get_block_headers(
+        ctx.chain(), limit=100, minheight=ctx.height()
+    ),
+    "headers/page-base64url": lambda ctx: ctx.headers.get_block_headers(
+        ctx.chain(),
+        limit=100,
+        minheight=ctx.height(),
+        responseSchema="base64url",
+    ),
+    "headers/page-records": lambda ctx: ctx.headers.get_block_headers(
+        ctx.chain(), limit=100, minheight=ctx.height(), responseSchema="records"
+    ),
+    "headers/page-array": lambda ctx: ctx.headers.get_block_headers(
+        ctx.chain(), limit=100, minheight=ctx.height(), responseSchema="array"
+    ),
+    "headers/page-stream": lambda ctx: sum(
+        1
+        for _ in ctx.headers.get_block_headers(
+            ctx.chain(), limit=100, minheight=ctx.height(), stream=True
+        )
+    ),
+    "headers/walk": _walk_headers,
+    "headers/by-hash": lambda ctx: ctx.headers.get_block_headers_by_hash(
+        0, ctx.block_hashes[0][ctx.height()]
+    ),
+    "headers/by-hash-binary": lambda ctx: ctx.headers.get_block_headers_by_hash(
+        0, ctx.block_hashes[0][ctx.height()], responseSchema="binary"
+    ),
+    "headers/branch": lambda ctx: ctx.headers.get_block_header_branches(
+        0, lower=[], upper=[ctx.block_hashes[0][ctx.height()]], limit=100
+    ),
+    "headers/stream": _header_stream,
+    "payload": lambda ctx: ctx.payloads.get_block_payload(
+        0, ctx.payload_hashes[0][ctx.height()]
+    ),
+    "payload/outputs": lambda ctx: ctx.payloads.get_block_payload_with_outputs(
+        0, ctx.payload_hashes[0][ctx.height()]
+    ),
+    "payload/batch": lambda ctx: ctx.payloads.get_batch_of_block_payload(
+        0, _batch(ctx.payload_hashes[0], ctx)
+    ),
+    "payload/outputs/batch": lambda ctx: ctx.payloads.get_batch_of_block_payload_with_outputs(
+        0, _batch(ctx.payload_hashes[0], ctx)
+    ),
+    "payload/outputs/batch-stream": lambda ctx: sum(
+        1
+        for _ in ctx.payloads.get_batch_of_block_payload_with_outputs(
+            0, _batch(ctx.payload_hashes[0], ctx), stream=True
+        )
+    ),
+    "mempool/pending": lambda ctx: ctx.mempool.get_pending_transactions_from_the_mempool(
+        ctx.chain()
+    ),
+    "mempool/member": lambda ctx: ctx.mempool.check_for_pending_transactions_in_the_mempool(
+        1, ctx.pending[1]
+    ),
+    "mempool/lookup": lambda ctx: ctx.mempool.lookup_pending_transactions_in_the_mempool(
+        1, ctx.pending[1]
+    ),
+    "peers/cut": lambda ctx: ctx.peers.get_cut_network_peer_info(limit=50),
+    "peers/mempool": lambda ctx: ctx.peers.get_chain_mempool_network_peer_info(
+        ctx.chain(), limit=50
+    ),
+}
+
+SEQUENTIAL_WORKLOADS = {"headers/stream"}
+
+
+class Result:
+    """Measurements of one workload at one concurrency level."""
+
+    def __init__(self, workload: str, concurrency: int):
+        self.workload = workload
+        self.concurrency = concurrency
+        self.operations = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.latencies: List[float] = []
+        self.peak_memory = 0
+        self.allocated_per_op = 0
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "workload": self.workload,
+            "concurrency": self.concurrency,
+            "operations": self.operations,
+            "errors": self.errors,
+            "throughput": self.throughput,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p90_ms": percentile(latencies, 90) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": (latencies[-1] if latencies else float("nan")) * 1000,
+            "peak_memory": self.peak_memory,
+            "allocated_per_op": self.allocated_per_op,
+        }
+
+
+def run_workload(
+    ctx: Context,
+    name: str,
+    iterations: int,
+    concurrency: int,
+    memory_iterations: int = 10,
+) -> Result:
+    """Run a workload `iterations` times on `concurrency` threads and measure it."""
+    fn = WORKLOADS[name]
+    result = Result(name, concurrency)
+    lock = threading.Lock()
+
+    def once(_):
+        start = time.perf_counter()
+        try:
+            fn(ctx)
+        except Exception:
+            with lock:
+                result.errors += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            result.latencies.append(elapsed)
+
+    fn(ctx)
+    start = time.perf_counter()
+    if concurrency == 1:
+        for i in range(iterations):
+            once(i)
+    else:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(once, range(iterations)))
+    result.seconds = time.perf_counter() - start
+    result.operations = len(result.latencies)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        allocated = 0
+        for _ in range(memory_iterations):
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                value = fn(ctx)
+            except Exception:
+                value = None
+            allocated += max(0, tracemalloc.get_traced_memory()[0] - before)
+            del value
+        result.peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+        result.allocated_per_op = allocated // max(1, memory_iterations)
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def format_table(results: List[Result]) -> str:
+    header = (
+        f"{'workload':<24}{'conc':>5}{'ops/s':>10}{'p50 ms':>9}{'p90 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}{'errors':>7}{'peak KiB':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        d = result.as_dict()
+        lines.append(
+            f"{d['workload']:<24}{d['concurrency']:>5}{d['throughput']:>10.1f}"
+            f"{d['p50_ms']:>9.2f}{d['p90_ms']:>9.2f}{d['p99_ms']:>9.2f}"
+            f"{d['max_ms']:>9.2f}{d['errors']:>7}{d['peak_memory'] / 1024:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(
+    results: List[dict], baseline: List[dict], tolerance: float
+) -> List[str]:
+    """Return a description of every regression of `results` against `baseline`."""
+    previous = {(r["workload"], r["concurrency"]): r for r in baseline}
+    regressions = []
+    for current in results:
+        old = previous.get((current["workload"], current["concurrency"]))
+        if old is None:
+            continue
+        label = f"{current['workload']} (concurrency {current['concurrency']})"
+        if current["throughput"] < old["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: throughput {old['throughput']:.1f} -> {current['throughput']:.1f} ops/s"
+            )
+        if current["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{label}: p50 {old['p50_ms']:.2f} -> {current['p50_ms']:.2f} ms"
+            )
+        if current["peak_memory"] > max(
+            old["peak_memory"] * (1 + tolerance), 64 * 1024
+        ):
+            regressions.append(
+                f"{label}: peak memory {old['peak_memory']} -> {current['peak_memory']} bytes"
+            )
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chains", type=int, default=20, choices=(10, 20))
+    parser.add_argument("--height", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--workloads",
+        nargs="+",
+        default=None,
+        help="Only run workloads whose name contains one of these strings.",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run the simulated node in this process. Its allocations are then measured too.",
+    )
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--compare", help="Compare with results of this file.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    names = [
+        n
+        for n in WORKLOADS
+        if args.workloads is None or any(w in n for w in args.workloads)
+    ]
+    results = []
+    node_class = SimulatedNode if args.in_process else SimulatedNodeProcess
+    with node_class(
+        chains=args.chains,
+        height=args.height,
+        latency=args.latency,
+        jitter=args.jitter,
+        fault_rate=args.fault_rate,
+        warm=True,
+    ) as node:
+        ctx = Context(node)
+        for name in names:
+            for concurrency in args.concurrency:
+                if concurrency > 1 and name in SEQUENTIAL_WORKLOADS:
+                    continue
+                iterations = args.iterations
+                if name in ("headers/walk", "headers/stream"):
+                    iterations = max(1, iterations // 20)
+                results.append(run_workload(ctx, name, iterations, concurrency))
+                print(format_table(results[-1:]).splitlines()[-1], flush=True)
+
+    print()
+    print(format_table(results))
+    dicts = [r.as_dict() for r in results]
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dicts, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(dicts, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Many small concurrent requests to one node over HTTP/1.1 and HTTP/2.
+
+    python -m benchmarks.bench_http2
+    python -m benchmarks.bench_http2 --latency 0.01 --concurrency 8 64 --requests 4000
+
+Every request is a per-chain header lookup or a mempool membership check. The HTTP/1.1 path is the default `Transport` against a `SimulatedNode`; the HTTP/2 path is `HTTP2Transport` against a `SimulatedH2Node`, which multiplexes the requests over one connection. Requires httpx and h2.
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from benchmarks.bench_endpoints import percentile
+from benchmarks.simnode import SimulatedH2Node, SimulatedNode
+
+
+def run(node, transport, concurrency: int, requests: int) -> dict:
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.mempool_endpoints import MempoolEndpoints
+
+    api = node.api()
+    headers = BlockHeaderEndpoints(api, transport, validate=False)
+    mempool = MempoolEndpoints(api, transport, validate=False)
+    data = node.data
+    rnd = random.Random(0)
+    calls = []
+    for i in range(requests):
+        chain = rnd.randrange(data.chains)
+        if i % 4 == 3:
+            keys = [tx["hash"] for tx in data.pending(chain)[:2]]
+            calls.append(
+                (
+                    mempool.check_for_pending_transactions_in_the_mempool,
+                    chain,
+                    keys,
+                )
+            )
+        else:
+            block = data.block_hash(chain, rnd.randrange(data.tips[chain]))
+            calls.append((headers.get_block_headers_by_hash, chain, block))
+
+    def call(args):
+        fn, chain, arg = args
+        started = time.perf_counter()
+        fn(chain, arg)
+        return time.perf_counter() - started
+
+    node.reset_counters()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = sorted(pool.map(call, calls))
+    seconds = time.perf_counter() - started
+    return {
+        "rps": requests / seconds,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "connections": node.connections,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 16, 64]
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        import h2  # noqa: F401
+        import httpx  # noqa: F401
+    except ImportError:
+        print("httpx and h2 are required: pip install chainweb.py[http2]")
+        return 1
+
+    from chainwebpy.http2 import HTTP2Transport
+    from chainwebpy.transport import Transport
+
+    settings = dict(chains=10, height=500, latency=args.latency, warm=True)
+    print(
+        f"{'transport':<12}{'concurrency':>12}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'connections':>13}"
+    )
+    for name, node_class, transport_class in (
+        ("HTTP/1.1", SimulatedNode, Transport),
+        ("HTTP/2", SimulatedH2Node, lambda: HTTP2Transport(http1=False)),
+    ):
+        with node_class(**settings) as node:
+            for concurrency in args.concurrency:
+                result = run(
+                    node, transport_class(), concurrency, args.requests
+                )
+                print(
+                    f"{name:<12}{concurrency:>12}{result['rps']:>10.0f}"
+                    f"{result['p50']:>10.2f}{result['p99']:>10.2f}"
+                    f"{result['connections']:>13}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
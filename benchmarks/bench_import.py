@@ -0,0 +1,117 @@
+"""Cold start benchmark: time to import chainwebpy and make the first call, each run in a fresh interpreter.
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --runs 30 --json import.json
+
+Every scenario runs `--runs` times in a new `python` process against a local simulated node, and the median and minimum are reported. Byte-code is compiled before the first run, so compile time is not measured.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.simnode import SimulatedNodeProcess
+
+_PRELUDE = """
+import time
+started = time.perf_counter()
+"""
+
+_REPORT = """
+print(time.perf_counter() - started)
+"""
+
+SCENARIOS = {
+    "import chainwebpy": """
+import chainwebpy
+""",
+    "client": """
+from chainwebpy import ChainwebClient, GenericNodeAPIEndpoint
+cw = ChainwebClient(GenericNodeAPIEndpoint("http", "127.0.0.1", {port}, "0.0", "{version}"))
+""",
+    "client + first call": """
+from chainwebpy import ChainwebClient, GenericNodeAPIEndpoint
+cw = ChainwebClient(GenericNodeAPIEndpoint("http", "127.0.0.1", {port}, "0.0", "{version}"))
+cw.cut.get_current_cut()
+""",
+    # The pattern of scripts written before ChainwebClient: every endpoint
+    # module and requests imported up front, one endpoint object each.
+    "eager modules + first call": """
+import json
+import requests
+from chainwebpy.url import GenericNodeAPIEndpoint
+from chainwebpy.chainweb_p2p.block_hashes_endpoints import BlockHashesEndpoints
+from chainwebpy.chainweb_p2p.block_header_endpoints import BlockHeaderEndpoints
+from chainwebpy.chainweb_p2p.block_payload_endpoints import BlockPayloadEndpoints
+from chainwebpy.chainweb_p2p.config_endpoints import ConfigEndpoints
+from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+from chainwebpy.chainweb_p2p.mempool_endpoints import MempoolEndpoints
+from chainwebpy.chainweb_p2p.peer_endpoints import PeerEndpoints
+from chainwebpy.chainweb_service.mining_endpoints import MiningEndpoints
+from chainwebpy.chainweb_service.miscellaneous_endpoints import MiscellaneousEndpoints
+from chainwebpy.chainweb_service.pact_endpoints import PactEndpoints
+from chainwebpy.metrics import LoggingHooks
+from chainwebpy.cache import CachingTransport
+api = GenericNodeAPIEndpoint("http", "127.0.0.1", {port}, "0.0", "{version}")
+CutEndpoints(api).get_current_cut()
+""",
+}
+
+
+def run_scenario(code: str, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PRELUDE + code + _REPORT],
+            check=True,
+            stdout=subprocess.PIPE,
+        ).stdout
+        timings.append(float(out.decode().strip().splitlines()[-1]))
+    return timings
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument(
+        "--scenarios", nargs="*", default=list(SCENARIOS), choices=SCENARIOS
+    )
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args(argv)
+
+    import compileall
+    import os
+
+    import chainwebpy
+
+    compileall.compile_dir(
+        os.path.dirname(chainwebpy.__file__), quiet=1, force=False
+    )
+
+    results: Dict[str, dict] = {}
+    with SimulatedNodeProcess(chains=10, height=100) as node:
+        print(f"{'scenario':<32}{'median ms':>12}{'min ms':>12}")
+        for name in args.scenarios:
+            code = SCENARIOS[name].format(port=node.port, version=node.version)
+            timings = run_scenario(code, args.runs)
+            results[name] = {
+                "median": statistics.median(timings),
+                "min": min(timings),
+                "runs": len(timings),
+            }
+            print(
+                f"{name:<32}{results[name]['median'] * 1000:>12.2f}"
+                f"{results[name]['min'] * 1000:>12.2f}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Mining work requests of many workers, directly against a node and through a `MiningProxy`.
+
+    python -m benchmarks.bench_mining_proxy
+    python -m benchmarks.bench_mining_proxy --latency 0.01 --workers 32 --requests 200
+
+Every worker requests work in a loop. Directly, every request is a `get_mining_work` call to a `SimulatedNode`; through the proxy, it is a request to the proxy's local socket and the node only sees the proxy's refreshes.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from benchmarks.bench_endpoints import percentile
+from benchmarks.simnode import SimulatedNode
+
+KEYS = ["00" * 32]
+
+
+def run(node, workers: int, requests: int, proxy=None) -> dict:
+    from chainwebpy.client import ChainwebClient
+    from chainwebpy.mining_proxy import MiningWorkerClient
+
+    def worker(_):
+        latencies = []
+        if proxy is None:
+            mining = ChainwebClient(node.api()).mining
+            fetch = lambda: mining.get_mining_work("miner", KEYS)  # noqa: E731
+        else:
+            client = MiningWorkerClient(proxy.address)
+            fetch = client.work
+        for _ in range(requests):
+            started = time.perf_counter()
+            fetch()
+            latencies.append(time.perf_counter() - started)
+        if proxy is not None:
+            client.close()
+        return latencies
+
+    node.reset_counters()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = sorted(
+            l for ls in pool.map(worker, range(workers)) for l in ls
+        )
+    seconds = time.perf_counter() - started
+    return {
+        "rps": len(latencies) / seconds,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "upstream": node.requests.get("mining/work", 0),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    from chainwebpy.client import ChainwebClient
+    from chainwebpy.mining_proxy import MiningProxy
+
+    print(
+        f"{'path':<8}{'workers':>9}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'upstream':>10}"
+    )
+    with SimulatedNode(chains=10, height=100, latency=args.latency) as node:
+        results = [("direct", run(node, args.workers, args.requests))]
+        cw = ChainwebClient(node.api())
+        with MiningProxy(cw, "miner", KEYS) as proxy:
+            results.append(
+                ("proxy", run(node, args.workers, args.requests, proxy))
+            )
+    for name, result in results:
+        print(
+            f"{name:<8}{args.workers:>9}{result['rps']:>10.0f}"
+            f"{result['p50']:>10.3f}{result['p99']:>10.3f}"
+            f"{result['upstream']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Per-call Python overhead of the endpoint methods, without any network.
+
+    python -m benchmarks.bench_spec
+    python -m benchmarks.bench_spec --number 200000
+
+The endpoint objects send through a transport that returns at once, so the timings are the cost of argument checks, building params, headers, url and body, and dispatching to the transport.
+"""
+
+import argparse
+import sys
+import timeit
+from typing import List
+
+from chainwebpy.transport import Transport
+from chainwebpy.url import GenericNodeAPIEndpoint
+
+HASH = "_9LGDllHdcB_ZLyZMQvPTEuWOBCdJ1FnegysqbF31HQ"
+
+
+class NullTransport(Transport):
+    """Accepts every call and returns None without sending anything."""
+
+    def call(
+        self,
+        name,
+        method,
+        url,
+        params=None,
+        headers=None,
+        data=None,
+        response="json",
+    ):
+        return None
+
+
+def calls(validate: bool) -> dict:
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.block_payload_endpoints import (
+        BlockPayloadEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+
+    api = GenericNodeAPIEndpoint("http", "127.0.0.1", 1848, "0.0", "mainnet01")
+    transport = NullTransport()
+    headers = BlockHeaderEndpoints(api, transport, validate=validate)
+    payloads = BlockPayloadEndpoints(api, transport, validate=validate)
+    cut = CutEndpoints(api, transport, validate=validate)
+    hashes = [HASH] * 10
+    return {
+        "get_current_cut": lambda: cut.get_current_cut(),
+        "get_block_headers_by_hash": lambda: (
+            headers.get_block_headers_by_hash(0, HASH)
+        ),
+        "get_block_headers_by_hash binary": lambda: (
+            headers.get_block_headers_by_hash(0, HASH, "binary")
+        ),
+        "get_block_headers": lambda: headers.get_block_headers(
+            3, limit=100, next="inclusive:" + HASH, minheight=10
+        ),
+        "get_block_header_branches": lambda: (
+            headers.get_block_header_branches(0, [HASH], [HASH], limit=50)
+        ),
+        "get_batch_of_block_payload": lambda: (
+            payloads.get_batch_of_block_payload(0, hashes)
+        ),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    checked = calls(validate=True)
+    trusted = calls(validate=False)
+    print(f"{'method':<36}{'validate ns':>14}{'validate=False ns':>20}")
+    for name in checked:
+        row = []
+        for fn in (checked[name], trusted[name]):
+            best = min(
+                timeit.repeat(fn, number=args.number, repeat=args.repeat)
+            )
+            row.append(best / args.number * 1e9)
+        print(f"{name:<36}{row[0]:>14.0f}{row[1]:>20.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
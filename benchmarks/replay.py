@@ -0,0 +1,75 @@
+"""Replay a recorded cassette offline and profile the client side.
+
+    python -m benchmarks.replay traffic.cwc --clients 8 --speed 0
+    python -m benchmarks.replay traffic.cwc --speed 10 --profile --memory
+
+Cassettes are recorded with `chainwebpy.cassette.RecordingTransport`:
+
+    transport = RecordingTransport("traffic.cwc")
+    cw = BlockPayloadEndpoints(endpoint, transport=transport)
+    ...
+    transport.close()
+"""
+
+import argparse
+import cProfile
+import pstats
+import sys
+import tracemalloc
+from typing import List
+
+from chainwebpy.cassette import Cassette, replay
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette")
+    parser.add_argument("--clients", type=int, default=1)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="1 replays at the recorded pace, 10 ten times faster, 0 as fast as possible.",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Print a CPU profile."
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="Report peak traced memory."
+    )
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    interactions = Cassette(args.cassette).interactions()
+    names = {}
+    for interaction in interactions:
+        names[interaction.name] = names.get(interaction.name, 0) + 1
+    print(f"{len(interactions)} interactions:")
+    for name, count in sorted(names.items(), key=lambda i: -i[1]):
+        print(f"  {name:<48}{count:>8}")
+
+    profiler = cProfile.Profile() if args.profile else None
+    if args.memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+
+    stats = replay(interactions, clients=args.clients, speed=args.speed)
+
+    if profiler is not None:
+        profiler.disable()
+    print(stats)
+    print(f"{stats.throughput:.1f} calls/s, {stats.bytes / 1e6:.1f} MB decoded")
+    if args.memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"peak traced memory: {peak / 1024:.1f} KiB")
+    if profiler is not None:
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(
+            "cumulative"
+        ).print_stats(args.top)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
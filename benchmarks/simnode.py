@@ -0,0 +1,1653 @@
+"""A local stand-in Chainweb node for benchmarks and offline tests.
+
+The node serves the `/chainweb/0.0/<version>/...` routes used by the endpoint classes from deterministic, synthetic chain data: one block per height on every chain, payloads with transactions and outputs, a mempool, peers and the block header event stream. Latency and faults can be injected for every request, per route, or per request through the `X-Sim-Latency` and `X-Sim-Fault` request headers.
+
+    with SimulatedNode(chains=10, height=500) as node:
+        cw = CutEndpoints(node.api())
+        cw.get_current_cut()
+"""
+
+import base64
+import hashlib
+import json
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+PETERSEN_GRAPH = {
+    0: (2, 3, 5),
+    1: (3, 4, 6),
+    2: (0, 4, 7),
+    3: (0, 1, 8),
+    4: (1, 2, 9),
+    5: (0, 6, 9),
+    6: (1, 5, 7),
+    7: (2, 6, 8),
+    8: (3, 7, 9),
+    9: (4, 5, 8),
+}
+
+TWENTY_CHAIN_GRAPH = {
+    0: (5, 10, 15),
+    1: (6, 11, 16),
+    2: (7, 12, 17),
+    3: (8, 13, 18),
+    4: (9, 14, 19),
+    5: (0, 7, 8),
+    6: (1, 8, 9),
+    7: (2, 5, 9),
+    8: (3, 5, 6),
+    9: (4, 6, 7),
+    10: (0, 11, 19),
+    11: (1, 10, 12),
+    12: (2, 11, 13),
+    13: (3, 12, 14),
+    14: (4, 13, 15),
+    15: (0, 14, 16),
+    16: (1, 15, 17),
+    17: (2, 16, 18),
+    18: (3, 17, 19),
+    19: (4, 10, 18),
+}
+
+VERSION_CODES = {"mainnet01": 5, "testnet04": 7, "development": 1}
+
+GENESIS_TIME = 1_572_393_600_000_000
+BLOCK_TIME = 30_000_000
+EPOCH_LENGTH = 120
+
+HEADER_SIZE = 318
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def unb64url(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _digest(*parts) -> bytes:
+    return hashlib.sha256(
+        "/".join(str(p) for p in parts).encode("utf-8")
+    ).digest()
+
+
+def _merkle_leaf(data: bytes) -> bytes:
+    return hashlib.new("sha512_256", b"\x00" + data).digest()
+
+
+def _merkle_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.new("sha512_256", b"\x01" + left + right).digest()
+
+
+def _merkle_tree(nodes):
+    """The root of a Merkle tree over node hashes and the proof path of every node.
+
+    Nodes are paired from left to right and an odd last node is carried up a level. A path step is (side, sibling), with side 0 if the sibling is the left and 1 if it is the right child.
+    """
+    paths = [[] for _ in nodes]
+    members = [[i] for i in range(len(nodes))]
+    level = list(nodes)
+    while len(level) > 1:
+        upper, upper_members = [], []
+        for i in range(0, len(level) - 1, 2):
+            left, right = level[i], level[i + 1]
+            for m in members[i]:
+                paths[m].append((1, right))
+            for m in members[i + 1]:
+                paths[m].append((0, left))
+            upper.append(_merkle_node(left, right))
+            upper_members.append(members[i] + members[i + 1])
+        if len(level) % 2:
+            upper.append(level[-1])
+            upper_members.append(members[-1])
+        level, members = upper, upper_members
+    return level[0], paths
+
+
+def _distance(graph: dict, source: int, target: int) -> int:
+    seen = {source}
+    frontier = [source]
+    distance = 0
+    while target not in seen:
+        frontier = [
+            c
+            for f in frontier
+            for c in graph[f]
+            if c not in seen and not seen.add(c)
+        ]
+        distance += 1
+    return distance
+
+
+def encode_header(header: dict) -> bytes:
+    """Encode a block header object in the Chainweb binary header format."""
+    adjacents = sorted((int(c), h) for c, h in header["adjacents"].items())
+    return b"".join(
+        [
+            struct.pack("<Qq", header["featureFlags"], header["creationTime"]),
+            unb64url(header["parent"]),
+            struct.pack("<H", len(adjacents)),
+            b"".join(struct.pack("<I", c) + unb64url(h) for c, h in adjacents),
+            unb64url(header["target"]),
+            unb64url(header["payloadHash"]),
+            struct.pack("<I", header["chainId"]),
+            unb64url(header["weight"]),
+            struct.pack(
+                "<QIqQ",
+                header["height"],
+                VERSION_CODES.get(header["chainwebVersion"], 0),
+                header["epochStart"],
+                int(header["nonce"]),
+            ),
+            unb64url(header["hash"]),
+        ]
+    )
+
+
+class ChainData:
+    """Deterministic synthetic chain data, generated lazily and memoized."""
+
+    def __init__(
+        self,
+        version: str = "mainnet01",
+        chains: int = 20,
+        height: int = 1000,
+        txs_per_block: int = 4,
+        mempool_size: int = 50,
+        peers: int = 64,
+        seed: int = 0,
+        merkle: bool = False,
+    ):
+        if chains not in (10, 20):
+            raise ValueError("chains must be 10 or 20")
+        self.version = version
+        self.graph = PETERSEN_GRAPH if chains == 10 else TWENTY_CHAIN_GRAPH
+        self.chains = chains
+        self.tips = {c: height - 1 for c in range(chains)}
+        self.txs_per_block = txs_per_block
+        self.mempool_size = mempool_size
+        self.peer_count = peers
+        self.seed = seed
+        self._hashes = {}
+        self._headers = {}
+        self._encoded = {}
+        self._payloads = {}
+        self._by_hash = {}
+        self._payload_by_hash = {}
+        self._pending = {}
+        self.merkle = merkle
+        self._merkle_height = -1
+        self._outputs = {}
+        self._tx_keys = {}
+        self._accounts = None
+
+    def block_hash(self, chain: int, height: int) -> str:
+        if height < 0:
+            return b64url(bytes(32))
+        key = (chain, height)
+        block_hash = self._hashes.get(key)
+        if block_hash is None:
+            if self.merkle:
+                self._merkle_fill(height)
+                return self._hashes[key]
+            block_hash = b64url(
+                _digest(self.seed, self.version, "block", chain, height)
+            )
+            self._hashes[key] = block_hash
+            self._by_hash[block_hash] = key
+        return block_hash
+
+    # With `merkle`, block hashes are Merkle roots over a seed leaf, the
+    # root of the block's outputs, the parent and the adjacent parents, so
+    # that SPV proofs from outputs to later blocks of any chain verify.
+
+    def _block_nodes(self, chain: int, height: int) -> list:
+        seed = _digest(self.seed, self.version, "block", chain, height)
+        self.payload(chain, height)
+        return [
+            _merkle_leaf(seed),
+            self._outputs[(chain, height)][0],
+            unb64url(self.block_hash(chain, height - 1)),
+        ] + [
+            unb64url(self.block_hash(c, height - 1))
+            for c in sorted(self.graph[chain])
+        ]
+
+    def _merkle_fill(self, height: int):
+        for level in range(self._merkle_height + 1, height + 1):
+            for chain in range(self.chains):
+                root, _ = _merkle_tree(self._block_nodes(chain, level))
+                block_hash = b64url(root)
+                self._hashes[(chain, level)] = block_hash
+                self._by_hash[block_hash] = (chain, level)
+            self._merkle_height = max(self._merkle_height, level)
+
+    def find_tx(self, request_key: str):
+        """The (chain, height, index) of a transaction, or None."""
+        found = self._tx_keys.get(request_key)
+        if found is None:
+            for chain in range(self.chains):
+                for height in range(self.tips[chain] + 1):
+                    self.payload(chain, height)
+            found = self._tx_keys.get(request_key)
+        return found
+
+    def spv_proof(self, chain: int, request_key: str, target: int) -> dict:
+        """An SPV proof of the output of a transaction on `chain` up to the first block of `target` that depends on its block. Requires `merkle`."""
+        found = self.find_tx(request_key)
+        if found is None or found[0] != chain:
+            raise KeyError(request_key)
+        _, height, index = found
+        route = [chain]
+        while route[-1] != target:
+            nxt = min(
+                self.graph[route[-1]],
+                key=lambda c: (_distance(self.graph, c, target), c),
+            )
+            route.append(nxt)
+        if height + len(route) - 1 > self.tips[target]:
+            raise ValueError("target chain has not reached the proof height")
+
+        _, paths, subjects = self._outputs[(chain, height)]
+        steps = list(paths[index])
+        _, paths = _merkle_tree(self._block_nodes(chain, height))
+        steps += paths[1]
+        for i, (previous, current) in enumerate(zip(route, route[1:])):
+            nodes = self._block_nodes(current, height + i + 1)
+            position = 3 + sorted(self.graph[current]).index(previous)
+            _, paths = _merkle_tree(nodes)
+            steps += paths[position]
+        subject = subjects[index]
+        proof = struct.pack(">IQ", len(steps), index) + b"".join(
+            bytes([side]) + sibling for side, sibling in steps
+        )
+        return {
+            "chain": target,
+            "object": b64url(proof),
+            "subject": {"input": b64url(subject)},
+            "algorithm": "SHA512t_256",
+        }
+
+    def account(self, i: int) -> str:
+        """The name of one of the 200 accounts of the synthetic transactions."""
+        return f"k:{_digest('account', i).hex()}"
+
+    def balance(self, chain: int, account: str):
+        """The balance of an account at the tip of a chain, or None if the account does not exist."""
+        if self._accounts is None:
+            self._accounts = {self.account(i) for i in range(200)}
+        if account not in self._accounts:
+            return None
+        digest = _digest(self.seed, "balance", chain, self.tips[chain], account)
+        return int.from_bytes(digest[:4], "big") / 1000
+
+    def local(self, chain: int, code: str) -> dict:
+        """The result of a read-only Pact expression on a chain. Only `(coin.get-balance "account")` and list expressions of them are understood."""
+        code = code.strip()
+        forms = [code]
+        if code.startswith("[") and code.endswith("]"):
+            forms = re.findall(r"\([^()]*\)", code[1:-1])
+        values = []
+        for form in forms:
+            match = re.fullmatch(r'\(coin\.get-balance "([^"]*)"\)', form)
+            if match is None:
+                return {
+                    "status": "failure",
+                    "error": {"message": f"Cannot resolve {form}"},
+                }
+            value = self.balance(chain, match.group(1))
+            if value is None:
+                return {
+                    "status": "failure",
+                    "error": {
+                        "message": f"with-read: row not found: {match.group(1)}"
+                    },
+                }
+            values.append(value)
+        return {
+            "status": "success",
+            "data": values if code.startswith("[") else values[0],
+        }
+
+    def tx_count(self, chain: int, height: int) -> int:
+        if self.txs_per_block == 0:
+            return 0
+        return (chain * 7 + height * 13) % (self.txs_per_block + 1)
+
+    def encoded_header(self, chain: int, height: int) -> str:
+        """The base64url encoded binary header."""
+        key = (chain, height)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = self._encoded[key] = b64url(
+                encode_header(self.header(chain, height))
+            )
+        return encoded
+
+    def header(self, chain: int, height: int) -> dict:
+        key = (chain, height)
+        header = self._headers.get(key)
+        if header is not None:
+            return header
+
+        payload = self.payload(chain, height)
+        created = GENESIS_TIME + height * BLOCK_TIME + chain * 1_000_003
+        created += (height * 7919 + chain * 104729) % 20_000_000
+        epoch = height - height % EPOCH_LENGTH
+        difficulty = 1 + ((height // EPOCH_LENGTH) * 7 + chain) % 64
+        target = (2**256 - 1) // (difficulty * 2**32)
+        header = {
+            "nonce": str(
+                int.from_bytes(_digest("nonce", chain, height)[:7], "little")
+            ),
+            "creationTime": created,
+            "parent": self.block_hash(chain, height - 1),
+            "adjacents": {
+                str(c): self.block_hash(c, height - 1)
+                for c in self.graph[chain]
+            },
+            "target": b64url(target.to_bytes(32, "little")),
+            "payloadHash": payload["payloadHash"],
+            "chainId": chain,
+            "weight": b64url(
+                (difficulty * 2**32 * (height + 1)).to_bytes(32, "little")
+            ),
+            "height": height,
+            "chainwebVersion": self.version,
+            "epochStart": GENESIS_TIME + epoch * BLOCK_TIME,
+            "featureFlags": 0,
+            "hash": self.block_hash(chain, height),
+        }
+        self._headers[key] = header
+        return header
+
+    def find_header(self, block_hash: str) -> Optional[dict]:
+        key = self._by_hash.get(block_hash)
+        if key is None:
+            # Hashes are generated on demand, so a hash that was never
+            # served may still belong to a block. Generate them all once.
+            for chain in range(self.chains):
+                for height in range(self.tips[chain] + 1):
+                    self.block_hash(chain, height)
+            key = self._by_hash.get(block_hash)
+            if key is None:
+                return None
+        return self.header(*key)
+
+    def transaction(self, chain: int, height: int, index: int):
+        rnd = random.Random(hash((self.seed, chain, height, index)))
+        sender = self.account(rnd.randrange(200))
+        receiver = self.account(rnd.randrange(200))
+        amount = round(rnd.uniform(0.01, 500.0), 6)
+        gas_price = rnd.choice([1e-8, 1e-7, 1e-6, 1e-5])
+        cmd = json.dumps(
+            {
+                "networkId": self.version,
+                "payload": {
+                    "exec": {
+                        "data": {},
+                        "code": f'(coin.transfer "{sender}" "{receiver}" {amount})',
+                    }
+                },
+                "signers": [
+                    {
+                        "pubKey": sender[2:],
+                        "clist": [
+                            {"name": "coin.GAS", "args": []},
+                            {
+                                "name": "coin.TRANSFER",
+                                "args": [sender, receiver, amount],
+                            },
+                        ],
+                    }
+                ],
+                "meta": {
+                    "creationTime": (GENESIS_TIME + height * BLOCK_TIME)
+                    // 1_000_000
+                    - 60,
+                    "ttl": 28800,
+                    "gasLimit": 2500,
+                    "chainId": str(chain),
+                    "gasPrice": gas_price,
+                    "sender": sender,
+                },
+                "nonce": f"{chain}-{height}-{index}",
+            },
+            separators=(",", ":"),
+        )
+        request_key = b64url(hashlib.sha256(cmd.encode("utf-8")).digest())
+        tx = {
+            "hash": request_key,
+            "sigs": [{"sig": _digest("sig", request_key).hex() * 2}],
+            "cmd": cmd,
+        }
+        gas = 500 + rnd.randrange(300)
+        failed = rnd.random() < 0.05
+        output = {
+            "gas": gas,
+            "result": (
+                {
+                    "status": "failure",
+                    "error": {"message": "Insufficient funds"},
+                }
+                if failed
+                else {"status": "success", "data": "Write succeeded"}
+            ),
+            "reqKey": request_key,
+            "logs": b64url(_digest("logs", request_key)),
+            "events": [
+                {
+                    "params": [sender, "miner", round(gas * gas_price, 12)],
+                    "name": "TRANSFER",
+                    "module": {"namespace": None, "name": "coin"},
+                    "moduleHash": "rE7DU8jlQL9x_MPYuniZJf5ICBTAEHAIFQCB4blofP4",
+                }
+            ]
+            + (
+                []
+                if failed
+                else [
+                    {
+                        "params": [sender, receiver, amount],
+                        "name": "TRANSFER",
+                        "module": {"namespace": None, "name": "coin"},
+                        "moduleHash": "rE7DU8jlQL9x_MPYuniZJf5ICBTAEHAIFQCB4blofP4",
+                    }
+                ]
+            ),
+            "metaData": None,
+            "continuation": None,
+            "txId": height * 100 + index,
+        }
+        return tx, output
+
+    def payload(self, chain: int, height: int) -> dict:
+        key = (chain, height)
+        payload = self._payloads.get(key)
+        if payload is not None:
+            return payload
+
+        pairs = [
+            self.transaction(chain, height, i)
+            for i in range(self.tx_count(chain, height))
+        ]
+        encoded = [
+            (
+                b64url(json.dumps(tx, separators=(",", ":")).encode()),
+                b64url(json.dumps(out, separators=(",", ":")).encode()),
+            )
+            for tx, out in pairs
+        ]
+        if encoded:
+            payload_hash = b64url(
+                _digest("payload", *(tx for tx, _ in encoded))
+            )
+        else:
+            payload_hash = b64url(_digest("payload", "empty", chain))
+        for index, (_, out) in enumerate(pairs):
+            self._tx_keys[out["reqKey"]] = (chain, height, index)
+        outputs_hash = b64url(_digest("outs", payload_hash))
+        if self.merkle:
+            subjects = [unb64url(out) for _, out in encoded]
+            if subjects:
+                root, paths = _merkle_tree([_merkle_leaf(b) for b in subjects])
+            else:
+                root, paths = _merkle_leaf(b""), []
+            self._outputs[key] = (root, paths, subjects)
+            outputs_hash = b64url(root)
+        miner = b64url(
+            json.dumps(
+                {"account": "miner", "predicate": "keys-all", "public-keys": []}
+            ).encode()
+        )
+        coinbase = b64url(
+            json.dumps(
+                {
+                    "gas": 0,
+                    "result": {"status": "success", "data": "Write succeeded"},
+                    "reqKey": self.block_hash(chain, height - 1),
+                    "logs": None,
+                    "events": [],
+                    "metaData": None,
+                    "continuation": None,
+                    "txId": height * 100,
+                }
+            ).encode()
+        )
+        payload = {
+            "transactions": encoded,
+            "minerData": miner,
+            "transactionsHash": b64url(_digest("txs", payload_hash)),
+            "outputsHash": outputs_hash,
+            "payloadHash": payload_hash,
+            "coinbase": coinbase,
+        }
+        self._payloads[key] = payload
+        self._payload_by_hash.setdefault(payload_hash, key)
+        return payload
+
+    def find_payload(self, payload_hash: str) -> Optional[dict]:
+        key = self._payload_by_hash.get(payload_hash)
+        if key is None:
+            return None
+        return self.payload(*key)
+
+    def cut(self, maxheight: int = None) -> dict:
+        tips = dict(self.tips)
+        if maxheight is not None and sum(tips.values()) > maxheight:
+            # Cap the chains at a common level so that the cut height fits,
+            # then spend the remainder on the lowest chain ids.
+            level = max(0, maxheight // len(tips))
+            while sum(min(h, level + 1) for h in tips.values()) <= maxheight:
+                level += 1
+            tips = {c: min(h, level) for c, h in tips.items()}
+            spare = maxheight - sum(tips.values())
+            for c in sorted(tips):
+                if spare <= 0:
+                    break
+                if self.tips[c] > tips[c]:
+                    tips[c] += 1
+                    spare -= 1
+        hashes = {
+            str(c): {"height": h, "hash": self.block_hash(c, h)}
+            for c, h in sorted(tips.items())
+        }
+        height = sum(tips.values())
+        return {
+            "hashes": hashes,
+            "origin": None,
+            "weight": b64url((height * 2**32).to_bytes(32, "little")),
+            "height": height,
+            "instance": self.version,
+            "id": b64url(_digest("cut", *sorted(tips.items()))),
+        }
+
+    def peers(self, network: str):
+        return [
+            {
+                "id": b64url(_digest("peer", network, i)),
+                "address": {
+                    "hostname": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+                    "port": 1789,
+                },
+            }
+            for i in range(self.peer_count)
+        ]
+
+    def pending(self, chain: int):
+        height = self.tips[chain] + 1
+        key = (chain, height)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = [
+                self.transaction(chain, height, i)[0]
+                for i in range(self.mempool_size)
+            ]
+        return pending
+
+
+def _page(items, params, default_limit):
+    start = 0
+    nxt = params.get("next")
+    if nxt:
+        start = int(nxt.split(":", 1)[1])
+    limit = min(int(params.get("limit", default_limit)), default_limit)
+    page = items[start : start + limit]
+    more = start + limit < len(items)
+    return {
+        "limit": len(page),
+        "items": page,
+        "next": f"inclusive:{start + limit}" if more else None,
+    }
+
+
+def _bounds(params, tip):
+    lo = params.get("minheight", params.get("minHeight"))
+    hi = params.get("maxheight", params.get("maxHeight"))
+    lo = max(int(lo), 0) if lo is not None else 0
+    hi = min(int(hi), tip) if hi is not None else tip
+    return lo, hi
+
+
+class SimulatedNode:
+    """Local Chainweb HTTP stand-in server.
+
+    Args:
+        `version` (str, optional): The Chainweb version served. Defaults to "mainnet01".
+        `chains` (int, optional): Number of chains, 10 or 20. Defaults to 20.
+        `height` (int, optional): Number of blocks on every chain. Defaults to 1000.
+        `txs_per_block` (int, optional): Maximum number of transactions in a block. Defaults to 4.
+        `latency` (float, optional): Seconds added to every response. Defaults to 0.
+        `jitter` (float, optional): Maximum random seconds added on top of `latency`. Defaults to 0.
+        `fault_rate` (float, optional): Probability that a request fails. Defaults to 0.
+        `fault_kinds` (tuple, optional): Kinds of injected faults: "error" answers 503, "reset" drops the connection. Defaults to ("error",).
+        `page_limit` (int, optional): Maximum number of items in a page. Defaults to 100.
+        `block_interval` (float, optional): If set, every chain advances by one block every `block_interval` seconds. Defaults to None.
+        `peers` (int, optional): Number of peers in every peer network. Defaults to 64.
+        `seed` (int, optional): Seed of the synthetic data and of the fault injection. Defaults to 0.
+        `warm` (bool, optional): Generate all headers and payloads when the node starts instead of on first request. Defaults to False.
+        `merkle` (bool, optional): Compute block hashes as Merkle roots over the block's outputs, parent and adjacent parents, and serve verifiable SPV proofs. All lower blocks are generated when a block hash is first needed. Defaults to False.
+        `tls` (Tuple[str, str], optional): The certificate and key files of a https node, e.g. self-signed like the P2P API of Chainweb nodes. Defaults to None, http.
+    """
+
+    def __init__(
+        self,
+        version: str = "mainnet01",
+        chains: int = 20,
+        height: int = 1000,
+        txs_per_block: int = 4,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        fault_rate: float = 0.0,
+        fault_kinds: tuple = ("error",),
+        page_limit: int = 100,
+        block_interval: float = None,
+        peers: int = 64,
+        seed: int = 0,
+        warm: bool = False,
+        merkle: bool = False,
+        tls: tuple = None,
+    ):
+        self.warm = warm
+        self.tls = tls
+        self.data = ChainData(
+            version,
+            chains,
+            height,
+            txs_per_block,
+            peers=peers,
+            seed=seed,
+            merkle=merkle,
+        )
+        self.version = version
+        self.latency = latency
+        self.jitter = jitter
+        self.fault_rate = fault_rate
+        self.fault_kinds = tuple(fault_kinds)
+        self.route_latency: Dict[str, float] = {}
+        self.route_fault_rate: Dict[str, float] = {}
+        self.page_limit = page_limit
+        self.block_interval = block_interval
+        self.requests: Dict[str, int] = {}
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._new_block = threading.Condition()
+        self._events = []
+        self._server = None
+        self._threads = []
+        self._stopped = threading.Event()
+
+    # -- lifecycle -------------------------------------------------------
+
+    def _warm(self):
+        if self.warm:
+            for chain, tip in self.data.tips.items():
+                for height in range(tip + 1):
+                    self.data.header(chain, height)
+
+    def _start_miner(self):
+        if self.block_interval:
+            miner = threading.Thread(target=self._mine)
+            miner.daemon = True
+            miner.start()
+            self._threads.append(miner)
+
+    def start(self) -> "SimulatedNode":
+        node = self
+        self._warm()
+
+        class Handler(_Handler):
+            sim = node
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        if self.tls is not None:
+            import ssl
+
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*self.tls)
+            self._server.socket = context.wrap_socket(
+                self._server.socket, server_side=True
+            )
+        self._stopped.clear()
+        thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}
+        )
+        thread.daemon = True
+        thread.start()
+        self._threads = [thread]
+        self._start_miner()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        with self._new_block:
+            self._new_block.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "SimulatedNode":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def scheme(self) -> str:
+        return "http" if self.tls is None else "https"
+
+    @property
+    def host(self) -> str:
+        return f"{self.scheme}://127.0.0.1:{self.port}"
+
+    def api(self, api_version: str = "0.0"):
+        """Return a `GenericNodeAPIEndpoint` for this node."""
+        from chainwebpy.url import GenericNodeAPIEndpoint
+
+        return GenericNodeAPIEndpoint(
+            self.scheme, "127.0.0.1", self.port, api_version, self.version
+        )
+
+    # -- chain progress --------------------------------------------------
+
+    def advance(self, chains=None, blocks: int = 1):
+        """Add `blocks` blocks to each of `chains` (all chains by default) and publish them on the event stream."""
+        chains = range(self.data.chains) if chains is None else chains
+        with self._new_block:
+            for _ in range(blocks):
+                for chain in chains:
+                    self.data.tips[chain] += 1
+                    self._events.append(
+                        self.data.header(chain, self.data.tips[chain])
+                    )
+            self._new_block.notify_all()
+
+    def _mine(self):
+        while not self._stopped.wait(self.block_interval):
+            self.advance()
+
+    # -- fault injection -------------------------------------------------
+
+    def _delay(self, route: str, headers) -> float:
+        delay = self.route_latency.get(route, self.latency)
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        forced = headers.get("X-Sim-Latency")
+        if forced is not None:
+            delay = float(forced)
+        return delay
+
+    def _fault(self, route: str, headers) -> Optional[str]:
+        forced = headers.get("X-Sim-Fault")
+        if forced is not None:
+            return forced
+        rate = self.route_fault_rate.get(route, self.fault_rate)
+        if rate and self._random.random() < rate:
+            return self._random.choice(self.fault_kinds)
+        return None
+
+    def configure(self, **settings):
+        """Change the injected latency and faults of the running node.
+
+        Accepts the `latency`, `jitter`, `fault_rate`, `fault_kinds`, `route_latency` and `route_fault_rate` settings.
+        """
+        for name, value in settings.items():
+            if name not in _SETTINGS:
+                raise ValueError(f"unknown setting {name!r}")
+            if name == "fault_kinds":
+                value = tuple(value)
+            setattr(self, name, value)
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests.clear()
+            self.connections = 0
+
+    # -- routes ----------------------------------------------------------
+
+    def handle(self, method, path, params, headers, body):
+        """Dispatch a request. Returns (route, status, content type, body), where body may be a generator for streamed responses."""
+        for route_method, pattern, route, fn in ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match is not None:
+                return (route,) + fn(
+                    self, params, headers, body, *match.groups()
+                )
+        return ("unknown", 404, "text/plain", b"Not Found")
+
+
+_SETTINGS = {
+    "latency",
+    "jitter",
+    "fault_rate",
+    "fault_kinds",
+    "route_latency",
+    "route_fault_rate",
+}
+
+
+def _json(value, status=200):
+    return status, "application/json", json.dumps(value).encode("utf-8")
+
+
+def _chain(node, chain):
+    chain = int(chain)
+    if chain >= node.data.chains:
+        return None
+    return chain
+
+
+def _header_encoding(headers):
+    accept = headers.get("Accept", "application/json")
+    if "octet-stream" in accept:
+        return "binary"
+    if "blockheader-encoding=object" in accept:
+        return "object"
+    return "base64url"
+
+
+def _encode_headers(node, items, encoding):
+    if encoding == "object":
+        return items
+    return [node.data.encoded_header(h["chainId"], h["height"]) for h in items]
+
+
+def r_cut(node, params, headers, body):
+    maxheight = params.get("maxheight")
+    return _json(node.data.cut(int(maxheight) if maxheight else None))
+
+
+def r_config(node, params, headers, body):
+    return _json(
+        {
+            "chainwebVersion": node.version,
+            "p2p": {"peer": {"hostaddress": {"hostname": "127.0.0.1"}}},
+            "mining": {"coordination": {"enabled": False}},
+            "transactionIndex": {"enabled": True},
+            "throttling": {"global": 50},
+        }
+    )
+
+
+def r_info(node, params, headers, body):
+    graph = [[c, list(adj)] for c, adj in sorted(node.data.graph.items())]
+    return _json(
+        {
+            "nodeNumberOfChains": node.data.chains,
+            "nodeApiVersion": "0.0",
+            "nodeChains": [str(c) for c in range(node.data.chains)],
+            "nodeVersion": node.version,
+            "nodeGraphHistory": [[0, graph]],
+        }
+    )
+
+
+def r_health(node, params, headers, body):
+    return 200, "text/plain;charset=utf-8", b"Health check OK."
+
+
+def r_backup(node, params, headers, body):
+    return 200, "text/plain;charset=utf-8", b"backup-0"
+
+
+def r_check_backup(node, params, headers, body, backup_id):
+    return 200, "text/plain;charset=utf-8", b"backup-done"
+
+
+def r_cut_peers(node, params, headers, body):
+    return _json(_page(node.data.peers("cut"), params, node.page_limit))
+
+
+def r_mempool_peers(node, params, headers, body, chain):
+    if _chain(node, chain) is None:
+        return _json("chain not found", 404)
+    items = node.data.peers(f"mempool/{chain}")
+    return _json(_page(items, params, node.page_limit))
+
+
+def r_hashes(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    lo, hi = _bounds(params, node.data.tips[chain])
+    items = [node.data.block_hash(chain, h) for h in range(lo, hi + 1)]
+    return _json(_page(items, params, node.page_limit))
+
+
+def _branch_heights(node, chain, params, body):
+    request = json.loads(body or b"{}")
+    tip = node.data.tips[chain]
+    upper = [node.data.find_header(h) for h in request.get("upper", [])]
+    lower = [node.data.find_header(h) for h in request.get("lower", [])]
+    top = max((h["height"] for h in upper if h), default=-1)
+    bottom = max((h["height"] for h in lower if h), default=-1)
+    lo, hi = _bounds(params, tip)
+    return range(min(top, hi), max(bottom, lo - 1), -1)
+
+
+def r_hash_branch(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    items = [
+        node.data.block_hash(chain, h)
+        for h in _branch_heights(node, chain, params, body)
+    ]
+    return _json(_page(items, params, node.page_limit))
+
+
+def r_headers(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    lo, hi = _bounds(params, node.data.tips[chain])
+    page = _page(range(lo, hi + 1), params, node.page_limit)
+    items = [node.data.header(chain, h) for h in page["items"]]
+    page["items"] = _encode_headers(node, items, _header_encoding(headers))
+    return _json(page)
+
+
+def r_header_branch(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    heights = list(_branch_heights(node, chain, params, body))
+    page = _page(heights, params, node.page_limit)
+    items = [node.data.header(chain, h) for h in page["items"]]
+    page["items"] = _encode_headers(node, items, _header_encoding(headers))
+    return _json(page)
+
+
+def r_header(node, params, headers, body, chain, block_hash):
+    header = node.data.find_header(block_hash)
+    if header is None or header["chainId"] != int(chain):
+        return _json("block header not found", 404)
+    encoding = _header_encoding(headers)
+    if encoding == "binary":
+        return 200, "application/octet-stream", encode_header(header)
+    return _json(_encode_headers(node, [header], encoding)[0])
+
+
+def _without_outputs(payload):
+    result = dict(payload)
+    result["transactions"] = [tx for tx, _ in payload["transactions"]]
+    del result["coinbase"]
+    return result
+
+
+def r_payload(node, params, headers, body, chain, payload_hash):
+    payload = node.data.find_payload(payload_hash)
+    if payload is None:
+        return _json("payload not found", 404)
+    return _json(_without_outputs(payload))
+
+
+def r_payload_outputs(node, params, headers, body, chain, payload_hash):
+    payload = node.data.find_payload(payload_hash)
+    if payload is None:
+        return _json("payload not found", 404)
+    return _json(payload)
+
+
+def r_payload_batch(node, params, headers, body, chain):
+    found = [node.data.find_payload(h) for h in json.loads(body or b"[]")]
+    return _json([_without_outputs(p) for p in found if p is not None])
+
+
+def r_spv(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    if not node.data.merkle:
+        return _json("SPV proofs require a node started with merkle=True", 400)
+    request = json.loads(body or b"{}")
+    try:
+        proof = node.data.spv_proof(
+            chain, request["requestKey"], int(request["targetChainId"])
+        )
+    except KeyError:
+        return _json("Transaction not found", 400)
+    except ValueError as e:
+        return _json(str(e), 400)
+    return _json(b64url(json.dumps(proof, separators=(",", ":")).encode()))
+
+
+def r_local(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    command = json.loads(body or b"{}")
+    try:
+        code = json.loads(command["cmd"])["payload"]["exec"]["code"]
+    except (KeyError, TypeError, ValueError):
+        return _json("Invalid command", 400)
+    height = node.data.tips[chain]
+    return _json(
+        {
+            "reqKey": command.get("hash"),
+            "result": node.data.local(chain, code),
+            "gas": 0,
+            "logs": None,
+            "metaData": {
+                "blockHeight": height,
+                "blockTime": (GENESIS_TIME + height * BLOCK_TIME),
+                "prevBlockHash": node.data.block_hash(chain, height),
+            },
+            "continuation": None,
+            "txId": None,
+        }
+    )
+
+
+def r_payload_outputs_batch(node, params, headers, body, chain):
+    found = [node.data.find_payload(h) for h in json.loads(body or b"[]")]
+    return _json([p for p in found if p is not None])
+
+
+def r_mempool_pending(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    pending = node.data.pending(chain)
+    return _json(
+        {
+            "hashes": [tx["hash"] for tx in pending],
+            "highwaterMark": [node.data.seed, len(pending)],
+        }
+    )
+
+
+def r_mempool_member(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    known = {tx["hash"] for tx in node.data.pending(chain)}
+    return _json([k in known for k in json.loads(body or b"[]")])
+
+
+def r_mempool_lookup(node, params, headers, body, chain):
+    chain = _chain(node, chain)
+    if chain is None:
+        return _json("chain not found", 404)
+    known = {tx["hash"]: tx for tx in node.data.pending(chain)}
+    result = []
+    for key in json.loads(body or b"[]"):
+        tx = known.get(key)
+        if tx is None:
+            result.append({"tag": "Missing"})
+        else:
+            result.append({"tag": "Pending", "contents": json.dumps(tx)})
+    return _json(result)
+
+
+def r_mempool_insert(node, params, headers, body, chain):
+    return _json([])
+
+
+def r_mining_work(node, params, headers, body, account=None):
+    chain = min(node.data.tips, key=lambda c: (node.data.tips[c], c))
+    header = node.data.header(chain, node.data.tips[chain] + 1)
+    work = (
+        struct.pack("<I", chain)
+        + unb64url(header["target"])
+        + encode_header(header)[: HEADER_SIZE - 32]
+    )
+    return 200, "application/octet-stream", work
+
+
+def r_mining_solved(node, params, headers, body):
+    if len(body or b"") != HEADER_SIZE - 32:
+        return 400, "text/plain", b"invalid work header"
+    return 204, "text/plain", b""
+
+
+def r_header_updates(node, params, headers, body):
+    limit = params.get("limit")
+    limit = int(limit) if limit is not None else None
+    with node._new_block:
+        start = len(node._events)
+
+    def stream():
+        sent = 0
+        position = start
+        while not node._stopped.is_set():
+            with node._new_block:
+                while position >= len(node._events):
+                    if node._stopped.is_set():
+                        return
+                    node._new_block.wait(0.1)
+                events = node._events[position:]
+                position = len(node._events)
+            for header in events:
+                data = {
+                    "txCount": node.data.tx_count(
+                        header["chainId"], header["height"]
+                    ),
+                    "powHash": b64url(_digest("pow", header["hash"])),
+                    "header": header,
+                    "target": header["target"],
+                }
+                yield (
+                    "event:BlockHeader\ndata:"
+                    + json.dumps(data, separators=(",", ":"))
+                    + "\n\n"
+                ).encode("utf-8")
+                sent += 1
+                if limit is not None and sent >= limit:
+                    return
+
+    return 200, "text/event-stream", stream()
+
+
+_C = r"(\d+)"
+_H = r"([A-Za-z0-9_\-]+)"
+
+ROUTES = [
+    (m, re.compile(p), name, fn)
+    for m, p, name, fn in [
+        ("GET", r"/cut", "cut", r_cut),
+        ("GET", r"/cut/peer", "cut/peer", r_cut_peers),
+        ("GET", r"/config", "config", r_config),
+        ("GET", r"/info", "info", r_info),
+        ("GET", r"/health-check", "health-check", r_health),
+        ("POST", r"/make-backup", "make-backup", r_backup),
+        ("GET", rf"/check-backup/{_H}", "check-backup", r_check_backup),
+        ("GET", r"/header/updates", "header/updates", r_header_updates),
+        ("GET", rf"/chain/{_C}/hash", "hash", r_hashes),
+        ("POST", rf"/chain/{_C}/hash/branch", "hash/branch", r_hash_branch),
+        ("GET", rf"/chain/{_C}/header", "header", r_headers),
+        (
+            "POST",
+            rf"/chain/{_C}/header/branch",
+            "header/branch",
+            r_header_branch,
+        ),
+        ("GET", rf"/chain/{_C}/header/{_H}", "header/hash", r_header),
+        (
+            "POST",
+            rf"/chain/{_C}/payload/batch",
+            "payload/batch",
+            r_payload_batch,
+        ),
+        (
+            "POST",
+            rf"/chain/{_C}/payload/outputs/batch",
+            "payload/outputs/batch",
+            r_payload_outputs_batch,
+        ),
+        (
+            "GET",
+            rf"/chain/{_C}/payload/{_H}/outputs",
+            "payload/outputs",
+            r_payload_outputs,
+        ),
+        ("GET", rf"/chain/{_C}/payload/{_H}", "payload", r_payload),
+        ("POST", rf"/chain/{_C}/pact/api/v1/local", "pact/local", r_local),
+        ("POST", rf"/chain/{_C}/pact/api/v1/spv", "pact/spv", r_spv),
+        (
+            "POST",
+            rf"/chain/{_C}/mempool/getPending",
+            "mempool/getPending",
+            r_mempool_pending,
+        ),
+        (
+            "POST",
+            rf"/chain/{_C}/mempool/member",
+            "mempool/member",
+            r_mempool_member,
+        ),
+        (
+            "POST",
+            rf"/chain/{_C}/mempool/lookup",
+            "mempool/lookup",
+            r_mempool_lookup,
+        ),
+        (
+            "POST",
+            rf"/chain/{_C}/mempool/insert",
+            "mempool/insert",
+            r_mempool_insert,
+        ),
+        ("GET", rf"/chain/{_C}/mempool/peer", "mempool/peer", r_mempool_peers),
+        ("GET", r"/mining/work", "mining/work", r_mining_work),
+        ("GET", rf"/mining/work/{_H}", "mining/work", r_mining_work),
+        ("POST", r"/mining/solved", "mining/solved", r_mining_solved),
+    ]
+]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        import ssl
+
+        # Clients that reject the certificate of a TLS node, like peer
+        # probes pinned to another fingerprint, hang up during a request.
+        if isinstance(sys.exc_info()[1], (ConnectionError, ssl.SSLError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sim: SimulatedNode = None
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.sim._lock:
+            self.sim.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if url.path.startswith("/_sim/"):
+            self._control(url.path[len("/_sim/") :], body)
+            return
+
+        prefix = f"/chainweb/0.0/{self.sim.version}"
+        if not url.path.startswith(prefix):
+            self._reply(404, "text/plain", b"Not Found")
+            return
+
+        route, status, ctype, payload = self.sim.handle(
+            method, url.path[len(prefix) :], params, self.headers, body
+        )
+        self.sim._count(route)
+
+        delay = self.sim._delay(route, self.headers)
+        if delay:
+            time.sleep(delay)
+
+        fault = self.sim._fault(route, self.headers)
+        if fault == "reset":
+            self.close_connection = True
+            try:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            return
+        elif fault:
+            self._reply(503, "text/plain", b"Injected fault")
+            return
+
+        if isinstance(payload, bytes):
+            self._reply(status, ctype, payload)
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        # Chunked like the streams of a node, so that clients get every
+        # chunk as soon as it is written.
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for chunk in payload:
+                if chunk:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _control(self, command, body):
+        args = json.loads(body or b"{}")
+        if command == "advance":
+            self.sim.advance(args.get("chains"), args.get("blocks", 1))
+        elif command == "configure":
+            self.sim.configure(**args)
+        elif command == "reset":
+            self.sim.reset_counters()
+        elif command != "stats":
+            self._reply(404, "text/plain", b"Not Found")
+            return
+        stats = {
+            "requests": self.sim.requests,
+            "connections": self.sim.connections,
+        }
+        self._reply(200, "application/json", json.dumps(stats).encode())
+
+    def _reply(self, status, ctype, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class _H2Headers(dict):
+    """HTTP/2 request headers, looked up case-insensitively like HTTP/1.1 headers."""
+
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+
+class SimulatedH2Node(SimulatedNode):
+    """A `SimulatedNode` that speaks cleartext HTTP/2 with prior knowledge instead of HTTP/1.1. Requires h2.
+
+    The streams of a connection are served concurrently, each request on its own thread, so `connections` counts the TCP connections a client opened. Clients connect with HTTP/2 prior knowledge, e.g. `HTTP2Transport(http1=False)`.
+
+    Accepts the arguments of `SimulatedNode`.
+    """
+
+    def start(self) -> "SimulatedH2Node":
+        import h2.connection  # noqa: F401
+
+        self._warm()
+        self._socket = socket.create_server(("127.0.0.1", 0))
+        self._socket.settimeout(0.05)
+        self._stopped.clear()
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+        self._threads = [thread]
+        self._start_miner()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        with self._new_block:
+            self._new_block.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._socket.close()
+
+    @property
+    def port(self) -> int:
+        return self._socket.getsockname()[1]
+
+    def _accept(self):
+        while not self._stopped.is_set():
+            try:
+                sock, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self.connections += 1
+            thread = threading.Thread(target=_H2Connection(self, sock).serve)
+            thread.daemon = True
+            thread.start()
+
+
+class _H2Connection:
+    """One HTTP/2 connection of a `SimulatedH2Node`."""
+
+    def __init__(self, sim: SimulatedH2Node, sock: socket.socket):
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self.sim = sim
+        self.sock = sock
+        self.conn = H2Connection(
+            H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.cond = threading.Condition()
+        self.closed = False
+        self.requests = {}
+
+    def serve(self):
+        from h2 import events
+
+        with self.cond:
+            self.conn.initiate_connection()
+            self._flush()
+        try:
+            while not self.closed and not self.sim._stopped.is_set():
+                data = self.sock.recv(65536)
+                if not data:
+                    break
+                with self.cond:
+                    received = self.conn.receive_data(data)
+                    for event in received:
+                        if isinstance(event, events.RequestReceived):
+                            self.requests[event.stream_id] = (
+                                _H2Headers(event.headers),
+                                [],
+                            )
+                        elif isinstance(event, events.DataReceived):
+                            self.requests[event.stream_id][1].append(event.data)
+                            self.conn.acknowledge_received_data(
+                                event.flow_controlled_length, event.stream_id
+                            )
+                        elif isinstance(event, events.StreamEnded):
+                            headers, body = self.requests.pop(event.stream_id)
+                            thread = threading.Thread(
+                                target=self._respond,
+                                args=(event.stream_id, headers, b"".join(body)),
+                            )
+                            thread.daemon = True
+                            thread.start()
+                        elif isinstance(event, events.ConnectionTerminated):
+                            self.closed = True
+                    self._flush()
+                    self.cond.notify_all()
+        except OSError:
+            pass
+        finally:
+            with self.cond:
+                self.closed = True
+                self.cond.notify_all()
+            self.sock.close()
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data:
+            self.sock.sendall(data)
+
+    def _respond(self, stream_id: int, headers: _H2Headers, body: bytes):
+        sim = self.sim
+        url = urlsplit(headers[":path"])
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        prefix = f"/chainweb/0.0/{sim.version}"
+        if not url.path.startswith(prefix):
+            self._reply(stream_id, 404, "text/plain", b"Not Found")
+            return
+
+        route, status, ctype, payload = sim.handle(
+            headers[":method"], url.path[len(prefix) :], params, headers, body
+        )
+        sim._count(route)
+
+        delay = sim._delay(route, headers)
+        if delay:
+            time.sleep(delay)
+
+        fault = sim._fault(route, headers)
+        if fault == "reset":
+            with self.cond:
+                self.conn.reset_stream(stream_id)
+                self._flush()
+            return
+        elif fault:
+            self._reply(stream_id, 503, "text/plain", b"Injected fault")
+            return
+
+        if isinstance(payload, bytes):
+            self._reply(stream_id, status, ctype, payload)
+            return
+        self._headers(stream_id, status, ctype, None)
+        for chunk in payload:
+            if not self._data(stream_id, chunk, False):
+                return
+        self._data(stream_id, b"", True)
+
+    def _reply(self, stream_id: int, status: int, ctype: str, payload: bytes):
+        self._headers(stream_id, status, ctype, len(payload))
+        self._data(stream_id, payload, True)
+
+    def _headers(self, stream_id: int, status: int, ctype: str, length):
+        headers = [(":status", str(status)), ("content-type", ctype)]
+        if length is not None:
+            headers.append(("content-length", str(length)))
+        with self.cond:
+            self.conn.send_headers(stream_id, headers)
+            self._flush()
+
+    def _data(self, stream_id: int, data: bytes, end: bool) -> bool:
+        """Send data within the flow control windows. Returns False if the stream or connection closed."""
+        from h2.exceptions import StreamClosedError
+
+        view = memoryview(data)
+        while True:
+            with self.cond:
+                try:
+                    while True:
+                        if self.closed:
+                            return False
+                        window = min(
+                            self.conn.local_flow_control_window(stream_id),
+                            self.conn.max_outbound_frame_size,
+                        )
+                        if window > 0 or not view:
+                            break
+                        self.cond.wait()
+                    chunk, view = view[:window], view[window:]
+                    self.conn.send_data(
+                        stream_id, bytes(chunk), end_stream=end and not view
+                    )
+                    self._flush()
+                except (StreamClosedError, OSError):
+                    return False
+            if not view:
+                return True
+
+
+class SimulatedNodeProcess:
+    """Runs a `SimulatedNode` in a child process.
+
+    Benchmarks use the child process so that the server's CPU time and allocations are not measured as the client's. Control calls (`advance`, `configure`, `stats`) are sent to the child over HTTP. `data` mirrors the child's chain data, so sample hashes can be computed locally.
+
+    Accepts the arguments of `SimulatedNode`.
+    """
+
+    def __init__(self, **settings):
+        self.settings = settings
+        node = SimulatedNode(**settings)
+        self.data = node.data
+        self.version = node.version
+        self.process = None
+        self.port = None
+
+    def start(self) -> "SimulatedNodeProcess":
+        import subprocess
+        import sys
+
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.simnode",
+                json.dumps(self.settings),
+            ],
+            stdout=subprocess.PIPE,
+        )
+        self.port = int(self.process.stdout.readline())
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+            self.process = None
+
+    def __enter__(self) -> "SimulatedNodeProcess":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def host(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def api(self, api_version: str = "0.0"):
+        """Return a `GenericNodeAPIEndpoint` for this node."""
+        from chainwebpy.url import GenericNodeAPIEndpoint
+
+        return GenericNodeAPIEndpoint(
+            "http", "127.0.0.1", self.port, api_version, self.version
+        )
+
+    def _control(self, command: str, args: dict = None) -> dict:
+        from urllib.request import Request, urlopen
+
+        request = Request(
+            f"{self.host}/_sim/{command}",
+            data=json.dumps(args or {}).encode(),
+            method="POST",
+        )
+        with urlopen(request) as response:
+            return json.loads(response.read())
+
+    def advance(self, chains=None, blocks: int = 1):
+        self._control("advance", {"chains": chains, "blocks": blocks})
+        for chain in range(self.data.chains) if chains is None else chains:
+            self.data.tips[chain] += blocks
+
+    def configure(self, **settings):
+        self._control("configure", settings)
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        return self._control("stats")["requests"]
+
+    @property
+    def connections(self) -> int:
+        return self._control("stats")["connections"]
+
+    def reset_counters(self):
+        self._control("reset")
+
+
+if __name__ == "__main__":
+    import sys
+
+    node = SimulatedNode(
+        **json.loads(sys.argv[1] if len(sys.argv) > 1 else "{}")
+    )
+    node.start()
+    print(node.port, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        node.stop()
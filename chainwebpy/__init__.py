@@ -0,0 +1,28 @@
+"""High level Python bindings for the Kadena Chainweb REST API.
+
+The names below are imported on first access, so `import chainwebpy` stays cheap.
+"""
+
+_EXPORTS = {
+    "ChainwebClient": "chainwebpy.client",
+    "GenericNodeAPIEndpoint": "chainwebpy.url",
+    "P2PBootstrapAPIEndpoint": "chainwebpy.url",
+    "ServiceAPIEndpoint": "chainwebpy.url",
+    "Transport": "chainwebpy.transport",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(__import__(module, fromlist=(name,)), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
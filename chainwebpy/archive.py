@@ -0,0 +1,368 @@
+"""An append-only archive of binary block headers of one chain.
+
+A `HeaderArchive` is a directory of fixed-width files that are memory mapped for random access without decoding:
+
+- `headers.bin`: the 318 bytes binary headers in append order.
+- `heights.idx`: one little endian 64 bit entry per height, the number of the record at that height plus one, or 0.
+- `hashes.idx`: an open addressing hash table of 16 bytes entries, the first 8 bytes of a block hash and the record number plus one. Its capacity is the file size divided by 16.
+- `meta`: the number of committed records, the generation of the hash table, its capacity and the chain id.
+
+One writer appends; any number of readers, in other threads or processes, read at the same time. The writer writes records and index entries first and then commits the new record count, so readers never see a partly written record. Files grow in steps and are remapped by readers when they see a larger count.
+
+```
+with HeaderArchive("archive/0", writable=True) as archive:
+    page = cw.headers.get_block_headers(0, limit=1000, responseSchema="binary")
+    archive.append(page["items"])
+
+archive = HeaderArchive("archive/0")
+archive.get(height=500)
+archive.scan()["creationTime"]  # numpy view of every header
+```
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterable, Optional, Union
+
+from chainwebpy.header import HEADER_SIZE, BlockHeader, decode, unb64url
+
+_MAGIC = b"CWHDRARC"
+_META = struct.Struct("<8sQQQq")
+_ENTRY = struct.Struct("<QQ")
+_SLOT = struct.Struct("<Q")
+_HEIGHT = struct.Struct("<Q")
+_HEIGHT_OFFSET = 258
+_CHAIN_OFFSET = 222
+_HASH_OFFSET = 286
+
+_RECORD_STEP = 4096
+_HEIGHT_STEP = 65536
+_HASH_CAPACITY = 4096
+
+
+def _map(f, writable: bool) -> mmap.mmap:
+    access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+    return mmap.mmap(f.fileno(), 0, access=access)
+
+
+def _unmap(m: Optional[mmap.mmap]):
+    if m is not None:
+        try:
+            m.close()
+        except BufferError:
+            # A numpy view of `scan` still uses it; it is released with
+            # the view.
+            pass
+
+
+def _grow(f, size: int):
+    f.truncate(size)
+
+
+class HeaderArchive(object):
+    """Memory mapped archive of the binary headers of one chain.
+
+    Lookups by height return the last header appended at that height, so the header of a block that replaced an orphaned one wins if it is appended later.
+
+    Args:
+        `path` (str): The directory of the archive. It is created by a writer.
+        `writable` (bool, optional): Open as the writer. Only one writer may open an archive at a time; on platforms with `fcntl` this is enforced with a lock. Defaults to False.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        self.path = path
+        self.writable = writable
+        mode = "r+b" if writable else "rb"
+        if writable:
+            os.makedirs(path, exist_ok=True)
+            self._create()
+        self._files = {
+            name: open(os.path.join(path, name), mode)
+            for name in ("meta", "headers.bin", "heights.idx", "hashes.idx")
+        }
+        if writable:
+            self._lock()
+        self._meta = _map(self._files["meta"], writable)
+        self._records = self._heights = self._hashes = None
+        self._generation = -1
+        self._count = 0
+        self._remap()
+
+    def _create(self):
+        meta = os.path.join(self.path, "meta")
+        if os.path.exists(meta):
+            return
+        for name, size in (
+            ("headers.bin", _RECORD_STEP * HEADER_SIZE),
+            ("heights.idx", _HEIGHT_STEP * _HEIGHT.size),
+            ("hashes.idx", _HASH_CAPACITY * _ENTRY.size),
+        ):
+            with open(os.path.join(self.path, name), "wb") as f:
+                _grow(f, size)
+        tmp = meta + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(
+                _META.pack(_MAGIC, 0, 0, _HASH_CAPACITY, -1).ljust(4096, b"\0")
+            )
+        os.replace(tmp, meta)
+
+    def _lock(self):
+        try:
+            import fcntl
+        except ImportError:
+            return
+        try:
+            fcntl.flock(self._files["meta"], fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.close()
+            raise Exception(f"{self.path} is open by another writer") from None
+
+    def _state(self):
+        magic, count, generation, capacity, chain = _META.unpack_from(
+            self._meta
+        )
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not a header archive")
+        return count, generation, capacity, chain
+
+    def _remap(self):
+        """Map the files again if they grew or the hash table was rebuilt."""
+        count, generation, _, _ = self._state()
+        if generation != self._generation:
+            if not self.writable:
+                # A rebuilt table is a new file.
+                self._files["hashes.idx"].close()
+                self._files["hashes.idx"] = open(
+                    os.path.join(self.path, "hashes.idx"), "rb"
+                )
+            _unmap(self._hashes)
+            self._hashes = _map(self._files["hashes.idx"], self.writable)
+            self._generation = generation
+            # The size of the file that was opened, which is newer than the
+            # capacity in the meta if the writer rebuilt the table since.
+            self._capacity = len(self._hashes) // _ENTRY.size
+        if self._records is None or len(self._records) < count * HEADER_SIZE:
+            _unmap(self._records)
+            self._records = _map(self._files["headers.bin"], self.writable)
+        if self._heights is None or (
+            os.fstat(self._files["heights.idx"].fileno()).st_size
+            > len(self._heights)
+        ):
+            _unmap(self._heights)
+            self._heights = _map(self._files["heights.idx"], self.writable)
+        self._count = count
+
+    def refresh(self) -> int:
+        """See the records committed since the last refresh. Readers refresh on every lookup.
+
+        Returns:
+            int: The number of records.
+        """
+        count, generation, _, _ = self._state()
+        if count != self._count or generation != self._generation:
+            self._remap()
+        return self._count
+
+    def __len__(self) -> int:
+        return self.refresh()
+
+    @property
+    def chain(self) -> Optional[int]:
+        """The chain of the headers, None while the archive is empty."""
+        chain = self._state()[3]
+        return None if chain < 0 else chain
+
+    def _record(self, index: int) -> bytes:
+        start = index * HEADER_SIZE
+        return self._records[start : start + HEADER_SIZE]
+
+    def _find(self, block_hash: bytes, count: int) -> int:
+        """The record number of a block hash, or -1."""
+        table, mask = self._hashes, self._capacity - 1
+        key = int.from_bytes(block_hash[:8], "little")
+        slot = key & mask
+        while True:
+            prefix, record = _ENTRY.unpack_from(table, slot * _ENTRY.size)
+            if record == 0:
+                return -1
+            if prefix == key and record <= count:
+                start = (record - 1) * HEADER_SIZE + _HASH_OFFSET
+                if self._records[start : start + 32] == block_hash:
+                    return record - 1
+            slot = (slot + 1) & mask
+
+    def get(self, height: int) -> Optional[bytes]:
+        """The binary header at a height, or None."""
+        count = self.refresh()
+        offset = height * _HEIGHT.size
+        if height < 0 or offset >= len(self._heights):
+            return None
+        (record,) = _HEIGHT.unpack_from(self._heights, offset)
+        if record == 0 or record > count:
+            return None
+        header = self._record(record - 1)
+        # An entry of a record that was never committed, e.g. by a writer
+        # that crashed, may point to a record of another height since.
+        if _HEIGHT.unpack_from(header, _HEIGHT_OFFSET)[0] != height:
+            return None
+        return header
+
+    def by_hash(self, block_hash: Union[str, bytes]) -> Optional[bytes]:
+        """The binary header of a block hash, given raw or base64url encoded, or None."""
+        if isinstance(block_hash, str):
+            block_hash = unb64url(block_hash)
+        count = self.refresh()
+        index = self._find(block_hash, count)
+        return None if index < 0 else self._record(index)
+
+    def record(self, height: int) -> Optional[BlockHeader]:
+        """The header at a height as a `BlockHeader` record, or None."""
+        header = self.get(height)
+        return None if header is None else decode(header)
+
+    def scan(self, start: int = 0, stop: int = None):
+        """A numpy structured array view of records in append order, without copying. Requires numpy.
+
+        Args:
+            `start` (int, optional): The first record. Defaults to 0.
+            `stop` (int, optional): The record after the last one. Defaults to the number of records.
+        """
+        from chainwebpy.header import array
+
+        count = self.refresh()
+        stop = count if stop is None else min(stop, count)
+        start = min(max(start, 0), stop)
+        view = memoryview(self._records)[
+            start * HEADER_SIZE : stop * HEADER_SIZE
+        ]
+        return array(view)
+
+    def append(self, headers: Iterable) -> int:
+        """Append headers whose hash is not in the archive yet, and commit them.
+
+        Args:
+            `headers` (Iterable): Binary headers, e.g. the items of a "binary" header page, a buffer of consecutive binary headers, or `BlockHeader` records.
+
+        Returns:
+            int: The number of headers appended.
+        """
+        if not self.writable:
+            raise Exception("The archive is not writable")
+        if isinstance(headers, (bytes, bytearray, memoryview)):
+            view = memoryview(headers)
+            headers = [
+                view[i : i + HEADER_SIZE]
+                for i in range(0, len(view), HEADER_SIZE)
+            ]
+
+        count, _, _, chain = self._state()
+        added = 0
+        for header in headers:
+            if isinstance(header, BlockHeader):
+                header = header.to_bytes()
+            if len(header) != HEADER_SIZE:
+                raise ValueError(
+                    f"Header must be {HEADER_SIZE} bytes, got {len(header)}"
+                )
+            header_chain = int.from_bytes(
+                header[_CHAIN_OFFSET : _CHAIN_OFFSET + 4], "little"
+            )
+            if chain < 0:
+                chain = header_chain
+                struct.pack_into("<q", self._meta, 32, chain)
+            elif header_chain != chain:
+                raise ValueError(
+                    f"Header of chain {header_chain} in the archive of chain {chain}"
+                )
+            block_hash = bytes(header[_HASH_OFFSET:])
+            if self._find(block_hash, count) >= 0:
+                continue
+
+            if (count + 1) * HEADER_SIZE > len(self._records):
+                _unmap(self._records)
+                _grow(
+                    self._files["headers.bin"],
+                    (count + _RECORD_STEP) * HEADER_SIZE,
+                )
+                self._records = _map(self._files["headers.bin"], True)
+            start = count * HEADER_SIZE
+            self._records[start : start + HEADER_SIZE] = header
+
+            (height,) = _HEIGHT.unpack_from(header, _HEIGHT_OFFSET)
+            offset = height * _HEIGHT.size
+            if offset >= len(self._heights):
+                size = (height // _HEIGHT_STEP + 1) * _HEIGHT_STEP
+                _unmap(self._heights)
+                _grow(self._files["heights.idx"], size * _HEIGHT.size)
+                self._heights = _map(self._files["heights.idx"], True)
+            count += 1
+            _HEIGHT.pack_into(self._heights, offset, count)
+            if 2 * count > self._capacity:
+                self._rebuild(count)
+            self._insert(block_hash, count)
+            added += 1
+
+        if added:
+            # Commit: readers see the new records from here on.
+            struct.pack_into("<Q", self._meta, 8, count)
+            self._count = count
+        return added
+
+    def _insert(self, block_hash: bytes, record: int):
+        table, mask = self._hashes, self._capacity - 1
+        key = int.from_bytes(block_hash[:8], "little")
+        slot = key & mask
+        while _SLOT.unpack_from(table, slot * _ENTRY.size + 8)[0]:
+            slot = (slot + 1) & mask
+        _ENTRY.pack_into(table, slot * _ENTRY.size, key, record)
+
+    def _rebuild(self, count: int):
+        """Write a hash table of twice the capacity to a new file and swap it in, so that readers of the old table are not disturbed."""
+        capacity = self._capacity * 2
+        path = os.path.join(self.path, "hashes.idx")
+        tmp = path + ".tmp"
+        with open(tmp, "w+b") as f:
+            _grow(f, capacity * _ENTRY.size)
+            table = _map(f, True)
+            mask = capacity - 1
+            for index in range(count - 1):
+                start = index * HEADER_SIZE + _HASH_OFFSET
+                key = int.from_bytes(self._records[start : start + 8], "little")
+                slot = key & mask
+                while _SLOT.unpack_from(table, slot * _ENTRY.size + 8)[0]:
+                    slot = (slot + 1) & mask
+                _ENTRY.pack_into(table, slot * _ENTRY.size, key, index + 1)
+            table.flush()
+            table.close()
+        os.replace(tmp, path)
+        _unmap(self._hashes)
+        self._files["hashes.idx"].close()
+        self._files["hashes.idx"] = open(path, "r+b")
+        self._hashes = _map(self._files["hashes.idx"], True)
+        self._capacity = capacity
+        self._generation += 1
+        # Readers take the capacity from the size of the table file.
+        struct.pack_into("<Q", self._meta, 24, capacity)
+        struct.pack_into("<Q", self._meta, 16, self._generation)
+
+    def flush(self):
+        """Write the mapped files to disk."""
+        if self.writable:
+            for m in (self._records, self._heights, self._hashes, self._meta):
+                m.flush()
+
+    def close(self):
+        if self.writable and getattr(self, "_meta", None) is not None:
+            self.flush()
+        for m in ("_records", "_heights", "_hashes", "_meta"):
+            _unmap(getattr(self, m, None))
+            setattr(self, m, None)
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self) -> "HeaderArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
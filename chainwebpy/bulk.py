@@ -0,0 +1,451 @@
+"""Bulk download of block header height ranges.
+
+`BulkDownloader` splits the height range of every chain into shards that are fetched concurrently, each as a cursor walk over `get_block_headers`. Idle workers take over the second half of the remaining range of the slowest shard, so a few slow shards do not hold up the end of a download.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+_HEIGHTS = {
+    "object": lambda item: item["height"],
+    "records": lambda item: item.height,
+}
+
+
+class Shard(object):
+    """A height range of one chain.
+
+    `next` is the lowest height whose headers were not yet delivered; the shard is complete when `next` exceeds `hi`.
+    """
+
+    __slots__ = (
+        "chain",
+        "lo",
+        "hi",
+        "next",
+        "position",
+        "active",
+        "finished",
+        "batches",
+    )
+
+    def __init__(self, chain: int, lo: int, hi: int, next: int = None):
+        self.chain = chain
+        self.lo = lo
+        self.hi = hi
+        self.next = lo if next is None else next
+        self.position = self.next - 1
+        self.active = False
+        self.finished = self.next > hi
+        self.batches = deque()
+
+    @property
+    def remaining(self) -> int:
+        return self.hi - self.position
+
+    def __repr__(self) -> str:
+        return f"Shard({self.chain}, {self.lo}, {self.hi}, next={self.next})"
+
+
+class Checkpoint(object):
+    """The shards of a download and their progress in a JSON file, written atomically.
+
+    Args:
+        `path` (str): The checkpoint file.
+        `interval` (float, optional): The shortest time between two writes in seconds. Defaults to 1.
+    """
+
+    def __init__(self, path: str, interval: float = 1.0):
+        self.path = path
+        self.interval = interval
+        self._due = 0.0
+        self._sequence = 0
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        chains: Iterable[int] = None,
+        minheight: int = None,
+        maxheight: int = None,
+    ) -> Optional[List[Shard]]:
+        """The shards of the checkpoint, or None if there is none yet.
+
+        Args:
+            `chains` (Iterable[int], optional): The chains of the download. Defaults to None, any.
+            `minheight` (int, optional): The lowest height of the download. Defaults to None, any.
+            `maxheight` (int, optional): The highest height of the download. Defaults to None, any.
+
+        Raises:
+            `ValueError`: If the checkpoint is of a download of other chains or heights.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            state = json.load(f)
+        shards = [Shard(c, lo, hi, n) for c, lo, hi, n in state["shards"]]
+        # The shards cover the range of their download exactly.
+        covered = (
+            sorted({s.chain for s in shards}),
+            min((s.lo for s in shards), default=None),
+            max((s.hi for s in shards), default=None),
+        )
+        wanted = (
+            covered[0] if chains is None else sorted(set(chains)),
+            covered[1] if minheight is None else minheight,
+            covered[2] if maxheight is None else maxheight,
+        )
+        if shards and covered != wanted:
+            raise ValueError(
+                f"The checkpoint {self.path} is of chains {covered[0]} from height {covered[1]} to {covered[2]}, "
+                f"not of chains {wanted[0]} from height {wanted[1]} to {wanted[2]}"
+            )
+        return shards
+
+    def snapshot(self, shards: Iterable[Shard], force: bool = False):
+        """The state to write if a write is due, else None. Called while the shards do not change."""
+        now = time.monotonic()
+        if not force and now < self._due:
+            return None
+        self._due = now + self.interval
+        self._sequence += 1
+        return self._sequence, [[s.chain, s.lo, s.hi, s.next] for s in shards]
+
+    def write(self, snapshot):
+        """Write a snapshot unless a later one was written already."""
+        if snapshot is None:
+            return
+        sequence, shards = snapshot
+        with self._lock:
+            if sequence <= self._written:
+                return
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"shards": shards}, f)
+            os.replace(tmp, self.path)
+            self._written = sequence
+
+
+class DownloadStats(object):
+    """Counters of a bulk download."""
+
+    __slots__ = ("pages", "items", "steals", "seconds")
+
+    def __init__(self):
+        self.pages = 0
+        self.items = 0
+        self.steals = 0
+        self.seconds = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"DownloadStats(pages={self.pages}, items={self.items}, "
+            f"steals={self.steals}, seconds={self.seconds:.2f})"
+        )
+
+
+class BulkDownloader(object):
+    """Downloads the block headers of height ranges of many chains with concurrent sharded cursor walks.
+
+    Headers are delivered exactly once, in ascending height order within a shard, including the headers of orphaned blocks. The headers of one height are always delivered together, so progress is tracked per shard as the next height to deliver.
+
+    ```
+    dl = BulkDownloader(BlockHeaderEndpoints(endpoint), concurrency=16, checkpoint="sync.json")
+    for chain, headers in dl.iter(range(20), 0, 4_000_000):
+        ...
+    ```
+
+    Args:
+        `headers` (BlockHeaderEndpoints): The header endpoints of the node.
+        `concurrency` (int, optional): The number of requests in flight at most. Defaults to 8.
+        `shard_size` (int, optional): The number of heights of the initial shards. Defaults to 10000.
+        `limit` (int, optional): The page size of the requests. Defaults to None, the node's maximum.
+        `responseSchema` (str, optional): "object" for header objects or "records" for `chainwebpy.header.BlockHeader` records, transferred in the compact binary encoding. Defaults to "object".
+        `checkpoint` (Union[str, Checkpoint], optional): A checkpoint file. An existing checkpoint of the same chains and heights is resumed, skipping the delivered heights of every shard. Defaults to None.
+        `min_steal` (int, optional): The smallest remaining range in heights of a shard that is split between two workers. Defaults to 1000.
+        `read_ahead` (int, optional): The number of batches `iter` buffers ahead of the consumer at most. Workers of shards ahead of the consumer wait while the buffer is full. Defaults to 4 times `concurrency`.
+    """
+
+    def __init__(
+        self,
+        headers,
+        concurrency: int = 8,
+        shard_size: int = 10000,
+        limit: int = None,
+        responseSchema: str = "object",
+        checkpoint=None,
+        min_steal: int = 1000,
+        read_ahead: int = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        if shard_size < 1:
+            raise ValueError("shard_size must be greater than 0")
+        if read_ahead is not None and read_ahead < 1:
+            raise ValueError("read_ahead must be greater than 0")
+        if responseSchema not in _HEIGHTS:
+            raise ValueError(
+                'responseSchema must be one of "object" or "records"'
+            )
+
+        self.headers = headers
+        self.concurrency = concurrency
+        self.shard_size = shard_size
+        self.limit = limit
+        self.responseSchema = responseSchema
+        if isinstance(checkpoint, str):
+            checkpoint = Checkpoint(checkpoint)
+        self.checkpoint = checkpoint
+        self.min_steal = max(min_steal, 1)
+        self.read_ahead = 4 * concurrency if read_ahead is None else read_ahead
+        self.stats = DownloadStats()
+        self._height = _HEIGHTS[responseSchema]
+        self._lock = threading.Condition()
+        self._shards: List[Shard] = []
+        self._pending: deque = deque()
+        self._error: Optional[BaseException] = None
+        self._stopped = False
+        self._sink: Optional[Callable] = None
+        self._current: Optional[Shard] = None
+        self._buffered = 0
+
+    def shards(
+        self, chains: Iterable[int], minheight: int, maxheight: int
+    ) -> List[Shard]:
+        """Split [minheight, maxheight] of every chain into shards, or load them from the checkpoint."""
+        if self.checkpoint is not None:
+            shards = self.checkpoint.load(chains, minheight, maxheight)
+            if shards is not None:
+                return shards
+        return [
+            Shard(chain, lo, min(lo + self.shard_size - 1, maxheight))
+            for chain in chains
+            for lo in range(minheight, maxheight + 1, self.shard_size)
+        ]
+
+    def iter(
+        self, chains: Iterable[int], minheight: int, maxheight: int
+    ) -> Iterator[Tuple[int, list]]:
+        """Download the headers of [minheight, maxheight] on every chain and yield them in order.
+
+        Yields (chain, headers) batches ordered by chain and height. Up to `read_ahead` batches of shards ahead of the consumer are buffered until the consumer reaches them.
+
+        Args:
+            `chains` (Iterable[int]): The chains to download.
+            `minheight` (int): The lowest height.
+            `maxheight` (int): The highest height.
+        """
+        self._start(self.shards(chains, minheight, maxheight), None)
+        index = 0
+        try:
+            while True:
+                with self._lock:
+                    while True:
+                        if self._error is not None:
+                            raise self._error
+                        if index >= len(self._shards):
+                            return
+                        shard = self._shards[index]
+                        if shard is not self._current:
+                            # A worker of the shard may wait for the buffer.
+                            self._current = shard
+                            self._lock.notify_all()
+                        if shard.batches:
+                            items, through = shard.batches.popleft()
+                            self._buffered -= 1
+                            self._lock.notify_all()
+                            break
+                        if shard.finished:
+                            index += 1
+                            continue
+                        self._lock.wait()
+                if items:
+                    yield shard.chain, items
+                self._advance(shard, through)
+        finally:
+            self._finish()
+
+    def run(
+        self,
+        sink: Callable[[int, list], None],
+        chains: Iterable[int],
+        minheight: int,
+        maxheight: int,
+    ) -> DownloadStats:
+        """Download the headers of [minheight, maxheight] on every chain into a sink.
+
+        Args:
+            `sink` (Callable[[int, list], None]): Called with (chain, headers) for every page, from the worker threads. Batches of one shard arrive in order, batches of different shards in any order.
+            `chains` (Iterable[int]): The chains to download.
+            `minheight` (int): The lowest height.
+            `maxheight` (int): The highest height.
+
+        Returns:
+            DownloadStats: The counters of the download.
+        """
+        threads = self._start(self.shards(chains, minheight, maxheight), sink)
+        try:
+            for thread in threads:
+                thread.join()
+            if self._error is not None:
+                raise self._error
+        finally:
+            self._finish()
+        return self.stats
+
+    def _start(self, shards: List[Shard], sink) -> List[threading.Thread]:
+        self._shards = shards
+        self._pending = deque(s for s in shards if not s.finished)
+        self._sink = sink
+        self._error = None
+        self._stopped = False
+        self._current = None
+        self._buffered = 0
+        self.stats = DownloadStats()
+        self._started = time.monotonic()
+        threads = [
+            threading.Thread(
+                target=self._work, name=f"chainwebpy-bulk-{i}", daemon=True
+            )
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _finish(self):
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+            snapshot = None
+            if self.checkpoint is not None:
+                snapshot = self.checkpoint.snapshot(self._shards, force=True)
+        self.stats.seconds = time.monotonic() - self._started
+        if snapshot is not None:
+            self.checkpoint.write(snapshot)
+
+    def _take(self) -> Optional[Shard]:
+        with self._lock:
+            if self._stopped or self._error is not None:
+                return None
+            if self._pending:
+                shard = self._pending.popleft()
+                shard.active = True
+                return shard
+
+            active = [s for s in self._shards if s.active]
+            if not active:
+                return None
+            slowest = max(active, key=lambda s: s.remaining)
+            if slowest.remaining < 2 * self.min_steal:
+                return None
+            middle = (slowest.position + 1 + slowest.hi + 1) // 2
+            stolen = Shard(slowest.chain, middle, slowest.hi)
+            stolen.active = True
+            slowest.hi = middle - 1
+            self._shards.insert(self._shards.index(slowest) + 1, stolen)
+            self.stats.steals += 1
+            return stolen
+
+    def _work(self):
+        try:
+            while True:
+                shard = self._take()
+                if shard is None:
+                    return
+                self._fetch(shard)
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+                self._lock.notify_all()
+
+    def _fetch(self, shard: Shard):
+        height = self._height
+        lo = shard.next
+        cursor = None
+        held = []
+        while True:
+            with self._lock:
+                if self._stopped or self._error is not None:
+                    return
+                hi = shard.hi
+            page = self.headers.get_block_headers(
+                shard.chain,
+                limit=self.limit,
+                next=cursor,
+                minheight=lo,
+                maxheight=hi,
+                responseSchema=self.responseSchema,
+            )
+            items = page["items"]
+            cursor = page["next"]
+            with self._lock:
+                # The upper part of the range may have been taken over by
+                # another worker since the request was sent.
+                hi = shard.hi
+                while items and height(items[-1]) > hi:
+                    items = items[:-1]
+                    cursor = None
+                self.stats.pages += 1
+                self.stats.items += len(items)
+
+            held.extend(items)
+            if cursor is None:
+                ready, held, through = held, [], hi
+            elif held:
+                # Hold back the last height, which may continue on the next page.
+                last = height(held[-1])
+                split = len(held)
+                while split and height(held[split - 1]) == last:
+                    split -= 1
+                ready, held, through = held[:split], held[split:], last - 1
+            else:
+                continue
+
+            with self._lock:
+                shard.position = max(shard.position, through)
+            self._deliver(shard, ready, through)
+            if cursor is None:
+                with self._lock:
+                    shard.active = False
+                    shard.finished = True
+                    self._lock.notify_all()
+                return
+
+    def _deliver(self, shard: Shard, items: list, through: int):
+        if self._sink is None:
+            with self._lock:
+                # The shard of the consumer only waits for its own batches,
+                # which the consumer takes, so it always moves.
+                while (
+                    self._buffered >= self.read_ahead
+                    and (
+                        shard is not self._current
+                        or len(shard.batches) >= self.read_ahead
+                    )
+                    and not self._stopped
+                    and self._error is None
+                ):
+                    self._lock.wait()
+                shard.batches.append((items, through))
+                self._buffered += 1
+                self._lock.notify_all()
+            return
+        if items:
+            self._sink(shard.chain, items)
+        self._advance(shard, through)
+
+    def _advance(self, shard: Shard, through: int):
+        if self.checkpoint is None:
+            with self._lock:
+                shard.next = max(shard.next, through + 1)
+            return
+        with self._lock:
+            shard.next = max(shard.next, through + 1)
+            snapshot = self.checkpoint.snapshot(self._shards)
+        self.checkpoint.write(snapshot)
@@ -0,0 +1,235 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Union
+
+from chainwebpy.metrics import current_record
+from chainwebpy.singleflight import SingleFlight
+from chainwebpy.transport import Request, Transport, TransportWrapper
+
+
+class CachePolicy(object):
+    """Staleness budget of an endpoint.
+
+    Args:
+        `ttl` (float): Seconds a response is served from the cache without asking the node.
+        `stale_while_revalidate` (float, optional): Seconds after `ttl` during which the cached response is still served at once while a background refresh runs. Defaults to 0.
+    """
+
+    __slots__ = ("ttl", "stale_while_revalidate")
+
+    def __init__(self, ttl: float, stale_while_revalidate: float = 0.0):
+        if ttl < 0 or stale_while_revalidate < 0:
+            raise ValueError("ttl and stale_while_revalidate must be positive")
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def __repr__(self) -> str:
+        return f"CachePolicy({self.ttl!r}, {self.stale_while_revalidate!r})"
+
+
+DEFAULT_POLICIES = {
+    "get_config": CachePolicy(6 * 60 * 60, 24 * 60 * 60),
+    "general_node_info": CachePolicy(60 * 60, 24 * 60 * 60),
+    "get_cut_network_peer_info": CachePolicy(60, 10 * 60),
+    "get_current_cut": CachePolicy(0.3, 2.0),
+}
+
+
+class CacheStats(object):
+    """Cache counters of one endpoint."""
+
+    __slots__ = ("hits", "stale_hits", "misses", "refreshes", "errors")
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.stale_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests answered from the cache, stale hits included."""
+        total = self.requests
+        return (self.hits + self.stale_hits) / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class _Entry(object):
+    __slots__ = ("name", "response", "fresh_until", "stale_until")
+
+    def __init__(
+        self, name: str, response, fresh_until: float, stale_until: float
+    ):
+        self.name = name
+        self.response = response
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class CachingTransport(TransportWrapper):
+    """Transport that caches successful responses of slowly changing endpoints.
+
+    Each endpoint method has its own staleness budget (`CachePolicy`), keyed by the endpoint method name. Requests of endpoints without a policy are passed through. Responses are keyed by method, url, params and body, so different nodes and query parameters are cached separately.
+
+    A response older than its `ttl` but within its `stale_while_revalidate` window is returned at once and refreshed in a background thread. Concurrent misses for the same request share one upstream call.
+
+    Args:
+        `inner` (Transport, optional): The wrapped transport. Defaults to a new `Transport`.
+        `policies` (Dict[str, Union[CachePolicy, float]], optional): Staleness budgets by endpoint method name. A number is a `ttl` without a stale window. Defaults to `DEFAULT_POLICIES`.
+        `max_entries` (int, optional): Maximum number of cached responses. The least recently used are evicted first. Defaults to 1024.
+        `clock` (Callable[[], float], optional): Monotonic clock. Defaults to `time.monotonic`.
+    """
+
+    def __init__(
+        self,
+        inner: Transport = None,
+        policies: Dict[str, Union[CachePolicy, float]] = None,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(inner)
+        if policies is None:
+            policies = DEFAULT_POLICIES
+        self.policies = {
+            name: p if isinstance(p, CachePolicy) else CachePolicy(p)
+            for name, p in policies.items()
+        }
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def send(self, request: Request):
+        policy = self.policies.get(request.name)
+        if policy is None or request.stream or request.method != "GET":
+            return self.inner.send(request)
+
+        key = request.key
+        now = self.clock()
+        with self._lock:
+            stats = self._stats.get(request.name)
+            if stats is None:
+                stats = self._stats[request.name] = CacheStats()
+
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    stats.hits += 1
+                    record = current_record()
+                    if record is not None:
+                        record.cache_hit = True
+                    return entry.response
+
+                stats.stale_hits += 1
+                refresh = key not in self._refreshing
+                if refresh:
+                    self._refreshing.add(key)
+            else:
+                stats.misses += 1
+                entry = None
+
+        if entry is not None:
+            record = current_record()
+            if record is not None:
+                record.cache_hit = True
+            if refresh:
+                threading.Thread(
+                    target=self._refresh,
+                    args=(request, policy, stats),
+                    daemon=True,
+                ).start()
+            return entry.response
+
+        return self._flight.do(key, lambda: self._fetch(request, policy))
+
+    def _fetch(self, request: Request, policy: CachePolicy):
+        response = self.inner.send(request)
+        if response.status_code == 200:
+            now = self.clock()
+            entry = _Entry(
+                request.name,
+                response,
+                now + policy.ttl,
+                now + policy.ttl + policy.stale_while_revalidate,
+            )
+            with self._lock:
+                self._entries[request.key] = entry
+                self._entries.move_to_end(request.key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return response
+
+    def _refresh(self, request: Request, policy: CachePolicy, stats):
+        try:
+            response = self._flight.do(
+                request.key, lambda: self._fetch(request, policy)
+            )
+            with self._lock:
+                if response.status_code == 200:
+                    stats.refreshes += 1
+                else:
+                    stats.errors += 1
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(request.key)
+
+    def invalidate(self, name: str = None):
+        """Drop cached responses.
+
+        Args:
+            `name` (str, optional): Only drop responses of this endpoint method. Defaults to None, which drops everything.
+        """
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if e.name == name]:
+                del self._entries[key]
+
+    def stats(self, name: str = None) -> Union[CacheStats, Dict[str, dict]]:
+        """Return cache counters.
+
+        Args:
+            `name` (str, optional): Return the `CacheStats` of this endpoint method. Defaults to None, which returns the counters of all endpoints as dicts.
+        """
+        with self._lock:
+            if name is not None:
+                return self._stats.get(name, CacheStats())
+            return {n: s.as_dict() for n, s in self._stats.items()}
+
+    def hit_rate(self, name: str = None) -> float:
+        """Return the share of requests answered from the cache.
+
+        Args:
+            `name` (str, optional): Only count requests of this endpoint method. Defaults to None, which counts all cached endpoints.
+        """
+        with self._lock:
+            if name is not None:
+                stats = self._stats.get(name)
+                return stats.hit_rate if stats is not None else 0.0
+
+            hits = sum(s.hits + s.stale_hits for s in self._stats.values())
+            total = sum(s.requests for s in self._stats.values())
+            return hits / total if total else 0.0
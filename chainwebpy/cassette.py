@@ -0,0 +1,487 @@
+import gzip
+import json
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Union
+from urllib.parse import urlsplit
+
+from chainwebpy.transport import Request, Transport, TransportWrapper
+
+_MAGIC = b"CWCASS1\n"
+_RECORD = struct.Struct(">II")
+
+
+class Interaction(object):
+    """A recorded request/response pair.
+
+    Args:
+        `name` (str): The name of the endpoint method that issued the request.
+        `method` (str): The HTTP method.
+        `url` (str): The full request url.
+        `params` (dict): The query parameters.
+        `headers` (dict): The request headers.
+        `data` (Union[str, bytes]): The request body.
+        `status` (int): The response status code.
+        `content_type` (str): The response content type.
+        `body` (bytes): The response body.
+        `started` (float): Seconds between the start of the recording and the request.
+        `elapsed` (float): Seconds until the response body was received.
+        `stream` (bool): Whether the response was streamed.
+    """
+
+    __slots__ = (
+        "name",
+        "method",
+        "url",
+        "params",
+        "headers",
+        "data",
+        "status",
+        "content_type",
+        "body",
+        "started",
+        "elapsed",
+        "stream",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        params: dict,
+        headers: dict,
+        data,
+        status: int,
+        content_type: str,
+        body: bytes,
+        started: float,
+        elapsed: float,
+        stream: bool = False,
+    ):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = headers
+        self.data = data
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+        self.started = started
+        self.elapsed = elapsed
+        self.stream = stream
+
+    @property
+    def key(self) -> tuple:
+        """The request identity used for matching. The scheme and host of the url are ignored, so a cassette can be replayed for any node."""
+        return _match_key(
+            self.method, self.url, self.params, self.data, self.headers
+        )
+
+    @property
+    def response_kind(self) -> str:
+        """How an endpoint method decodes the body: "json", "bytes" or "text"."""
+        if "octet-stream" in self.content_type:
+            return "bytes"
+        elif "json" in self.content_type:
+            return "json"
+        return "text"
+
+    def request(self) -> Request:
+        return Request(
+            self.name,
+            self.method,
+            self.url,
+            self.params,
+            self.headers,
+            self.data,
+            self.stream,
+        )
+
+    def _encode(self) -> bytes:
+        data = self.data
+        if isinstance(data, bytes):
+            data = {"b": data.hex()}
+        meta = json.dumps(
+            [
+                self.name,
+                self.method,
+                self.url,
+                self.params,
+                self.headers,
+                data,
+                self.status,
+                self.content_type,
+                round(self.started, 6),
+                round(self.elapsed, 6),
+                self.stream,
+            ],
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return _RECORD.pack(len(meta), len(self.body)) + meta + self.body
+
+    @classmethod
+    def _decode(cls, meta: bytes, body: bytes) -> "Interaction":
+        (
+            name,
+            method,
+            url,
+            params,
+            headers,
+            data,
+            status,
+            content_type,
+            started,
+            elapsed,
+            stream,
+        ) = json.loads(meta)
+        if isinstance(data, dict):
+            data = bytes.fromhex(data["b"])
+        return cls(
+            name,
+            method,
+            url,
+            params,
+            headers,
+            data,
+            status,
+            content_type,
+            body,
+            started,
+            elapsed,
+            stream,
+        )
+
+
+def _match_key(method, url, params, data, headers) -> tuple:
+    parts = urlsplit(url)
+    accept = headers.get("Accept") if headers else None
+    if params:
+        params = tuple(
+            sorted((k, str(v)) for k, v in params.items() if v is not None)
+        )
+    if isinstance(data, bytes):
+        data = data.decode("latin-1")
+    return (method, parts.path, parts.query, params or None, data, accept)
+
+
+class Cassette(object):
+    """Compact on-disk store of recorded interactions.
+
+    A cassette is a gzip stream of length-prefixed records: a small JSON header with the request, status and timing, followed by the raw response body. Records are appended as they are recorded, so a cassette that was not closed cleanly can still be read up to its last complete record.
+
+    Args:
+        `path` (str): The cassette file.
+        `mode` (str, optional): "r" to read, "w" to record into a new file, "a" to add to an existing one. Defaults to "r".
+        `compresslevel` (int, optional): The gzip compression level of recorded files. Defaults to 6.
+    """
+
+    def __init__(self, path: str, mode: str = "r", compresslevel: int = 6):
+        if mode not in ("r", "w", "a"):
+            raise ValueError("mode must be one of 'r', 'w' or 'a'")
+        self.path = path
+        self.mode = mode
+        self._file = None
+        self._lock = threading.Lock()
+        if mode != "r":
+            self._file = gzip.open(path, mode + "b", compresslevel)
+            if mode == "w":
+                self._file.write(_MAGIC)
+
+    def append(self, interaction: Interaction):
+        """Add an interaction to the cassette."""
+        if self._file is None:
+            raise ValueError("cassette is not open for recording")
+        record = interaction._encode()
+        with self._lock:
+            self._file.write(record)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[Interaction]:
+        with gzip.open(self.path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{self.path} is not a cassette")
+            while True:
+                try:
+                    prefix = f.read(_RECORD.size)
+                    if len(prefix) < _RECORD.size:
+                        return
+                    meta_size, body_size = _RECORD.unpack(prefix)
+                    meta = f.read(meta_size)
+                    body = f.read(body_size)
+                except EOFError:
+                    return
+                if len(meta) < meta_size or len(body) < body_size:
+                    return
+                yield Interaction._decode(meta, body)
+
+    def interactions(self) -> List[Interaction]:
+        """Return all recorded interactions in recording order."""
+        return list(self)
+
+
+class CassetteResponse(object):
+    """Response served from a recorded interaction. Provides the parts of the `requests.Response` interface used by the endpoint classes."""
+
+    def __init__(self, interaction: Interaction):
+        self.interaction = interaction
+        self.status_code = interaction.status
+        self.headers = {"Content-Type": interaction.content_type}
+        self.content = interaction.body
+        self.url = interaction.url
+        self.encoding = "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        content = self.content
+        for i in range(0, len(content), chunk_size or len(content) or 1):
+            yield content[i : i + chunk_size]
+
+    def iter_lines(self, chunk_size: int = 512, **kwargs):
+        return iter(self.content.splitlines())
+
+    def close(self):
+        pass
+
+
+class _RecordedStream(object):
+    """Proxy of a streamed response that records the body read through it when it is exhausted or closed."""
+
+    def __init__(self, response, record):
+        self._response = response
+        self._record = record
+        self._chunks = []
+        self._done = False
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        try:
+            for chunk in self._response.iter_content(chunk_size):
+                self._chunks.append(chunk)
+                yield chunk
+        finally:
+            self._finish()
+
+    def iter_lines(self, chunk_size: int = 512, **kwargs):
+        pending = b""
+        for chunk in self.iter_content(chunk_size):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip(b"\r")
+        if pending:
+            yield pending
+
+    def close(self):
+        self._finish()
+        self._response.close()
+
+    def _finish(self):
+        if not self._done:
+            self._done = True
+            self._record(b"".join(self._chunks))
+
+
+class RecordingTransport(TransportWrapper):
+    """Transport that records every request/response pair, with its timing, into a cassette.
+
+    Streamed responses are recorded with the part of the body that was read when the stream is exhausted or closed.
+
+    Args:
+        `cassette` (Union[Cassette, str]): The cassette, or the path of a new cassette file.
+        `inner` (Transport, optional): The wrapped transport. Defaults to a new `Transport`.
+    """
+
+    def __init__(self, cassette: Union[Cassette, str], inner: Transport = None):
+        super().__init__(inner)
+        if not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette, "w")
+        self.cassette = cassette
+        self.origin = time.monotonic()
+
+    def send(self, request: Request):
+        started = time.monotonic()
+        response = self.inner.send(request)
+
+        def record(body: bytes):
+            self.cassette.append(
+                Interaction(
+                    request.name,
+                    request.method,
+                    request.url,
+                    request.params,
+                    request.headers,
+                    request.data,
+                    response.status_code,
+                    response.headers.get("Content-Type", ""),
+                    body,
+                    started - self.origin,
+                    time.monotonic() - started,
+                    request.stream,
+                )
+            )
+
+        if request.stream:
+            return _RecordedStream(response, record)
+
+        record(response.content)
+        return response
+
+    def close(self):
+        """Close the cassette."""
+        self.cassette.close()
+
+
+class ReplayTransport(Transport):
+    """Transport that serves responses from a cassette, without a network.
+
+    Requests are matched on method, url path, params and body; the scheme and host are ignored. Identical requests receive their recorded responses in recording order, cycling when they are used up.
+
+    Args:
+        `cassette` (Union[Cassette, str, List[Interaction]]): The cassette, its path, or recorded interactions.
+        `speed` (float, optional): Replay speed. 1 waits as long as the original response took, 10 ten times less, and 0 not at all. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        cassette: Union[Cassette, str, List[Interaction]],
+        speed: float = 0.0,
+    ):
+        super().__init__()
+        if isinstance(cassette, str):
+            cassette = Cassette(cassette)
+        self.interactions = list(cassette)
+        self.speed = speed
+        self._responses = {}
+        self._lock = threading.Lock()
+        for interaction in self.interactions:
+            self._responses.setdefault(interaction.key, deque()).append(
+                interaction
+            )
+
+    def send(self, request: Request):
+        key = _match_key(
+            request.method,
+            request.url,
+            request.params,
+            request.data,
+            request.headers,
+        )
+        with self._lock:
+            queue = self._responses.get(key)
+            if not queue:
+                raise LookupError(f"No recorded response for {request!r}")
+            interaction = queue[0]
+            queue.rotate(-1)
+
+        if self.speed:
+            time.sleep(interaction.elapsed / self.speed)
+        return CassetteResponse(interaction)
+
+
+class ReplayStats(object):
+    """Outcome of a `replay` run."""
+
+    def __init__(self, clients: int):
+        self.clients = clients
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.calls / self.seconds if self.seconds else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"ReplayStats(clients={self.clients}, calls={self.calls}, "
+            f"errors={self.errors}, bytes={self.bytes}, seconds={self.seconds:.3f})"
+        )
+
+
+def replay(
+    cassette: Union[Cassette, str, List[Interaction]],
+    clients: int = 1,
+    speed: float = 0.0,
+    transport: Transport = None,
+) -> ReplayStats:
+    """Re-issue the recorded calls of a cassette and decode their responses like the endpoint methods do.
+
+    Every client walks the whole recording on its own thread. With a `speed`, calls are started at their recorded offsets divided by `speed` and responses take their recorded time divided by `speed`; with a speed of 0 the recording is replayed as fast as possible.
+
+    Args:
+        `cassette` (Union[Cassette, str, List[Interaction]]): The cassette, its path, or recorded interactions.
+        `clients` (int, optional): Number of concurrent replay clients. Defaults to 1.
+        `speed` (float, optional): Replay speed. Defaults to 0.
+        `transport` (Transport, optional): The transport the calls are sent through. Defaults to a `ReplayTransport` of the cassette.
+    """
+    if isinstance(cassette, str):
+        cassette = Cassette(cassette)
+    interactions = list(cassette)
+    if transport is None:
+        transport = ReplayTransport(interactions, speed)
+
+    stats = ReplayStats(clients)
+    lock = threading.Lock()
+
+    def client(_):
+        calls = errors = size = 0
+        start = time.monotonic()
+        for interaction in interactions:
+            if speed:
+                delay = interaction.started / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                if interaction.stream:
+                    r = transport.send(interaction.request())
+                    size += sum(len(c) for c in r.iter_content(65536))
+                    r.close()
+                else:
+                    transport.call(
+                        interaction.name,
+                        interaction.method,
+                        interaction.url,
+                        params=interaction.params,
+                        headers=interaction.headers,
+                        data=interaction.data,
+                        response=interaction.response_kind,
+                    )
+                    size += len(interaction.body)
+                calls += 1
+            except Exception:
+                errors += 1
+        with lock:
+            stats.calls += calls
+            stats.errors += errors
+            stats.bytes += size
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(client, range(clients)))
+    stats.seconds = time.monotonic() - start
+    return stats
@@ -0,0 +1,219 @@
+"""The chain graphs of Chainweb versions and local validation of cuts and block headers.
+
+Every chain of a chainweb has a fixed set of adjacent chains, given by the chain graph of the version at the height of a block. A block header references the parent headers of its adjacent chains, and the blocks of a cut are pairwise concurrent: the heights of two chains differ by at most their distance in the chain graph.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+PETERSEN_GRAPH = {
+    0: (2, 3, 5),
+    1: (3, 4, 6),
+    2: (0, 4, 7),
+    3: (0, 1, 8),
+    4: (1, 2, 9),
+    5: (0, 6, 9),
+    6: (1, 5, 7),
+    7: (2, 6, 8),
+    8: (3, 7, 9),
+    9: (4, 5, 8),
+}
+
+TWENTY_CHAIN_GRAPH = {
+    0: (5, 10, 15),
+    1: (6, 11, 16),
+    2: (7, 12, 17),
+    3: (8, 13, 18),
+    4: (9, 14, 19),
+    5: (0, 7, 8),
+    6: (1, 8, 9),
+    7: (2, 5, 9),
+    8: (3, 5, 6),
+    9: (4, 6, 7),
+    10: (0, 11, 19),
+    11: (1, 10, 12),
+    12: (2, 11, 13),
+    13: (3, 12, 14),
+    14: (4, 13, 15),
+    15: (0, 14, 16),
+    16: (1, 15, 17),
+    17: (2, 16, 18),
+    18: (3, 17, 19),
+    19: (4, 10, 18),
+}
+
+GRAPH_HISTORIES = {
+    "mainnet01": ((0, PETERSEN_GRAPH), (852054, TWENTY_CHAIN_GRAPH)),
+    "testnet04": ((0, PETERSEN_GRAPH), (332604, TWENTY_CHAIN_GRAPH)),
+}
+
+
+class Graph(object):
+    """One chain graph with its adjacency and the distances between all chains, computed once.
+
+    Args:
+        `adjacents` (Dict[int, Iterable[int]]): The adjacent chains of every chain.
+    """
+
+    __slots__ = ("adjacents", "chains", "distances")
+
+    def __init__(self, adjacents: Dict[int, Iterable[int]]):
+        self.adjacents: Dict[int, FrozenSet[int]] = {
+            int(c): frozenset(int(a) for a in adj)
+            for c, adj in adjacents.items()
+        }
+        self.chains: FrozenSet[int] = frozenset(self.adjacents)
+        for chain, adj in self.adjacents.items():
+            if not adj <= self.chains or chain in adj:
+                raise ValueError(f"Invalid adjacent chains of chain {chain}")
+            for a in adj:
+                if chain not in self.adjacents[a]:
+                    raise ValueError(f"Chain graph is not symmetric at {chain}")
+        self.distances: Dict[int, Dict[int, int]] = {
+            chain: self._distances(chain) for chain in self.adjacents
+        }
+        if any(len(d) != len(self.chains) for d in self.distances.values()):
+            raise ValueError("Chain graph is not connected")
+
+    def _distances(self, start: int) -> Dict[int, int]:
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            chain = queue.popleft()
+            for a in self.adjacents[chain]:
+                if a not in distances:
+                    distances[a] = distances[chain] + 1
+                    queue.append(a)
+        return distances
+
+    @property
+    def diameter(self) -> int:
+        return max(max(d.values()) for d in self.distances.values())
+
+    def __len__(self) -> int:
+        return len(self.chains)
+
+    def __repr__(self) -> str:
+        return f"Graph({len(self.chains)} chains)"
+
+
+class ChainGraph(object):
+    """The chain graph history of a Chainweb version.
+
+    Build it with `from_config` from `ConfigEndpoints.get_config`, with `from_info` from the `nodeGraphHistory` of `MiscellaneousEndpoints.general_node_info`, or from a list of (fork height, adjacency) pairs.
+
+    Args:
+        `history` (Iterable[Tuple[int, Dict[int, Iterable[int]]]]): The chain graphs and the block heights from which they apply.
+    """
+
+    def __init__(self, history: Iterable[Tuple[int, Dict[int, Iterable]]]):
+        history = sorted((int(h), g) for h, g in history)
+        if not history or history[0][0] != 0:
+            raise ValueError("Chain graph history must start at height 0")
+        self.heights: List[int] = [h for h, _ in history]
+        self.graphs: List[Graph] = [Graph(g) for _, g in history]
+
+    @classmethod
+    def for_version(cls, version: str) -> "ChainGraph":
+        """The chain graph history of a known Chainweb version, "mainnet01" or "testnet04"."""
+        if version not in GRAPH_HISTORIES:
+            raise ValueError(
+                f"Unknown chainweb version {version!r}, use ChainGraph.from_info"
+            )
+        return cls(GRAPH_HISTORIES[version])
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ChainGraph":
+        """The chain graph history of the version in a node config, see `ConfigEndpoints.get_config`."""
+        return cls.for_version(config["chainwebVersion"])
+
+    @classmethod
+    def from_info(cls, info: dict) -> "ChainGraph":
+        """The chain graph history in node info, see `MiscellaneousEndpoints.general_node_info`."""
+        return cls(
+            (height, {c: adj for c, adj in graph})
+            for height, graph in info["nodeGraphHistory"]
+        )
+
+    def at(self, height: int) -> Graph:
+        """The chain graph at a block height."""
+        return self.graphs[bisect_right(self.heights, height) - 1]
+
+    @property
+    def latest(self) -> Graph:
+        return self.graphs[-1]
+
+    @property
+    def chains(self) -> FrozenSet[int]:
+        """The chains of the latest graph, which include the chains of all earlier graphs."""
+        return self.latest.chains
+
+    def cut_errors(self, cut: dict) -> List[str]:
+        """Check that a cut has one block for every chain and that its blocks are pairwise concurrent.
+
+        The heights of two chains may differ at most by their distance in the chain graph at the lowest height of the cut.
+
+        Args:
+            `cut` (dict): A cut, see `CutEndpoints.get_current_cut`.
+
+        Returns:
+            List[str]: The problems found, empty if the cut is valid.
+        """
+        heights = {int(c): b["height"] for c, b in cut["hashes"].items()}
+        if not heights:
+            return ["Cut has no chains"]
+        graph = self.at(min(heights.values()))
+
+        errors = []
+        missing = graph.chains - heights.keys()
+        if missing:
+            errors.append(f"Cut misses chains {sorted(missing)}")
+        unknown = heights.keys() - self.chains
+        if unknown:
+            errors.append(f"Cut has unknown chains {sorted(unknown)}")
+
+        chains = sorted(graph.chains & heights.keys())
+        for i, a in enumerate(chains):
+            distances = graph.distances[a]
+            height = heights[a]
+            for b in chains[i + 1 :]:
+                if abs(height - heights[b]) > distances[b]:
+                    errors.append(
+                        f"Chains {a} at {height} and {b} at {heights[b]} are not concurrent"
+                    )
+        return errors
+
+    def header_errors(self, headers: Iterable) -> List[Tuple[int, str]]:
+        """Check the chain ids and adjacent parents of block headers.
+
+        Args:
+            `headers` (Iterable): Header objects as returned by the header endpoints, or `chainwebpy.header.BlockHeader` records.
+
+        Returns:
+            List[Tuple[int, str]]: The index of every invalid header with its problem, empty if all headers are valid.
+        """
+        errors = []
+        for i, h in enumerate(headers):
+            if isinstance(h, dict):
+                chain, height = h["chainId"], h["height"]
+                adjacents = {int(c) for c in h["adjacents"]}
+            else:
+                chain, height = h.chainId, h.height
+                adjacents = set(h.adjacents)
+
+            graph = self.at(height)
+            expected = graph.adjacents.get(chain)
+            if expected is None:
+                errors.append((i, f"Unknown chain {chain} at height {height}"))
+            elif adjacents != expected:
+                errors.append(
+                    (
+                        i,
+                        f"Chain {chain} at height {height} has adjacents {sorted(adjacents)}, expected {sorted(expected)}",
+                    )
+                )
+        return errors
+
+    def __repr__(self) -> str:
+        return f"ChainGraph({list(zip(self.heights, self.graphs))!r})"
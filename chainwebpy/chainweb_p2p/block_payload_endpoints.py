@@ -1,172 +1,116 @@
-import requests
-from typing import Union
-from chainwebpy.url import (
-    GenericNodeAPIEndpoint,
-    P2PBootstrapAPIEndpoint,
-    ServiceAPIEndpoint,
+from chainwebpy import payload
+from chainwebpy.spec import EndpointGroup, EndpointSpec, Param
+
+_SCHEMA = Param(
+    "responseSchema",
+    str,
+    "accept",
+    default="object",
+    choices=("object", "lazy"),
 )
-import json
-from typing import List
 
+_ACCEPT = {
+    "object": ("application/json", "json"),
+    "lazy": ("application/json", "json", payload.lazy_payload),
+}
 
-class BlockPayloadEndpoints:
+_BATCH_ACCEPT = {
+    "object": ("application/json", "json"),
+    "lazy": ("application/json", "json", payload.lazy_batch),
+}
+
+
+class BlockPayloadEndpoints(EndpointGroup):
     """Raw literal Block Payloads in the form in which they are stored on the chain. By default only the payload data is returned which is sufficient for validating the blockchain Merkle Tree. It is also sufficient as input to Pact for executing the Pact transactions of the block and recomputing the outputs.
 
     It is also possible to query the transaction outputs along with the payload data.
 
     """
 
-    def __init__(
-        self,
-        api: Union[
-            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
-        ],
-    ):
-        self.node = api
-
-    def set_node_endpoint(
-        self,
-        api: Union[
-            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
-        ],
-    ):
-        """Set the node url that serves endpoints.
-
-        Args:
-            `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
-        """
-        self.node = api
-
-    def get_block_payload(self, chain: int, payloadHash: str):
-        """Get block payload.
+    get_block_payload = EndpointSpec(
+        "GET",
+        "/chain/{chain}/payload/{payloadHash}",
+        Param("chain", int, "path"),
+        Param("payloadHash", str, "path"),
+        _SCHEMA,
+        accept=_ACCEPT,
+        doc="""Get block payload.
 
         Args:
             `chain` (int): The id of the chain to which the request is sent.
             `payloadHash` (str): Payload hash of a block.
+            `responseSchema` (str, optional): "object" returns payload objects and "lazy" `chainwebpy.payload.Payload` wrappers that decode transactions and outputs on first access. Defaults to "object".
 
         Raises:
             `TypeError`: If chain is not an integer or payloadHash is not a string.
-            `ValueError`: If chain is less than 0 or payloadHash is not a valid base 64 url encoded string.
+            `ValueError`: If chain is less than 0 or responseSchema is not one of "object" or "lazy".
             `Exception`: If the request fails.
-        """
-        _payload = {}
-        if not isinstance(chain, int):
-            raise TypeError("chain must be an integer")
-
-        elif chain < 0:
-            raise ValueError("chain must be greater than 0")
-
-        if not isinstance(payloadHash, str):
-            raise TypeError("payloadHash must be an string")
-
-        _headers = {"Content-type": "application/json"}
-        _endpoint = self.node.endpoint + f"/chain/{chain}/payload/{payloadHash}"
-        r = requests.get(_endpoint, params=_payload, headers=_headers)
-        if r.status_code != 200:
-            raise Exception(f"Status {r.status_code}: {r.text}")
-
-        return r.json()
-
-    def get_batch_of_block_payload(self, chain: int, payloadHashes: list):
-        """Get batch of block payloads.
+        """,
+    )
+
+    get_batch_of_block_payload = EndpointSpec(
+        "POST",
+        "/chain/{chain}/payload/batch",
+        Param("chain", int, "path"),
+        Param("payloadHashes", list, "body"),
+        _SCHEMA,
+        accept=_BATCH_ACCEPT,
+        stream="array",
+        doc="""Get batch of block payloads.
 
         Args:
             `chain` (int): The id of the chain to which the request is sent.
-            `payloadHashes` (list): A list of block payload hashes (Base64Url -without padding- encoded block payload hash).
+            `payloadHashes` (List[str]): A list of block payload hashes (Base64Url -without padding- encoded block payload hash).
+            `responseSchema` (str, optional): "object" returns payload objects and "lazy" `chainwebpy.payload.Payload` wrappers, sharing one base64 decode per batch, that decode transactions and outputs on first access. Defaults to "object".
+            `stream` (bool, optional): Return a `chainwebpy.stream.ItemStream` that yields the payloads one at a time while the batch is downloaded instead of the whole batch. Defaults to False.
 
         Raises:
             `TypeError`: If chain is not an integer or payloadHashes is not a list.
-            `ValueError`: If chain is less than 0.
-            `HTTPError`: If the request fails.
-        """
-        _data = {}
-        if not isinstance(chain, int):
-            raise TypeError("chain must be an integer")
-
-        elif chain < 0:
-            raise ValueError("chain must be greater than 0")
-
-        if not isinstance(payloadHashes, list):
-            raise TypeError("payloadHashes must be a list of strings")
-
-        _endpoint = self.node.endpoint + f"/chain/{chain}/payload/batch"
-
-        _headers = {"Content-type": "application/json"}
-        _data = payloadHashes
-        r = requests.post(_endpoint, headers=_headers, data=json.dumps(_data))
-        if r.status_code != 200:
-            raise Exception(f"Status {r.status_code}: {r.text}")
-
-        return r.json()
-
-    def get_block_payload_with_outputs(
-        self, chain: int, payloadHash: str
-    ) -> dict:
-        """Get block payload with outputs.
+            `ValueError`: If chain is less than 0 or responseSchema is not one of "object" or "lazy", or stream is set with responseSchema "lazy".
+            `Exception`: If the request fails.
+        """,
+    )
+
+    get_block_payload_with_outputs = EndpointSpec(
+        "GET",
+        "/chain/{chain}/payload/{payloadHash}/outputs",
+        Param("chain", int, "path"),
+        Param("payloadHash", str, "path", query=True),
+        _SCHEMA,
+        accept=_ACCEPT,
+        doc="""Get block payload with outputs.
 
         Args:
             `chain` (int): The id of the chain to which the request is sent.
             `payloadHash` (str): Payload hash of a block.
+            `responseSchema` (str, optional): "object" returns payload objects and "lazy" `chainwebpy.payload.Payload` wrappers that decode transactions and outputs on first access. Defaults to "object".
 
         Raises:
             `TypeError`: If chain is not an integer or payloadHash is not a string.
-            `ValueError`: If chain is less than 0.
+            `ValueError`: If chain is less than 0 or responseSchema is not one of "object" or "lazy".
             `Exception`: If the request fails.
-        """
-        _payload = {}
-        if not isinstance(chain, int):
-            raise TypeError("chain must be an integer")
-
-        elif chain < 0:
-            raise ValueError("chain must be greater than 0")
-
-        if not isinstance(payloadHash, str):
-            raise TypeError("payloadHash must be an string")
-
-        _payload["payloadHash"] = payloadHash
-        _headers = {"Content-type": "application/json"}
-
-        _endpoint = (
-            self.node.endpoint + f"/chain/{chain}/payload/{payloadHash}/outputs"
-        )
-        r = requests.get(_endpoint, params=_payload, headers=_headers)
-        if r.status_code != 200:
-            raise Exception(f"Status {r.status_code}: {r.text}")
-        return r.json()
-
-    def get_batch_of_block_payload_with_outputs(
-        self, chain: int, payloadHashes: List[str]
-    ):
-        """Get batch of block payloads with outputs.
+        """,
+    )
+
+    get_batch_of_block_payload_with_outputs = EndpointSpec(
+        "POST",
+        "/chain/{chain}/payload/outputs/batch",
+        Param("chain", int, "path"),
+        Param("payloadHashes", list, "body"),
+        _SCHEMA,
+        accept=_BATCH_ACCEPT,
+        stream="array",
+        doc="""Get batch of block payloads with outputs.
 
         Args:
             `chain` (int): The id of the chain to which the request is sent.
             `payloadHashes` (List[str]): Array of strings (Base64Url -without padding- encoded block payload hash).
+            `responseSchema` (str, optional): "object" returns payload objects and "lazy" `chainwebpy.payload.Payload` wrappers, sharing one base64 decode per batch, that decode transactions and outputs on first access. Defaults to "object".
+            `stream` (bool, optional): Return a `chainwebpy.stream.ItemStream` that yields the payloads one at a time while the batch is downloaded instead of the whole batch. Defaults to False.
 
         Raises:
             `TypeError`: If chain is not an integer or payloadHashes is not a list.
-            `ValueError`: If chain is less than 0.
+            `ValueError`: If chain is less than 0 or responseSchema is not one of "object" or "lazy", or stream is set with responseSchema "lazy".
             `Exception`: If the request fails.
-        """
-        _payload = {}
-        _data = {}
-        if not isinstance(chain, int):
-            raise TypeError("chain must be an integer")
-
-        elif chain < 0:
-            raise ValueError("chain must be greater than 0")
-
-        if not isinstance(payloadHashes, list):
-            raise TypeError("payloadHashes must be a list of strings")
-
-        _endpoint = self.node.endpoint + f"/chain/{chain}/payload/outputs/batch"
-
-        _headers = {"Content-type": "application/json"}
-        _data = payloadHashes
-        r = requests.post(
-            _endpoint, params=_payload, headers=_headers, data=json.dumps(_data)
-        )
-        if r.status_code != 200:
-            raise Exception(f"Status {r.status_code}: {r.text}")
-
-        return r.json()
+        """,
+    )
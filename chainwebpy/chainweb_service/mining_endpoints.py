@@ -1,45 +1,27 @@
-import requests
-from typing import Union
-from chainwebpy.url import (
-    GenericNodeAPIEndpoint,
-    P2PBootstrapAPIEndpoint,
-    ServiceAPIEndpoint,
-)
-import json
-from typing import List
+from chainwebpy.spec import EndpointGroup, EndpointSpec, Param
 
 
-class MiningEndpoints:
+class MiningEndpoints(EndpointGroup):
     """The Mining API of Chainweb node is disabled by default. It can be enabled and configured in the configuration file.
 
     The mining API consists of the following endpoints that are described in detail on the Chainweb mining wiki page.
     """
 
-    def __init__(
-        self,
-        api: Union[
-            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
-        ],
-    ):
-        self.node = api
-
-    def set_node_endpoint(
-        self,
-        api: Union[
-            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
-        ],
-    ):
-        """Set the node url that serves endpoints.
-
-        Args:
-            `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
-        """
-        self.node = api
-
-    def get_mining_work(
-        self, account: str, publicKeys: List[str], predicate: str = "keys-all"
-    ):
-        """Get mining work.
+    get_mining_work = EndpointSpec(
+        "GET",
+        "/mining/work",
+        Param("account", str, "field"),
+        Param("publicKeys", list, "field", wire="public-keys"),
+        Param(
+            "predicate",
+            str,
+            "field",
+            default="keys-all",
+            choices=("keys-all", "keys-any"),
+        ),
+        accept="application/octet-stream",
+        response="bytes",
+        doc="""Get mining work.
 
         Args:
             `account` (str): The account name.
@@ -48,40 +30,21 @@ class MiningEndpoints:
 
         Raises:
             `TypeError`: If account is not a string or publicKeys is not a list or predicate is not a string.
+            `ValueError`: If predicate is not one of "keys-all" or "keys-any".
             `Exception`: If the request fails.
 
         Returns:
-            dict: Mining work.
-        """
-        _payload = {}
-        _data = {}
-        if not isinstance(account, str):
-            raise TypeError("account must be a string")
-
-        if not isinstance(publicKeys, list):
-            raise TypeError("publicKeys must be a list of strings")
-
-        if not isinstance(predicate, str):
-            raise TypeError("predicate must be a string")
-
-        elif predicate not in ["keys-all", "keys-any"]:
-            raise ValueError("predicate must be either keys-all or keys-any")
-
-        _endpoint = self.node.endpoint + f"/mining/work/{account}"
-        _headers = {"Content-type": "application/json"}
-        _data["account"] = account
-        _data["predicate"] = predicate
-        _data["public-keys"] = publicKeys
-        r = requests.get(
-            _endpoint, params=_payload, headers=_headers, data=json.dumps(_data)
-        )
-        if r.status_code != 200:
-            raise Exception(f"Status {r.status_code}: {r.text}")
-
-        return r.json()
-
-    def solved_mining_work(self, workHeaderBytes: bytes):
-        """Solved mining work.
+            bytes: Mining work. The 4 bytes chain id, the 32 bytes PoW target and the 286 work header bytes.
+        """,
+    )
+
+    solved_mining_work = EndpointSpec(
+        "POST",
+        "/mining/solved",
+        Param("workHeaderBytes", bytes, "raw"),
+        content_type="application/octet-stream",
+        response="none",
+        doc="""Solved mining work.
 
         Args:
             `workHeaderBytes` (bytes): The solved PoW work header bytes
@@ -95,18 +58,5 @@ class MiningEndpoints:
         Raises:
             `TypeError`: If workHeaderBytes is not bytes.
             `Exception`: If the request fails.
-        """
-        _payload = {}
-        if not isinstance(workHeaderBytes, bytes):
-            raise TypeError("workHeaderBytes must be bytes")
-
-        _endpoint = self.node.endpoint + "/mining/solved"
-        _headers = {"Content-type": "application/octet-stream"}
-        _data = workHeaderBytes
-        r = requests.post(
-            _endpoint, params=_payload, headers=_headers, data=json.dumps(_data)
-        )
-        if r.status_code != 200:
-            raise Exception(f"Status {r.status_code}: {r.text}")
-
-        return r.json()
+        """,
+    )
@@ -1,31 +1,60 @@
-from typing import Union
-from chainwebpy.url import (
-    GenericNodeAPIEndpoint,
-    P2PBootstrapAPIEndpoint,
-    ServiceAPIEndpoint,
-)
-
-
-class PactEndpoints:
-    """Will be implemented soon."""
-
-    def __init__(
-        self,
-        api: Union[
-            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
-        ],
-    ):
-        self.node = api
-
-    def set_node_endpoint(
-        self,
-        api: Union[
-            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
-        ],
-    ):
-        """Set the node url that serves endpoints.
+from chainwebpy.spec import EndpointGroup, EndpointSpec, Param
+
+
+class PactEndpoints(EndpointGroup):
+    """The Pact API of a chain. Only the local and SPV endpoints are implemented yet."""
+
+    local = EndpointSpec(
+        "POST",
+        "/chain/{chain}/pact/api/v1/local",
+        Param("chain", int, "path"),
+        Param("command", None, "body"),
+        Param("preflight", str, default=None, choices=("true", "false")),
+        Param(
+            "signatureVerification",
+            str,
+            default=None,
+            choices=("true", "false"),
+        ),
+        doc="""Execute a command on the latest state of a chain without sending it to the mempool, e.g. a read-only query.
 
         Args:
-            `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
-        """
-        self.node = api
+            `chain` (int): The id of the chain.
+            `command` (dict): The command: "hash", "sigs" and "cmd", the JSON encoded command payload, see `chainwebpy.local.command`.
+            `preflight` (str, optional): "true" to run the command like a transaction in a new block, with its gas buying and signature checks. Defaults to None, "false".
+            `signatureVerification` (str, optional): "false" to skip the signature checks. Defaults to None, "true".
+
+        Raises:
+            `TypeError`: If chain is not an integer or preflight or signatureVerification is not a string.
+            `ValueError`: If chain is less than 0 or preflight or signatureVerification is not "true" or "false".
+            `Exception`: If the request fails.
+
+        Returns:
+            dict: The command result: "reqKey", "result" ("status" and "data" or "error"), "gas", "logs", "metaData" (with the "blockHeight" of the state) and more.
+        """,
+    )
+
+    spv = EndpointSpec(
+        "POST",
+        "/chain/{chain}/pact/api/v1/spv",
+        Param("chain", int, "path"),
+        Param("requestKey", str, "field"),
+        Param("targetChainId", str, "field"),
+        doc="""Create an SPV proof of the output of a transaction for a target chain.
+
+        The target chain must have reached the height of the first block that depends on the block of the transaction, otherwise the node returns an error.
+
+        Args:
+            `chain` (int): The id of the chain of the transaction.
+            `requestKey` (str): The request key of the transaction (Base64Url -without padding- encoded).
+            `targetChainId` (str): The id of the chain on which the proof is used, e.g. "1".
+
+        Raises:
+            `TypeError`: If chain is not an integer or requestKey or targetChainId is not a string.
+            `ValueError`: If chain is less than 0.
+            `Exception`: If the request fails.
+
+        Returns:
+            str: The proof (Base64Url -without padding- encoded JSON object), see `chainwebpy.spv.SpvProof`.
+        """,
+    )
@@ -0,0 +1,141 @@
+from typing import Union
+
+from chainwebpy.transport import Transport, default_transport
+from chainwebpy.url import (
+    GenericNodeAPIEndpoint,
+    P2PBootstrapAPIEndpoint,
+    ServiceAPIEndpoint,
+)
+
+
+class _EndpointGroup(object):
+    """An endpoint group attribute of `ChainwebClient`.
+
+    The endpoint module is imported and the endpoint object built on first access. The object is then stored in the instance dict, so later accesses are plain attribute lookups.
+    """
+
+    def __init__(self, module: str, cls: str):
+        self.module = module
+        self.cls = cls
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, client, owner=None):
+        if client is None:
+            return self
+
+        module = __import__(self.module, fromlist=(self.cls,))
+        group = getattr(module, self.cls)(
+            client.node, client.transport, chains=client.chains
+        )
+        client.__dict__[self.name] = group
+        return group
+
+
+class ChainwebClient(object):
+    """One node and transport configuration shared by every endpoint group.
+
+    Endpoint groups are built on first use, so creating a client imports none of the endpoint modules and `requests` is only imported when the first request is sent.
+
+    ```
+    cw = ChainwebClient(ServiceAPIEndpoint("mainnet"))
+    cw.cut.get_current_cut()
+    cw.headers.get_block_headers(chain=0, limit=10)
+    ```
+
+    Args:
+        `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
+        `transport` (Transport, optional): The transport of every endpoint group. Defaults to the shared default transport.
+    """
+
+    GROUPS = (
+        "cut",
+        "hashes",
+        "headers",
+        "payloads",
+        "mempool",
+        "peers",
+        "config",
+        "mining",
+        "misc",
+        "pact",
+    )
+
+    cut = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.cut_endpoints", "CutEndpoints"
+    )
+    hashes = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.block_hashes_endpoints", "BlockHashesEndpoints"
+    )
+    headers = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.block_header_endpoints", "BlockHeaderEndpoints"
+    )
+    payloads = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.block_payload_endpoints",
+        "BlockPayloadEndpoints",
+    )
+    mempool = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.mempool_endpoints", "MempoolEndpoints"
+    )
+    peers = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.peer_endpoints", "PeerEndpoints"
+    )
+    config = _EndpointGroup(
+        "chainwebpy.chainweb_p2p.config_endpoints", "ConfigEndpoints"
+    )
+    mining = _EndpointGroup(
+        "chainwebpy.chainweb_service.mining_endpoints", "MiningEndpoints"
+    )
+    misc = _EndpointGroup(
+        "chainwebpy.chainweb_service.miscellaneous_endpoints",
+        "MiscellaneousEndpoints",
+    )
+    pact = _EndpointGroup(
+        "chainwebpy.chainweb_service.pact_endpoints", "PactEndpoints"
+    )
+
+    def __init__(
+        self,
+        api: Union[
+            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
+        ],
+        transport: Transport = None,
+    ):
+        self.node = api
+        self.transport = (
+            transport if transport is not None else default_transport()
+        )
+        self.chains = None
+
+    def set_node_endpoint(
+        self,
+        api: Union[
+            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
+        ],
+    ):
+        """Set the node url that serves endpoints, for this client and every endpoint group already built.
+
+        Args:
+            `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
+        """
+        self.node = api
+        for name in self.GROUPS:
+            group = self.__dict__.get(name)
+            if group is not None:
+                group.set_node_endpoint(api)
+
+    def set_chain_graph(self, graph):
+        """Check chain arguments locally against a chain graph, in every endpoint group.
+
+        Args:
+            `graph` (ChainGraph): The chain graph of the node, see `chainwebpy.chain_graph`, or None to stop checking.
+        """
+        self.chains = graph.chains if graph is not None else None
+        for name in self.GROUPS:
+            group = self.__dict__.get(name)
+            if group is not None:
+                group.chains = self.chains
+
+    def __repr__(self) -> str:
+        return f"ChainwebClient({self.node.endpoint!r})"
@@ -0,0 +1,255 @@
+"""Difficulty, block time and hashrate series of header history.
+
+`HeaderAnalytics` collects the height, creation time, epoch start, target and weight of headers of any chain into numpy columns (`pip install chainweb.py[numpy]`) and computes per chain series of difficulty, block times and hashrate, rolling windows over them, per epoch statistics and the hashrate of the whole network. Headers are added incrementally; the series of a chain are computed once and cached until headers of that chain are added.
+
+```
+analytics = HeaderAnalytics()
+for chain, headers in BulkDownloader(cw.headers, responseSchema="records").iter(range(20), 4_000_000, 4_100_000):
+    analytics.add(headers)
+analytics.rolling(0, 120)["hashrate"]
+analytics.network_hashrate(3600)
+```
+
+Targets and weights are 256 bit integers; they are converted to float64, which keeps about 16 significant digits.
+"""
+
+import threading
+from typing import Dict, Iterable, List
+
+from chainwebpy.header import unb64url
+
+_COLUMNS = ("height", "time", "epoch", "difficulty", "weight")
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "numpy is required for header analytics: pip install chainweb.py[numpy]"
+        ) from None
+    return np
+
+
+def uint256(values):
+    """Little endian 256 bit integers as float64.
+
+    Args:
+        `values` (Union[bytes, numpy.ndarray]): Consecutive 32 bytes values, or an array of shape (n, 32) of bytes.
+    """
+    np = _numpy()
+    if not isinstance(values, bytes):
+        values = np.ascontiguousarray(values).tobytes()
+    words = np.frombuffer(values, "<u8")
+    scale = 2.0 ** np.arange(0, 256, 64)
+    return words.reshape(-1, 4).astype(float) @ scale
+
+
+def difficulty(targets):
+    """The difficulty of PoW targets, the expected number of hashes to solve a block.
+
+    Args:
+        `targets` (Union[bytes, numpy.ndarray]): Consecutive 32 bytes targets, or an array of shape (n, 32) of bytes.
+    """
+    return 2.0**256 / uint256(targets)
+
+
+def header_arrays(headers) -> Dict[str, object]:
+    """The analytics columns of headers: chain, height, time (creation time in microseconds), epoch (epoch start in microseconds), difficulty and weight.
+
+    Args:
+        `headers` (Union[dict, Iterable, numpy.ndarray]): A header page, a list of header objects or `chainwebpy.header.BlockHeader` records, or a structured array of binary headers.
+    """
+    np = _numpy()
+    if isinstance(headers, dict):
+        headers = headers["items"]
+    if isinstance(headers, np.ndarray):
+        return {
+            "chain": headers["chainId"].astype("<i8"),
+            "height": headers["height"].astype("<i8"),
+            "time": headers["creationTime"].astype("<i8"),
+            "epoch": headers["epochStart"].astype("<i8"),
+            "difficulty": difficulty(headers["target"]),
+            "weight": uint256(headers["weight"]),
+        }
+
+    headers = list(headers)
+    if headers and isinstance(headers[0], dict):
+        fields = [
+            (h["chainId"], h["height"], h["creationTime"], h["epochStart"])
+            for h in headers
+        ]
+        targets = b"".join(unb64url(h["target"]) for h in headers)
+        weights = b"".join(unb64url(h["weight"]) for h in headers)
+    else:
+        fields = [
+            (h.chainId, h.height, h.creationTime, h.epochStart) for h in headers
+        ]
+        targets = b"".join(h.target for h in headers)
+        weights = b"".join(h.weight for h in headers)
+    columns = np.array(fields, dtype="<i8").reshape(-1, 4)
+    return {
+        "chain": columns[:, 0],
+        "height": columns[:, 1],
+        "time": columns[:, 2],
+        "epoch": columns[:, 3],
+        "difficulty": difficulty(targets),
+        "weight": uint256(weights),
+    }
+
+
+class HeaderAnalytics(object):
+    """Incrementally collected header columns of many chains and their derived series.
+
+    Headers may be added in any order and more than once; the series of a chain are ordered by height and keep the last added header of every height.
+    """
+
+    def __init__(self):
+        self._chunks: Dict[int, List[dict]] = {}
+        self._series: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, headers) -> int:
+        """Add headers, see `header_arrays` for the accepted forms.
+
+        Returns:
+            int: The number of headers added.
+        """
+        np = _numpy()
+        columns = header_arrays(headers)
+        chains = columns["chain"]
+        with self._lock:
+            for chain in np.unique(chains).tolist():
+                selected = chains == chain
+                self._chunks.setdefault(chain, []).append(
+                    {name: columns[name][selected] for name in _COLUMNS}
+                )
+                self._series.pop(chain, None)
+        return len(chains)
+
+    @property
+    def chains(self) -> List[int]:
+        return sorted(self._chunks)
+
+    def series(self, chain: int) -> dict:
+        """The series of a chain, ordered by height.
+
+        Returns:
+            dict: numpy arrays "height", "time", "epoch", "difficulty", "weight", "block_time" (seconds since the previous header, divided by the heights between them, NaN for the first) and "hashrate" (difficulty per block time, hashes per second).
+        """
+        with self._lock:
+            series = self._series.get(chain)
+            if series is not None:
+                return series
+            chunks = self._chunks.get(chain)
+            if not chunks:
+                raise ValueError(f"No headers of chain {chain}")
+            series = self._series[chain] = self._compute(chunks)
+            # Keep one merged chunk, so later additions concatenate less.
+            self._chunks[chain] = [{n: series[n] for n in _COLUMNS}]
+            return series
+
+    @staticmethod
+    def _compute(chunks: List[dict]) -> dict:
+        np = _numpy()
+        merged = {
+            name: np.concatenate([c[name] for c in chunks]) for name in _COLUMNS
+        }
+        # The last added header of every height wins.
+        heights = merged["height"][::-1]
+        _, last = np.unique(heights, return_index=True)
+        order = len(heights) - 1 - last
+        series = {name: merged[name][order] for name in _COLUMNS}
+
+        block_time = np.full(len(order), np.nan)
+        if len(order) > 1:
+            block_time[1:] = (
+                np.diff(series["time"]) / 1_000_000 / np.diff(series["height"])
+            )
+        series["block_time"] = block_time
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series["hashrate"] = series["difficulty"] / block_time
+        return series
+
+    def rolling(self, chain: int, window: int) -> dict:
+        """Series over the last `window` blocks at every height, from the running sums of the series.
+
+        Args:
+            `chain` (int): The id of the chain.
+            `window` (int): The number of blocks of a window.
+
+        Returns:
+            dict: numpy arrays "height" (the last height of every full window), "block_time" (mean seconds per block), "difficulty" (mean difficulty) and "hashrate" (the work of the window per second).
+        """
+        np = _numpy()
+        if window < 1:
+            raise ValueError("window must be greater than 0")
+        series = self.series(chain)
+        height, time = series["height"], series["time"]
+        if len(height) <= window:
+            empty = np.empty(0)
+            return {
+                "height": height[:0],
+                "block_time": empty,
+                "difficulty": empty,
+                "hashrate": empty,
+            }
+        work = np.concatenate(([0.0], np.cumsum(series["difficulty"])))
+        span = (time[window:] - time[:-window]) / 1_000_000
+        blocks = height[window:] - height[:-window]
+        total = work[window + 1 :] - work[1:-window]
+        return {
+            "height": height[window:],
+            "block_time": span / blocks,
+            "difficulty": total / window,
+            "hashrate": total / span,
+        }
+
+    def epochs(self, chain: int) -> dict:
+        """Statistics of every difficulty adjustment epoch of a chain.
+
+        Returns:
+            dict: numpy arrays "start" (epoch start time in microseconds), "height" (the first height seen in the epoch), "blocks" (the number of headers in the epoch), "difficulty" (the difficulty of the epoch's first header) and "block_time" (mean seconds per block within the epoch, NaN for epochs with a single header).
+        """
+        np = _numpy()
+        series = self.series(chain)
+        epoch = series["epoch"]
+        # Epoch boundaries are the indexes at which the epoch start changes.
+        starts = np.flatnonzero(np.r_[True, epoch[1:] != epoch[:-1]])
+        ends = np.r_[starts[1:], len(epoch)] - 1
+        time, height = series["time"], series["height"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block_time = (
+                (time[ends] - time[starts])
+                / 1_000_000
+                / (height[ends] - height[starts])
+            )
+        return {
+            "start": epoch[starts],
+            "height": height[starts],
+            "blocks": ends - starts + 1,
+            "difficulty": series["difficulty"][starts],
+            "block_time": block_time,
+        }
+
+    def network_hashrate(self, seconds: float, chains: Iterable[int] = None):
+        """The hashrate of all chains per time window: the difficulty of the blocks created within a window, summed over chains, per second.
+
+        Args:
+            `seconds` (float): The length of a window in seconds.
+            `chains` (Iterable[int], optional): The chains to sum. Defaults to every chain with headers.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The start times of the non-empty windows in microseconds and their hashrates.
+        """
+        np = _numpy()
+        if seconds <= 0:
+            raise ValueError("seconds must be greater than 0")
+        chains = self.chains if chains is None else list(chains)
+        series = [self.series(c) for c in chains]
+        time = np.concatenate([s["time"] for s in series])
+        work = np.concatenate([s["difficulty"] for s in series])
+        width = int(seconds * 1_000_000)
+        windows, index = np.unique(time // width, return_inverse=True)
+        total = np.bincount(index, weights=work, minlength=len(windows))
+        return windows * width, total / seconds
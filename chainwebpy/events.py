@@ -0,0 +1,284 @@
+"""Pact events of transaction outputs and aggregation of token transfers.
+
+`iter_events` yields the events of payloads with outputs one at a time. `Transfers` collects the `TRANSFER` events of a fungible token module, by default "coin", into compact columns and aggregates them with numpy (`pip install chainweb.py[numpy]`).
+
+```
+transfers = Transfers()
+for chain, page in BulkDownloader(cw.headers).iter(range(20), 0, 100_000):
+    payloads = cw.payloads.get_batch_of_block_payload_with_outputs(chain, [h["payloadHash"] for h in page], responseSchema="lazy")
+    transfers.add(iter_events(payloads, page, "coin.TRANSFER"))
+transfers.top(10, by="receiver")
+```
+"""
+
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from chainwebpy.header import b64url
+from chainwebpy.payload import Payload
+
+
+class PactEvent(
+    namedtuple("PactEvent", "chain height time request_key module name params")
+):
+    """An event of a transaction output.
+
+    `time` is the creation time of the block in microseconds and `module` the qualified module name, e.g. "coin" or "free.radio02".
+    """
+
+    __slots__ = ()
+
+    @property
+    def qualname(self) -> str:
+        return f"{self.module}.{self.name}"
+
+
+def _module(module: dict) -> str:
+    if module.get("namespace"):
+        return f"{module['namespace']}.{module['name']}"
+    return module["name"]
+
+
+def iter_events(
+    payloads: Iterable, headers: Iterable, event: str = None, coinbase=True
+) -> Iterator[PactEvent]:
+    """Yield the events of payloads with outputs in block and transaction order.
+
+    Args:
+        `payloads` (Iterable): Payloads with outputs, as objects or `chainwebpy.payload.Payload` wrappers.
+        `headers` (Iterable): The headers of the payloads, as objects or `chainwebpy.header.BlockHeader` records.
+        `event` (str, optional): Only yield events of this qualified name, e.g. "coin.TRANSFER". Defaults to None, every event.
+        `coinbase` (bool, optional): Include the events of the coinbase outputs. Defaults to True.
+    """
+    blocks: Dict[str, list] = {}
+    for h in headers:
+        if isinstance(h, dict):
+            block = (h["chainId"], h["height"], h["creationTime"])
+            blocks.setdefault(h["payloadHash"], []).append(block)
+        else:
+            block = (h.chainId, h.height, h.creationTime)
+            blocks.setdefault(b64url(h.payloadHash), []).append(block)
+
+    for payload in payloads:
+        if not isinstance(payload, Payload):
+            payload = Payload(payload)
+        found = blocks.get(payload.payloadHash)
+        if found is None:
+            raise ValueError(f"No header for payload {payload.payloadHash}")
+        outputs = payload.outputs
+        if outputs is None:
+            raise ValueError(
+                f"Payload {payload.payloadHash} was requested without outputs"
+            )
+        if coinbase:
+            outputs = [payload.coinbase] + outputs
+        for chain, height, time in found:
+            for output in outputs:
+                request_key = output.reqKey
+                for e in output.events:
+                    module = _module(e["module"])
+                    if event is not None and f"{module}.{e['name']}" != event:
+                        continue
+                    yield PactEvent(
+                        chain,
+                        height,
+                        time,
+                        request_key,
+                        module,
+                        e["name"],
+                        e["params"],
+                    )
+
+
+def _amount(value) -> float:
+    """A Pact decimal or integer as float."""
+    if isinstance(value, dict):
+        value = value.get("decimal", value.get("int"))
+    return float(value)
+
+
+def _transfer(params: list):
+    """The (sender, receiver, amount) of fungible `TRANSFER` params, or None for other shapes, e.g. the (token, sender, receiver, amount) of poly-fungible ledgers."""
+    if len(params) != 3:
+        return None
+    sender, receiver, amount = params
+    if not isinstance(sender, str) or not isinstance(receiver, str):
+        return None
+    if isinstance(amount, dict):
+        if "decimal" not in amount and "int" not in amount:
+            return None
+    elif isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        return None
+    try:
+        return sender, receiver, _amount(amount)
+    except (TypeError, ValueError):
+        return None
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "numpy is required for transfer aggregation: pip install chainweb.py[numpy]"
+        ) from None
+    return np
+
+
+_COLUMNS = {
+    "sender": "<i8",
+    "receiver": "<i8",
+    "amount": "<f8",
+    "time": "<i8",
+    "chain": "<i8",
+    "height": "<i8",
+}
+
+
+class Transfers(object):
+    """The transfers of `TRANSFER` events in compact columns.
+
+    Accounts are interned and stored as integer ids into `accounts`; the empty account of mints and burns is an account too. Columns are typed arrays that grow without per-event objects, and the aggregations run on numpy arrays of them.
+    """
+
+    __slots__ = (
+        "accounts",
+        "_ids",
+        "_sender",
+        "_receiver",
+        "_amount",
+        "_time",
+        "_chain",
+        "_height",
+    )
+
+    def __init__(self):
+        self.accounts: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._sender = array("q")
+        self._receiver = array("q")
+        self._amount = array("d")
+        self._time = array("q")
+        self._chain = array("q")
+        self._height = array("q")
+
+    def _id(self, account: str) -> int:
+        i = self._ids.get(account)
+        if i is None:
+            i = self._ids[account] = len(self.accounts)
+            self.accounts.append(account)
+        return i
+
+    def add(self, events: Iterable[PactEvent], module: str = "coin") -> int:
+        """Add the fungible `TRANSFER` events of an event stream, with a sender, a receiver and an amount, and skip all others, including the `TRANSFER` events of poly-fungible ledgers with a token id.
+
+        Args:
+            `events` (Iterable[PactEvent]): The events.
+            `module` (str, optional): Only add the transfers of this token module, since the amounts of different tokens do not add up. Defaults to "coin". None adds the transfers of every module.
+
+        Returns:
+            int: The number of transfers added.
+        """
+        count = 0
+        for e in events:
+            if e.name != "TRANSFER":
+                continue
+            if module is not None and e.module != module:
+                continue
+            transfer = _transfer(e.params)
+            if transfer is None:
+                continue
+            sender, receiver, amount = transfer
+            self._sender.append(self._id(sender))
+            self._receiver.append(self._id(receiver))
+            self._amount.append(amount)
+            self._time.append(e.time)
+            self._chain.append(e.chain)
+            self._height.append(e.height)
+            count += 1
+        return count
+
+    def __len__(self) -> int:
+        return len(self._amount)
+
+    def column(self, name: str):
+        """A numpy copy of one column: "sender", "receiver", "amount", "time", "chain" or "height"."""
+        np = _numpy()
+        if name not in _COLUMNS:
+            raise ValueError(f"Unknown column {name!r}")
+        # A copy, since a typed array cannot grow while a view of it exists.
+        values = getattr(self, "_" + name)
+        return np.frombuffer(values, dtype=_COLUMNS[name]).copy()
+
+    def columns(self) -> dict:
+        """Numpy copies of all columns."""
+        return {name: self.column(name) for name in _COLUMNS}
+
+    def _side(self, by: str):
+        if by not in ("sender", "receiver"):
+            raise ValueError('by must be one of "sender" or "receiver"')
+        return self.column(by)
+
+    def volume(self, by: str = "sender"):
+        """The summed amount of every account, indexed by account id.
+
+        Args:
+            `by` (str, optional): "sender" for outgoing and "receiver" for incoming volume. Defaults to "sender".
+        """
+        np = _numpy()
+        return np.bincount(
+            self._side(by),
+            weights=self.column("amount"),
+            minlength=len(self.accounts),
+        )
+
+    def count(self, by: str = "sender"):
+        """The number of transfers of every account, indexed by account id."""
+        np = _numpy()
+        return np.bincount(self._side(by), minlength=len(self.accounts))
+
+    def top(
+        self, k: int, by: str = "sender", stat: str = "volume"
+    ) -> List[Tuple[str, float]]:
+        """The k accounts with the highest volume or count, in descending order.
+
+        Args:
+            `k` (int): The number of accounts.
+            `by` (str, optional): "sender" or "receiver". Defaults to "sender".
+            `stat` (str, optional): "volume" or "count". Defaults to "volume".
+        """
+        np = _numpy()
+        if stat not in ("volume", "count"):
+            raise ValueError('stat must be one of "volume" or "count"')
+        values = self.volume(by) if stat == "volume" else self.count(by)
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+        best = np.argpartition(-values, k - 1)[:k]
+        best = best[np.argsort(-values[best], kind="stable")]
+        return [(self.accounts[i], values[i].item()) for i in best]
+
+    def windows(self, seconds: float, account: str = None, by: str = "sender"):
+        """The summed amount and count of transfers per time window.
+
+        Args:
+            `seconds` (float): The length of a window in seconds.
+            `account` (str, optional): Only count transfers of this account. Defaults to None, every transfer.
+            `by` (str, optional): The side of `account`, "sender" or "receiver". Defaults to "sender".
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: The start times of the non-empty windows in microseconds, and their volumes and counts.
+        """
+        np = _numpy()
+        if seconds <= 0:
+            raise ValueError("seconds must be greater than 0")
+        time, amount = self.column("time"), self.column("amount")
+        if account is not None:
+            selected = self._side(by) == self._ids.get(account, -1)
+            time, amount = time[selected], amount[selected]
+        width = int(seconds * 1_000_000)
+        windows, index = np.unique(time // width, return_inverse=True)
+        volume = np.bincount(index, weights=amount, minlength=len(windows))
+        count = np.bincount(index, minlength=len(windows))
+        return windows * width, volume, count
@@ -0,0 +1,311 @@
+"""Columnar export of block headers and transaction outputs.
+
+`ColumnarWriter` appends batches of rows to a Parquet file when pyarrow is installed (`pip install chainweb.py[parquet]`) and to a NumPy `.npz` archive otherwise. Rows are buffered up to one row group and then written, so exports of any size run in bounded memory. `read_columns` loads only the requested columns of either format.
+
+```
+with ColumnarWriter("headers", HEADER_COLUMNS) as headers, ColumnarWriter("outputs", OUTPUT_COLUMNS) as outputs:
+    for chain, page in BulkDownloader(cw.headers).iter(range(20), 0, 10000):
+        headers.write(header_columns(page))
+        batch = cw.payloads.get_batch_of_block_payload_with_outputs(chain, [h["payloadHash"] for h in page])
+        outputs.write(output_columns(batch, page))
+```
+"""
+
+import json
+import zipfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chainwebpy.header import b64url, unb64url
+
+HEADER_COLUMNS = (
+    ("chain", "int64"),
+    ("height", "int64"),
+    ("hash", "string"),
+    ("parent", "string"),
+    ("payload_hash", "string"),
+    ("creation_time", "int64"),
+    ("epoch_start", "int64"),
+    ("target", "string"),
+    ("weight", "string"),
+    ("nonce", "string"),
+    ("feature_flags", "int64"),
+)
+
+OUTPUT_COLUMNS = (
+    ("chain", "int64"),
+    ("height", "int64"),
+    ("request_key", "string"),
+    ("gas", "int64"),
+    ("status", "string"),
+    ("creation_time", "int64"),
+    ("tx_id", "int64"),
+)
+
+_NUMPY_TYPES = {"int64": "<i8", "string": "U"}
+
+
+def header_columns(headers: Iterable) -> Dict[str, list]:
+    """The `HEADER_COLUMNS` of block headers.
+
+    Args:
+        `headers` (Iterable): Header objects as returned by the header endpoints, or `chainwebpy.header.BlockHeader` records.
+    """
+    columns = {name: [] for name, _ in HEADER_COLUMNS}
+    for h in headers:
+        if isinstance(h, dict):
+            row = (
+                h["chainId"],
+                h["height"],
+                h["hash"],
+                h["parent"],
+                h["payloadHash"],
+                h["creationTime"],
+                h["epochStart"],
+                h["target"],
+                h["weight"],
+                h["nonce"],
+                h["featureFlags"],
+            )
+        else:
+            row = (
+                h.chainId,
+                h.height,
+                b64url(h.hash),
+                b64url(h.parent),
+                b64url(h.payloadHash),
+                h.creationTime,
+                h.epochStart,
+                b64url(h.target),
+                b64url(h.weight),
+                str(h.nonce),
+                h.featureFlags,
+            )
+        for (name, _), value in zip(HEADER_COLUMNS, row):
+            columns[name].append(value)
+    return columns
+
+
+def output_columns(
+    payloads: Iterable[dict], headers: Iterable
+) -> Dict[str, list]:
+    """The `OUTPUT_COLUMNS` of the transactions of payloads with outputs.
+
+    Payloads carry neither chain nor height, so they are matched to their headers by payload hash. The outputs of a payload are emitted for every header with its payload hash, e.g. for all blocks with the same empty payload, in header order; a payload given more than once is emitted once. `creation_time` is the creation time of the transaction in seconds, and `tx_id` is -1 for outputs without a transaction id.
+
+    Args:
+        `payloads` (Iterable[dict]): Payloads with outputs, e.g. from `get_batch_of_block_payload_with_outputs`.
+        `headers` (Iterable): The headers of the payloads, as objects or `BlockHeader` records.
+    """
+    blocks: Dict[str, List[Tuple[int, int]]] = {}
+    for h in headers:
+        if isinstance(h, dict):
+            key, block = h["payloadHash"], (h["chainId"], h["height"])
+        else:
+            key, block = b64url(h.payloadHash), (h.chainId, h.height)
+        # Headers that share a payload, e.g. an empty one, all get its rows.
+        found = blocks.setdefault(key, [])
+        if block not in found:
+            found.append(block)
+
+    columns = {name: [] for name, _ in OUTPUT_COLUMNS}
+    chains = columns["chain"]
+    heights = columns["height"]
+    request_keys = columns["request_key"]
+    gas = columns["gas"]
+    status = columns["status"]
+    creation_times = columns["creation_time"]
+    tx_ids = columns["tx_id"]
+    done = set()
+    for payload in payloads:
+        key = payload["payloadHash"]
+        found = blocks.get(key)
+        if found is None:
+            raise ValueError(f"No header for payload {key}")
+        if key in done:
+            continue
+        done.add(key)
+        rows = []
+        for tx, out in payload["transactions"]:
+            command = json.loads(unb64url(tx))
+            meta = json.loads(command["cmd"]).get("meta") or {}
+            output = json.loads(unb64url(out))
+            tx_id = output.get("txId")
+            rows.append(
+                (
+                    output["reqKey"],
+                    output["gas"],
+                    output["result"]["status"],
+                    meta.get("creationTime", 0),
+                    tx_id if tx_id is not None else -1,
+                )
+            )
+        for chain, height in found:
+            for request_key, used, result, created, tx_id in rows:
+                chains.append(chain)
+                heights.append(height)
+                request_keys.append(request_key)
+                gas.append(used)
+                status.append(result)
+                creation_times.append(created)
+                tx_ids.append(tx_id)
+    return columns
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ColumnarWriter(object):
+    """Appends rows to a columnar file in row groups.
+
+    Args:
+        `path` (str): The output file. The extension ".parquet" or ".npz" is added if missing.
+        `columns` (Tuple[Tuple[str, str]]): The column names and types, "int64" or "string", e.g. `HEADER_COLUMNS`.
+        `format` (str, optional): "parquet" (requires pyarrow) or "npz" (requires numpy). Defaults to "parquet" if pyarrow is installed, else "npz".
+        `row_group_size` (int, optional): The number of rows of a row group. Defaults to 65536.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        columns: Tuple[Tuple[str, str], ...],
+        format: str = None,
+        row_group_size: int = 65536,
+    ):
+        if format is None:
+            format = "parquet" if parquet_available() else "npz"
+        if format not in ("parquet", "npz"):
+            raise ValueError('format must be one of "parquet" or "npz"')
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be greater than 0")
+        if not path.endswith("." + format):
+            path = f"{path}.{format}"
+
+        self.path = path
+        self.columns = columns
+        self.format = format
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.row_groups = 0
+        self._buffer = {name: [] for name, _ in columns}
+        self._buffered = 0
+        self._file = None
+        if format == "parquet":
+            self._open_parquet()
+        else:
+            self._open_npz()
+
+    def _open_parquet(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "pyarrow is required for Parquet export: pip install chainweb.py[parquet]"
+            ) from None
+        types = {"int64": pa.int64(), "string": pa.string()}
+        self._schema = pa.schema(
+            [(name, types[kind]) for name, kind in self.columns]
+        )
+        self._table = pa.Table.from_pydict
+        self._file = pq.ParquetWriter(self.path, self._schema)
+
+    def _open_npz(self):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError(
+                "numpy is required for npz export: pip install chainweb.py[numpy]"
+            ) from None
+        self._np = np
+        self._file = zipfile.ZipFile(self.path, "w", allowZip64=True)
+
+    def write(self, columns: Dict[str, list]):
+        """Append rows, given as a map from column name to values.
+
+        Args:
+            `columns` (Dict[str, list]): Equally long value lists of every column, e.g. from `header_columns` or `output_columns`.
+        """
+        lengths = {len(columns[name]) for name, _ in self.columns}
+        if len(lengths) != 1:
+            raise ValueError("columns must have the same length")
+        count = lengths.pop()
+        start = 0
+        while start < count:
+            take = min(count - start, self.row_group_size - self._buffered)
+            for name, _ in self.columns:
+                self._buffer[name].extend(columns[name][start : start + take])
+            self._buffered += take
+            start += take
+            if self._buffered >= self.row_group_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered rows as one row group."""
+        if not self._buffered:
+            return
+        buffer = self._buffer
+        if self.format == "parquet":
+            self._file.write_table(self._table(buffer, schema=self._schema))
+        else:
+            np = self._np
+            for name, kind in self.columns:
+                array = np.array(buffer[name], dtype=_NUMPY_TYPES[kind])
+                entry = f"{name}/{self.row_groups:06d}.npy"
+                with self._file.open(entry, "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+        self.rows += self._buffered
+        self.row_groups += 1
+        self._buffer = {name: [] for name, _ in self.columns}
+        self._buffered = 0
+
+    def close(self):
+        """Write the remaining rows and close the file."""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_columns(path: str, columns: Optional[List[str]] = None) -> dict:
+    """Read columns of a file written by `ColumnarWriter` into numpy arrays.
+
+    Args:
+        `path` (str): The ".parquet" or ".npz" file.
+        `columns` (List[str], optional): The columns to read. Defaults to all columns.
+
+    Returns:
+        Dict[str, numpy.ndarray]: The columns.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=columns)
+        return {
+            name: table.column(name).to_numpy() for name in table.column_names
+        }
+
+    import numpy as np
+
+    groups = {}
+    with zipfile.ZipFile(path) as zf:
+        for entry in sorted(zf.namelist()):
+            name = entry.split("/", 1)[0]
+            if columns is not None and name not in columns:
+                continue
+            with zf.open(entry) as f:
+                groups.setdefault(name, []).append(
+                    np.lib.format.read_array(f, allow_pickle=False)
+                )
+    return {name: np.concatenate(arrays) for name, arrays in groups.items()}
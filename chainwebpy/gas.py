@@ -0,0 +1,313 @@
+"""Gas price estimation from recent blocks and the mempool.
+
+`GasEstimator` keeps, for every chain, the gas prices, gas limits and gas used of the transactions of a rolling window of recent blocks and the gas prices of the pending transactions of the mempool. Both are updated incrementally: `refresh` fetches only the blocks added since the previous refresh and looks up only the pending transactions it has not seen yet. Estimates are computed with numpy (`pip install chainweb.py[numpy]`) and cached until the next update, so repeated reads are dictionary lookups without any request.
+
+```
+gas = GasEstimator(window=200)
+gas.refresh(cw, chains=[0, 1])
+gas.price(0, blocks=3)  # a gas price to be included within 3 blocks
+```
+"""
+
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+
+from chainwebpy.payload import Payload
+
+MIN_GAS_PRICE = 1e-8
+
+_COLUMNS = ("price", "limit", "used")
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "numpy is required for gas estimation: pip install chainweb.py[numpy]"
+        ) from None
+    return np
+
+
+class _ChainWindow(object):
+    """The recent blocks and pending transactions of one chain."""
+
+    __slots__ = ("blocks", "pending", "_columns", "_minimums")
+
+    def __init__(self):
+        # height -> (prices, limits, used)
+        self.blocks: "OrderedDict[int, tuple]" = OrderedDict()
+        # request key -> gas price
+        self.pending: Dict[str, float] = {}
+        self._columns = None
+        self._minimums = None
+
+    @property
+    def height(self) -> int:
+        return next(reversed(self.blocks)) if self.blocks else -1
+
+    def changed(self):
+        self._columns = None
+        self._minimums = None
+
+    def columns(self) -> dict:
+        if self._columns is None:
+            np = _numpy()
+            blocks = list(self.blocks.values())
+            self._columns = {
+                name: np.concatenate(
+                    [np.asarray(b[i], dtype=float) for b in blocks]
+                    or [np.empty(0)]
+                )
+                for i, name in enumerate(_COLUMNS)
+            }
+        return self._columns
+
+    def minimums(self):
+        """The lowest included gas price of every block, 0 for empty blocks."""
+        if self._minimums is None:
+            np = _numpy()
+            self._minimums = np.array(
+                [min(b[0]) if b[0] else 0.0 for b in self.blocks.values()]
+            )
+        return self._minimums
+
+
+class GasEstimator(object):
+    """Rolling gas price and gas limit statistics of chains.
+
+    An estimate for inclusion within `blocks` blocks is the higher of two prices:
+
+    - From recent blocks: the `q`-quantile of the lowest included gas price of each block, where `q` is chosen such that at least one of `blocks` blocks would have included the price with probability `confidence`. Empty blocks count with price 0, since any price was enough for them.
+    - From the mempool: the price that ranks within the transactions that `blocks` average blocks take, among the pending transactions by price.
+
+    Estimates are never below `min_price`.
+
+    Args:
+        `window` (int, optional): The number of most recent blocks of every chain that are kept. Defaults to 100.
+        `min_price` (float, optional): The lowest gas price an estimate returns. Defaults to `MIN_GAS_PRICE`, the minimum gas price of the network.
+    """
+
+    def __init__(self, window: int = 100, min_price: float = MIN_GAS_PRICE):
+        if window < 1:
+            raise ValueError("window must be greater than 0")
+        self.window = window
+        self.min_price = min_price
+        self._chains: Dict[int, _ChainWindow] = {}
+        self._cache: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _chain(self, chain: int) -> _ChainWindow:
+        window = self._chains.get(chain)
+        if window is None:
+            window = self._chains[chain] = _ChainWindow()
+        return window
+
+    def _changed(self, window: _ChainWindow):
+        window.changed()
+        self._cache.clear()
+
+    def add_block(self, chain: int, height: int, payload) -> int:
+        """Add the transactions of a block to the window of its chain. A block at a height already in the window replaces it, e.g. after a reorg.
+
+        Args:
+            `chain` (int): The id of the chain of the block.
+            `height` (int): The height of the block.
+            `payload` (Union[dict, Payload]): The payload of the block with outputs.
+
+        Returns:
+            int: The number of transactions added.
+        """
+        if not isinstance(payload, Payload):
+            payload = Payload(payload)
+        prices, limits = [], []
+        for tx in payload.transactions:
+            meta = tx.cmd["meta"]
+            prices.append(float(meta["gasPrice"]))
+            limits.append(int(meta["gasLimit"]))
+        outputs = payload.outputs
+        used = [o.gas for o in outputs] if outputs is not None else []
+
+        with self._lock:
+            window = self._chain(chain)
+            if height < window.height - self.window:
+                return 0
+            window.blocks[height] = (prices, limits, used)
+            if height < window.height:
+                window.blocks = OrderedDict(sorted(window.blocks.items()))
+            while len(window.blocks) > self.window:
+                window.blocks.popitem(last=False)
+            self._changed(window)
+        return len(prices)
+
+    def update_mempool(self, chain: int, pending: Dict[str, float]):
+        """Replace the pending transactions of a chain.
+
+        Args:
+            `chain` (int): The id of the chain.
+            `pending` (Dict[str, float]): The gas price of every pending transaction by request key.
+        """
+        with self._lock:
+            window = self._chain(chain)
+            window.pending = dict(pending)
+            self._changed(window)
+
+    def refresh(
+        self, client, chains: Iterable[int] = None, mempool: bool = True
+    ) -> Dict[int, int]:
+        """Fetch the blocks added since the last refresh, up to `window` blocks, and the new pending transactions.
+
+        Call it periodically, e.g. from a `chainwebpy.watcher.CutWatcher` subscriber.
+
+        Args:
+            `client` (ChainwebClient): The client of the node.
+            `chains` (Iterable[int], optional): The chains to refresh. Defaults to every chain of the cut.
+            `mempool` (bool, optional): Also refresh the pending transactions. Defaults to True.
+
+        Returns:
+            Dict[int, int]: The number of blocks added per chain.
+        """
+        cut = client.cut.get_current_cut()["hashes"]
+        if chains is None:
+            chains = sorted(int(c) for c in cut)
+        added = {}
+        for chain in chains:
+            top = cut[str(chain)]["height"]
+            with self._lock:
+                known = self._chain(chain).height
+            start = max(known + 1, top - self.window + 1, 0)
+            added[chain] = 0
+            cursor = None
+            while start <= top:
+                page = client.headers.get_block_headers(
+                    chain, next=cursor, minheight=start, maxheight=top
+                )
+                items = page["items"]
+                payloads = (
+                    client.payloads.get_batch_of_block_payload_with_outputs(
+                        chain,
+                        list({h["payloadHash"]: None for h in items}),
+                        responseSchema="lazy",
+                    )
+                )
+                by_hash = {p.payloadHash: p for p in payloads}
+                for h in items:
+                    payload = by_hash.get(h["payloadHash"])
+                    if payload is not None:
+                        self.add_block(chain, h["height"], payload)
+                        added[chain] += 1
+                cursor = page["next"]
+                if cursor is None:
+                    break
+            if mempool:
+                self._refresh_mempool(client, chain)
+        return added
+
+    def _refresh_mempool(self, client, chain: int):
+        hashes = client.mempool.get_pending_transactions_from_the_mempool(
+            chain
+        )["hashes"]
+        with self._lock:
+            known = self._chain(chain).pending
+        pending = {k: known[k] for k in hashes if k in known}
+        new = [k for k in hashes if k not in known]
+        if new:
+            found = client.mempool.lookup_pending_transactions_in_the_mempool(
+                chain, new
+            )
+            for key, result in zip(new, found):
+                if result.get("tag") != "Pending":
+                    continue
+                tx = json.loads(result["contents"])
+                meta = json.loads(tx["cmd"])["meta"]
+                pending[key] = float(meta["gasPrice"])
+        self.update_mempool(chain, pending)
+
+    def price(
+        self, chain: int, blocks: int = 1, confidence: float = 0.9
+    ) -> float:
+        """A gas price to be included within a number of blocks.
+
+        Args:
+            `chain` (int): The id of the chain.
+            `blocks` (int, optional): The number of blocks. Defaults to 1.
+            `confidence` (float, optional): The probability of inclusion, between 0 and 1. Defaults to 0.9.
+        """
+        key = (chain, blocks, confidence)
+        price = self._cache.get(key)
+        if price is not None:
+            return price
+        if blocks < 1:
+            raise ValueError("blocks must be greater than 0")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+        np = _numpy()
+        with self._lock:
+            window = self._chain(chain)
+            price = self.min_price
+            minimums = window.minimums()
+            if len(minimums):
+                q = 1 - (1 - confidence) ** (1 / blocks)
+                price = max(price, float(np.quantile(minimums, q)))
+                capacity = math.ceil(
+                    len(window.columns()["price"]) / len(minimums) * blocks
+                )
+                pending = np.fromiter(window.pending.values(), dtype=float)
+                if len(pending) >= capacity > 0:
+                    ahead = np.partition(-pending, capacity - 1)[capacity - 1]
+                    price = max(price, float(-ahead))
+            self._cache[key] = price
+        return price
+
+    def percentile(self, chain: int, column: str, q: float):
+        """Percentiles of the transactions of the window of a chain.
+
+        Args:
+            `chain` (int): The id of the chain.
+            `column` (str): "price" (gas price), "limit" (gas limit) or "used" (gas used).
+            `q` (Union[float, Sequence[float]]): The percentiles, between 0 and 100.
+
+        Returns:
+            Union[float, numpy.ndarray]: The percentiles, or NaN if the window has no transactions.
+        """
+        np = _numpy()
+        if column not in _COLUMNS:
+            raise ValueError(f"Unknown column {column!r}")
+        with self._lock:
+            values = self._chain(chain).columns()[column]
+        if not len(values):
+            return np.full(np.shape(q), np.nan)[()]
+        return np.percentile(values, q)
+
+    def gas_limit(
+        self, chain: int, q: float = 99.0, margin: float = 1.2
+    ) -> int:
+        """A gas limit from the gas used by recent transactions: the `q`th percentile with a safety margin.
+
+        Args:
+            `chain` (int): The id of the chain.
+            `q` (float, optional): The percentile of gas used. Defaults to 99.
+            `margin` (float, optional): The factor applied to the percentile. Defaults to 1.2.
+        """
+        used = self.percentile(chain, "used", q)
+        if math.isnan(used):
+            raise ValueError(f"No transactions on chain {chain}")
+        return math.ceil(used * margin)
+
+    def heights(self) -> Dict[int, Tuple[int, int]]:
+        """The lowest and highest height in the window of every chain."""
+        with self._lock:
+            return {
+                chain: (next(iter(w.blocks)), w.height)
+                for chain, w in self._chains.items()
+                if w.blocks
+            }
+
+    def pending(self, chain: int) -> int:
+        """The number of pending transactions of a chain."""
+        with self._lock:
+            return len(self._chain(chain).pending)
@@ -0,0 +1,193 @@
+"""Codec of the Chainweb binary block header format.
+
+A binary header is 318 bytes. Its base64url encoding, as found in the items of paged header responses, is 424 characters without padding, so the items of a whole page can be decoded with one base64 call.
+"""
+
+import base64
+import struct
+from collections import namedtuple
+from typing import Dict, List
+
+HEADER_SIZE = 318
+
+ENCODED_HEADER_SIZE = 424
+
+_STRUCT = struct.Struct("<Qq32sH" + "I32s" * 3 + "32s32sI32sQIqQ32s")
+
+FIELDS = (
+    "featureFlags",
+    "creationTime",
+    "parent",
+    "adjacentCount",
+    "adjacentChain0",
+    "adjacentHash0",
+    "adjacentChain1",
+    "adjacentHash1",
+    "adjacentChain2",
+    "adjacentHash2",
+    "target",
+    "payloadHash",
+    "chainId",
+    "weight",
+    "height",
+    "chainwebVersion",
+    "epochStart",
+    "nonce",
+    "hash",
+)
+
+VERSION_CODES = {"mainnet01": 5, "testnet04": 7, "development": 1}
+
+VERSION_NAMES = {code: name for name, code in VERSION_CODES.items()}
+
+
+def b64url(value: bytes) -> str:
+    """Encode bytes as base64url without padding."""
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode("ascii")
+
+
+def unb64url(value: str) -> bytes:
+    """Decode base64url with or without padding."""
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+class BlockHeader(namedtuple("BlockHeader", FIELDS)):
+    """A decoded binary block header.
+
+    Hashes, `target` and `weight` are raw 32 bytes values; `chainwebVersion` is the numeric version code. The fields are in the order of the binary format.
+    """
+
+    __slots__ = ()
+
+    @property
+    def adjacents(self) -> Dict[int, bytes]:
+        """The adjacent parent hashes by chain id."""
+        return {
+            self.adjacentChain0: self.adjacentHash0,
+            self.adjacentChain1: self.adjacentHash1,
+            self.adjacentChain2: self.adjacentHash2,
+        }
+
+    def to_bytes(self) -> bytes:
+        return _STRUCT.pack(*self)
+
+    def to_object(self) -> dict:
+        """Convert to the object encoding of the node API."""
+        return {
+            "featureFlags": self.featureFlags,
+            "creationTime": self.creationTime,
+            "parent": b64url(self.parent),
+            "adjacents": {
+                str(c): b64url(h) for c, h in sorted(self.adjacents.items())
+            },
+            "target": b64url(self.target),
+            "payloadHash": b64url(self.payloadHash),
+            "chainId": self.chainId,
+            "weight": b64url(self.weight),
+            "height": self.height,
+            "chainwebVersion": VERSION_NAMES.get(
+                self.chainwebVersion, str(self.chainwebVersion)
+            ),
+            "epochStart": self.epochStart,
+            "nonce": str(self.nonce),
+            "hash": b64url(self.hash),
+        }
+
+
+def decode(value: bytes) -> BlockHeader:
+    """Decode one binary block header."""
+    return BlockHeader._make(_STRUCT.unpack(value))
+
+
+def decode_base64url(items: List[str]) -> bytes:
+    """Decode base64url encoded headers into one buffer of consecutive binary headers."""
+    if not items:
+        return b""
+    for item in items:
+        if len(item) != ENCODED_HEADER_SIZE:
+            raise ValueError(
+                f"Encoded header must be {ENCODED_HEADER_SIZE} characters, got {len(item)}"
+            )
+    return base64.urlsafe_b64decode("".join(items))
+
+
+def split(buffer: bytes) -> List[bytes]:
+    """Split a buffer of consecutive binary headers."""
+    view = memoryview(buffer)
+    return [
+        bytes(view[i : i + HEADER_SIZE])
+        for i in range(0, len(buffer), HEADER_SIZE)
+    ]
+
+
+def records(buffer: bytes) -> List[BlockHeader]:
+    """Decode a buffer of consecutive binary headers into `BlockHeader` records."""
+    make = BlockHeader._make
+    return [make(fields) for fields in _STRUCT.iter_unpack(buffer)]
+
+
+_dtype = None
+
+
+def dtype():
+    """The numpy structured dtype of a binary header. Requires numpy."""
+    global _dtype
+    if _dtype is not None:
+        return _dtype
+
+    import numpy as np
+
+    hash_ = ("u1", (32,))
+    _dtype = np.dtype(
+        [
+            ("featureFlags", "<u8"),
+            ("creationTime", "<i8"),
+            ("parent", hash_),
+            ("adjacentCount", "<u2"),
+            ("adjacentChain0", "<u4"),
+            ("adjacentHash0", hash_),
+            ("adjacentChain1", "<u4"),
+            ("adjacentHash1", hash_),
+            ("adjacentChain2", "<u4"),
+            ("adjacentHash2", hash_),
+            ("target", hash_),
+            ("payloadHash", hash_),
+            ("chainId", "<u4"),
+            ("weight", hash_),
+            ("height", "<u8"),
+            ("chainwebVersion", "<u4"),
+            ("epochStart", "<i8"),
+            ("nonce", "<u8"),
+            ("hash", hash_),
+        ]
+    )
+    return _dtype
+
+
+def array(buffer: bytes):
+    """View a buffer of consecutive binary headers as a numpy structured array. Requires numpy."""
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "numpy is required for header arrays: pip install chainweb.py[numpy]"
+        ) from None
+    return np.frombuffer(buffer, dtype=dtype())
+
+
+def page_binary(page: dict) -> dict:
+    """Replace the base64url items of a header page by binary headers."""
+    page["items"] = split(decode_base64url(page["items"]))
+    return page
+
+
+def page_records(page: dict) -> dict:
+    """Replace the base64url items of a header page by `BlockHeader` records."""
+    page["items"] = records(decode_base64url(page["items"]))
+    return page
+
+
+def page_array(page: dict) -> dict:
+    """Replace the base64url items of a header page by a numpy structured array."""
+    page["items"] = array(decode_base64url(page["items"]))
+    return page
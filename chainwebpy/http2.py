@@ -0,0 +1,157 @@
+"""HTTP/2 transport.
+
+`HTTP2Transport` sends the requests of the endpoint classes through an `httpx.Client` with HTTP/2 enabled (`pip install chainweb.py[http2]`), so concurrent requests to one node are multiplexed as streams of a single connection instead of occupying one HTTP/1.1 connection each.
+
+```
+transport = HTTP2Transport(timeout=10)
+cw = ChainwebClient(ServiceAPIEndpoint("mainnet"), transport=transport)
+```
+"""
+
+import threading
+import time
+
+from chainwebpy.metrics import Hooks, current_record
+from chainwebpy.transport import Request, Transport
+
+
+class HTTP2Response(object):
+    """Response of an `HTTP2Transport`. Provides the parts of the `requests.Response` interface used by the endpoint classes."""
+
+    __slots__ = ("response",)
+
+    def __init__(self, response):
+        self.response = response
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def url(self) -> str:
+        return str(self.response.url)
+
+    @property
+    def http_version(self) -> str:
+        return self.response.http_version
+
+    @property
+    def content(self) -> bytes:
+        return self.response.read()
+
+    @property
+    def text(self) -> str:
+        self.response.read()
+        return self.response.text
+
+    def json(self, **kwargs):
+        return self.response.json(**kwargs)
+
+    def iter_content(self, chunk_size: int = None, decode_unicode=False):
+        return self.response.iter_bytes(chunk_size)
+
+    def iter_lines(self, chunk_size: int = 512, **kwargs):
+        return self.response.iter_lines()
+
+    def close(self):
+        self.response.close()
+
+
+class HTTP2Transport(Transport):
+    """Sends requests over HTTP/2 with httpx. Requires httpx with HTTP/2 support.
+
+    All requests to a node share one connection as long as the node speaks HTTP/2; https nodes negotiate the protocol and fall back to HTTP/1.1 if they do not support HTTP/2.
+
+    Args:
+        `client` (httpx.Client, optional): The client used to send requests. Defaults to a new client with HTTP/2 enabled.
+        `timeout` (float, optional): Timeout in seconds for every request. Defaults to None.
+        `hooks` (Hooks, optional): Receive a `CallRecord` for every call, see `chainwebpy.metrics`. Defaults to no hooks.
+        `http1` (bool, optional): Allow HTTP/1.1. Set to False to speak HTTP/2 without negotiation to nodes served over plain http. Defaults to True.
+        `max_connections` (int, optional): The number of connections to all hosts at most. Defaults to None, no limit.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        timeout: float = None,
+        hooks: Hooks = None,
+        http1: bool = True,
+        max_connections: int = None,
+    ):
+        super().__init__(None, timeout, hooks)
+        self._client = client
+        self.http1 = http1
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError(
+                "httpx is required for HTTP/2: pip install chainweb.py[http2]"
+            ) from None
+        return httpx.Client(
+            http1=self.http1,
+            http2=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    @property
+    def session(self):
+        return self.client
+
+    def send(self, request: Request) -> HTTP2Response:
+        """Send a request and return the response.
+
+        Args:
+            `request` (Request): The request to send.
+        """
+        client = self.client
+        built = client.build_request(
+            request.method,
+            request.url,
+            params=request.params,
+            headers=request.headers,
+            content=request.data,
+        )
+        record = current_record()
+        if record is None:
+            r = client.send(built, stream=True)
+            if not request.stream:
+                r.read()
+            return HTTP2Response(r)
+
+        started = time.perf_counter()
+        r = client.send(built, stream=True)
+        first_byte = time.perf_counter()
+        record.add("ttfb", first_byte - started)
+        if request.data is not None:
+            record.bytes_out += len(request.data)
+        if request.stream:
+            record.bytes_in += int(r.headers.get("Content-Length") or 0)
+        else:
+            record.bytes_in += len(r.read())
+            record.add("download", time.perf_counter() - first_byte)
+        return HTTP2Response(r)
+
+    def close(self):
+        """Close the connections of the client."""
+        if self._client is not None:
+            self._client.close()
@@ -0,0 +1,203 @@
+"""A persistent index from transaction request keys to the blocks that contain them.
+
+`RequestKeyIndex` stores one row per transaction in SQLite, keyed by the raw 32 bytes of the request key, so that a lookup is a single primary key search without any request to a node.
+"""
+
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+from typing import Dict, Iterable, List
+
+from chainwebpy.header import b64url, unb64url
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS txs (
+    key BLOB NOT NULL,
+    block BLOB NOT NULL,
+    chain INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (key, block)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chains (
+    chain INTEGER PRIMARY KEY,
+    height INTEGER NOT NULL
+);
+"""
+
+
+class TxLocation(namedtuple("TxLocation", "chain height block index")):
+    """The block of a transaction: chain, height, block hash and the index of the transaction in the block."""
+
+    __slots__ = ()
+
+
+class RequestKeyIndex(object):
+    """Maps request keys to the blocks that contain the transactions.
+
+    A request key can be found in more than one block if its block was orphaned and the transaction included again. Lookups return every block, ordered by height.
+
+    ```
+    index = RequestKeyIndex("txs.sqlite")
+    index.sync(cw)
+    index.lookup("IgZ0l7Uu3TPkEUn6A5RFqLjs5uuPbHcUaWfu5Mi1N-E")
+    ```
+
+    Args:
+        `path` (str, optional): The SQLite database file. Defaults to ":memory:".
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def add(self, payloads: Iterable[dict], headers: Iterable) -> int:
+        """Index the transactions of payloads with outputs.
+
+        Blocks that are indexed already are skipped, so overlapping batches can be added again.
+
+        Args:
+            `payloads` (Iterable[dict]): Payloads with outputs, e.g. from `get_batch_of_block_payload_with_outputs`.
+            `headers` (Iterable): The headers of the payloads, as objects or `chainwebpy.header.BlockHeader` records.
+
+        Returns:
+            int: The number of transactions added.
+        """
+        blocks: Dict[str, list] = {}
+        for h in headers:
+            if isinstance(h, dict):
+                block = (h["chainId"], h["height"], unb64url(h["hash"]))
+                blocks.setdefault(h["payloadHash"], []).append(block)
+            else:
+                block = (h.chainId, h.height, h.hash)
+                blocks.setdefault(b64url(h.payloadHash), []).append(block)
+
+        rows = []
+        tips = {}
+        for payload in payloads:
+            found = blocks.get(payload["payloadHash"])
+            if found is None:
+                raise ValueError(
+                    f"No header for payload {payload['payloadHash']}"
+                )
+            keys = [
+                unb64url(json.loads(unb64url(out))["reqKey"])
+                for _, out in payload["transactions"]
+            ]
+            for chain, height, block in found:
+                tips[chain] = max(tips.get(chain, -1), height)
+                rows.extend(
+                    (key, block, chain, height, i) for i, key in enumerate(keys)
+                )
+
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO txs VALUES (?, ?, ?, ?, ?)", rows
+            )
+            added = self._db.total_changes - before
+            # No upsert, which needs SQLite 3.24.
+            self._db.executemany(
+                "INSERT OR IGNORE INTO chains VALUES (?, ?)", tips.items()
+            )
+            self._db.executemany(
+                "UPDATE chains SET height = ? WHERE chain = ? AND height < ?",
+                [(h, c, h) for c, h in tips.items()],
+            )
+        return added
+
+    def lookup(self, request_key: str) -> List[TxLocation]:
+        """The blocks that contain a transaction, ordered by height.
+
+        Args:
+            `request_key` (str): The request key (Base64Url -without padding- encoded).
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT chain, height, block, position FROM txs "
+                "WHERE key = ? ORDER BY height",
+                (unb64url(request_key),),
+            ).fetchall()
+        return [TxLocation(c, h, b64url(b), i) for c, h, b, i in rows]
+
+    def heights(self) -> Dict[int, int]:
+        """The highest indexed height of every chain."""
+        with self._lock:
+            return dict(self._db.execute("SELECT chain, height FROM chains"))
+
+    def sync(
+        self,
+        client,
+        chains: Iterable[int] = None,
+        limit: int = 100,
+        overlap: int = 3,
+    ) -> int:
+        """Index the blocks of a node that were added since the last sync, up to the current cut.
+
+        Args:
+            `client` (ChainwebClient): The client of the node.
+            `chains` (Iterable[int], optional): The chains to index. Defaults to every chain of the cut.
+            `limit` (int, optional): The number of blocks fetched per request. Defaults to 100.
+            `overlap` (int, optional): The number of indexed heights below the highest that are indexed again, to pick up blocks that replaced orphaned ones. Defaults to 3.
+
+        Returns:
+            int: The number of transactions added.
+        """
+        cut = client.cut.get_current_cut()["hashes"]
+        if chains is None:
+            chains = sorted(int(c) for c in cut)
+        indexed = self.heights()
+        added = 0
+        for chain in chains:
+            top = cut[str(chain)]["height"]
+            start = max(indexed.get(chain, overlap - 1) - overlap + 1, 0)
+            cursor = None
+            while start <= top:
+                page = client.headers.get_block_headers(
+                    chain,
+                    limit=limit,
+                    next=cursor,
+                    minheight=start,
+                    maxheight=top,
+                )
+                items = page["items"]
+                wanted = list({h["payloadHash"]: None for h in items})
+                payloads = []
+                while wanted:
+                    batch = (
+                        client.payloads.get_batch_of_block_payload_with_outputs(
+                            chain, wanted
+                        )
+                    )
+                    if not batch:
+                        raise Exception(
+                            f"Payloads of {len(wanted)} blocks on chain {chain} are missing"
+                        )
+                    payloads.extend(batch)
+                    returned = {p["payloadHash"] for p in batch}
+                    wanted = [w for w in wanted if w not in returned]
+                added += self.add(payloads, items)
+                cursor = page["next"]
+                if cursor is None:
+                    break
+        return added
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM txs").fetchone()[0]
+
+    def __enter__(self) -> "RequestKeyIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
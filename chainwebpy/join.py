@@ -0,0 +1,211 @@
+"""Joining a stream of block headers with their payloads.
+
+`PayloadJoiner` reads headers from any iterable, e.g. header pages, the block header event stream or the headers of a cut delta, and fetches the payloads with outputs of the headers ahead of the consumer in batches, per chain, through `get_batch_of_block_payload_with_outputs`. Headers with a payload hash that is already fetched or in flight, like the shared empty payloads, do not fetch it again. Joined blocks are yielded in the order of the headers.
+
+```
+joiner = PayloadJoiner(cw, batch_size=50, read_ahead=4)
+for header, payload in joiner.join(cw.headers.get_block_headers(0)["items"]):
+    ...
+
+events = cw.misc.blocks_event_stream()
+for header, payload in joiner.join(e["data"]["header"] for e in events):
+    ...
+```
+"""
+
+import queue
+import threading
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator
+
+from chainwebpy.header import b64url
+
+_END = object()
+
+
+class JoinedBlock(namedtuple("JoinedBlock", "header payload")):
+    """A block header and its payload with outputs."""
+
+    __slots__ = ()
+
+
+class _Failed(object):
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _key(header):
+    if isinstance(header, dict):
+        return header["chainId"], header["payloadHash"]
+    return header.chainId, b64url(header.payloadHash)
+
+
+class PayloadJoiner(object):
+    """Prefetches the payloads of a header stream in batches.
+
+    At most `batch_size * read_ahead` headers are read ahead of the consumer, and the payload hashes of the last `2 * batch_size * read_ahead` distinct payloads are recognized as duplicates. A batch is requested when it is full, when the read-ahead is full, when the header stream ends, or when no header arrived for `linger` seconds, so that a slow stream like the event stream is not held back to fill a batch.
+
+    Args:
+        `client` (ChainwebClient): The client of the node.
+        `batch_size` (int, optional): The number of payloads of a batch request at most. Defaults to 50.
+        `read_ahead` (int, optional): The number of batches read ahead of the consumer. Defaults to 4.
+        `concurrency` (int, optional): The number of batch requests in flight at most. Defaults to 4.
+        `linger` (float, optional): Seconds to wait for more headers before a partial batch is requested. Defaults to 0.05.
+        `lazy` (bool, optional): Yield `chainwebpy.payload.Payload` wrappers instead of payload objects. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        client,
+        batch_size: int = 50,
+        read_ahead: int = 4,
+        concurrency: int = 4,
+        linger: float = 0.05,
+        lazy: bool = False,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater than 0")
+        if read_ahead < 1:
+            raise ValueError("read_ahead must be greater than 0")
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        self.client = client
+        self.batch_size = batch_size
+        self.read_ahead = read_ahead
+        self.concurrency = concurrency
+        self.linger = linger
+        self.lazy = lazy
+        self.requests = 0
+        self.payloads = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self, chain: int, slots: Dict[str, Future]):
+        wanted = list(slots)
+        schema = "lazy" if self.lazy else "object"
+        try:
+            while wanted:
+                batch = self.client.payloads.get_batch_of_block_payload_with_outputs(
+                    chain, wanted, responseSchema=schema
+                )
+                with self._lock:
+                    self.requests += 1
+                    self.payloads += len(batch)
+                for payload in batch:
+                    key = (
+                        payload.payloadHash
+                        if self.lazy
+                        else payload["payloadHash"]
+                    )
+                    slot = slots.get(key)
+                    if slot is not None and not slot.done():
+                        slot.set_result(payload)
+                missing = [w for w in wanted if not slots[w].done()]
+                if len(missing) == len(wanted):
+                    # Asking again for the same hashes gets the same answer.
+                    raise Exception(
+                        f"Payloads of {len(wanted)} blocks on chain {chain} are missing"
+                    )
+                wanted = missing
+        except BaseException as e:
+            for slot in slots.values():
+                if not slot.done():
+                    slot.set_exception(e)
+
+    @staticmethod
+    def _read(headers: Iterable, source: queue.Queue, stop: threading.Event):
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    source.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for header in headers:
+                if not put(header):
+                    return
+        except BaseException as e:
+            put(_Failed(e))
+        else:
+            put(_END)
+
+    def join(self, headers: Iterable) -> Iterator[JoinedBlock]:
+        """Yield every header of a stream with its payload, in stream order.
+
+        Args:
+            `headers` (Iterable): Header objects or `chainwebpy.header.BlockHeader` records, of any chains.
+        """
+        limit = self.batch_size * self.read_ahead
+        source: queue.Queue = queue.Queue(limit)
+        stop = threading.Event()
+        reader = threading.Thread(
+            target=self._read, args=(headers, source, stop), daemon=True
+        )
+        reader.start()
+
+        window = deque()
+        pending: Dict[int, Dict[str, Future]] = {}
+        known: "OrderedDict[str, Future]" = OrderedDict()
+        ended = False
+
+        def submit(pool, chain: int):
+            slots = pending.pop(chain)
+            pool.submit(self._fetch, chain, slots)
+
+        try:
+            with ThreadPoolExecutor(self.concurrency) as pool:
+                while True:
+                    while not ended and len(window) < limit:
+                        if not window:
+                            timeout = None
+                        elif window[0][1].done():
+                            timeout = 0
+                        else:
+                            timeout = self.linger
+                        try:
+                            item = source.get(timeout=timeout)
+                        except queue.Empty:
+                            break
+                        if item is _END:
+                            ended = True
+                            break
+                        if isinstance(item, _Failed):
+                            raise item.error
+                        chain, key = _key(item)
+                        slot = known.get(key)
+                        if slot is not None and slot.done():
+                            if slot.exception() is not None:
+                                # Fetch a failed payload again.
+                                del known[key]
+                                slot = None
+                        if slot is None:
+                            slot = known[key] = Future()
+                            batch = pending.setdefault(chain, {})
+                            batch[key] = slot
+                            if len(batch) >= self.batch_size:
+                                submit(pool, chain)
+                            while len(known) > 2 * limit:
+                                known.popitem(last=False)
+                        else:
+                            # Recently used hashes, like the empty payload
+                            # of a chain, stay known.
+                            known.move_to_end(key)
+                            with self._lock:
+                                self.duplicates += 1
+                        window.append((item, slot))
+                    for chain in list(pending):
+                        submit(pool, chain)
+                    if not window:
+                        if ended:
+                            return
+                        continue
+                    header, slot = window.popleft()
+                    yield JoinedBlock(header, slot.result())
+        finally:
+            stop.set()
@@ -0,0 +1,294 @@
+"""Batched read-only Pact queries with a height keyed result cache.
+
+`LocalQueryEngine` runs many independent read-only Pact expressions, like the balances of many accounts, through the Pact `local` endpoint. It packs the expressions of a chain into list expressions, `[(coin.get-balance "a") (coin.get-balance "b") ...]`, one request for up to `batch_size` expressions, and splits the list result back into the results of the expressions. The requests of all chains run concurrently, with at most `per_chain` requests in flight per chain. Results are cached keyed by expression, chain and the height of the state the node ran them on, reported with every response, and looked up at the height of the chain in the current cut, so queries repeated at the same height cost no request.
+
+```
+engine = LocalQueryEngine(cw)
+engine.balances(0, ["k:f89ef46927f506c70b6a58fd322450a936311dc6ac91f4ec3d8ef949608dbf1f", ...])
+for result in engine.run([(0, '(coin.details "alice")'), (1, "(free.app.state)")]):
+    print(result.chain, result.height, result.status, result.data)
+```
+
+A failing expression fails the packed request it is in, e.g. `coin.get-balance` of an account that does not exist. Failed packed requests are split in halves and retried down to single expressions, so that only the failing expressions get a failure result.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from chainwebpy.header import b64url
+
+
+class LocalResult(namedtuple("LocalResult", "chain code height status data")):
+    """The result of one expression: `status` is "success" with the value as `data`, or "failure" with the error object as `data`. `height` is the height of the chain the result is cached at."""
+
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "success"
+
+
+def command(
+    chain: int,
+    code: str,
+    network_id: str,
+    gas_limit: int = 150000,
+    data: dict = None,
+) -> dict:
+    """An unsigned exec command for `PactEndpoints.local`.
+
+    Args:
+        `chain` (int): The id of the chain.
+        `code` (str): The Pact code.
+        `network_id` (str): The network id, e.g. "mainnet01".
+        `gas_limit` (int, optional): The gas limit of the command. Defaults to 150000.
+        `data` (dict, optional): The data of the command. Defaults to None, no data.
+    """
+    cmd = json.dumps(
+        {
+            "networkId": network_id,
+            "payload": {"exec": {"data": data or {}, "code": code}},
+            "signers": [],
+            "meta": {
+                "creationTime": int(time.time()) - 60,
+                "ttl": 600,
+                "gasLimit": gas_limit,
+                "chainId": str(chain),
+                "gasPrice": 1e-8,
+                "sender": "",
+            },
+            "nonce": str(time.time()),
+        },
+        separators=(",", ":"),
+    )
+    digest = hashlib.blake2b(cmd.encode("utf-8"), digest_size=32).digest()
+    return {"hash": b64url(digest), "sigs": [], "cmd": cmd}
+
+
+def _form(code: str) -> bool:
+    """Whether `code` is a single parenthesized expression without comments, which can be an element of a list expression."""
+    if not code.startswith("("):
+        return False
+    depth = 0
+    string = escaped = False
+    for i, c in enumerate(code):
+        if string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                string = False
+        elif c == '"':
+            string = True
+        elif c == ";":
+            return False
+        elif c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+            if depth == 0:
+                return i == len(code) - 1
+    return False
+
+
+class LocalQueryEngine(object):
+    """Runs read-only Pact expressions in packed, concurrent `local` requests and caches their results per chain height.
+
+    Args:
+        `client` (ChainwebClient): The client of a node with the Pact API.
+        `network_id` (str, optional): The network id of the commands. Defaults to None, the instance of the node's cut.
+        `batch_size` (int, optional): The number of expressions packed into one request at most; 1 disables packing. Defaults to 50.
+        `per_chain` (int, optional): The number of requests in flight per chain at most. Defaults to 4.
+        `concurrency` (int, optional): The number of requests in flight at most. Defaults to 16.
+        `cache_size` (int, optional): The number of results cached at most; the least recently used are evicted first. Defaults to 100000.
+        `gas_limit` (int, optional): The gas limit of a request. Packed requests need the gas of all their expressions. Defaults to 150000.
+    """
+
+    def __init__(
+        self,
+        client,
+        network_id: str = None,
+        batch_size: int = 50,
+        per_chain: int = 4,
+        concurrency: int = 16,
+        cache_size: int = 100000,
+        gas_limit: int = 150000,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be greater than 0")
+        if per_chain < 1:
+            raise ValueError("per_chain must be greater than 0")
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        if cache_size < 0:
+            raise ValueError("cache_size must be positive")
+        self.client = client
+        self.network_id = network_id
+        self.batch_size = batch_size
+        self.per_chain = per_chain
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self.gas_limit = gas_limit
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self._cache: "OrderedDict[Tuple[str, int, int], LocalResult]" = (
+            OrderedDict()
+        )
+        self._limits: Dict[int, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key: Tuple[str, int, int]) -> Optional[LocalResult]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            return result
+
+    def _store(self, results: List[LocalResult]):
+        if self.cache_size == 0:
+            return
+        with self._lock:
+            for r in results:
+                key = (r.code, r.chain, r.height)
+                self._cache[key] = r
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _local(self, chain: int, code: str) -> Tuple[dict, Optional[int]]:
+        with self._lock:
+            limit = self._limits.get(chain)
+            if limit is None:
+                limit = self._limits[chain] = threading.Semaphore(
+                    self.per_chain
+                )
+            self.requests += 1
+        with limit:
+            response = self.client.pact.local(
+                chain,
+                command(chain, code, self.network_id, self.gas_limit),
+            )
+        meta = response.get("metaData") or {}
+        return response["result"], meta.get("blockHeight")
+
+    def _execute(
+        self, chain: int, height: int, codes: List[str]
+    ) -> List[LocalResult]:
+        if len(codes) == 1:
+            result, at = self._local(chain, codes[0])
+            # The state of the request, which is newer than the cut if the
+            # chain advanced in between.
+            height = height if at is None else at
+            data = result.get("data", result.get("error"))
+            results = [
+                LocalResult(chain, codes[0], height, result["status"], data)
+            ]
+        else:
+            result, at = self._local(chain, "[" + " ".join(codes) + "]")
+            if result["status"] == "success" and len(result["data"]) == len(
+                codes
+            ):
+                height = height if at is None else at
+                results = [
+                    LocalResult(chain, code, height, "success", data)
+                    for code, data in zip(codes, result["data"])
+                ]
+            else:
+                # One of the expressions failed; halve until it is alone.
+                half = len(codes) // 2
+                return self._execute(chain, height, codes[:half]) + (
+                    self._execute(chain, height, codes[half:])
+                )
+        self._store(results)
+        return results
+
+    def run(
+        self, queries: Iterable[Tuple[int, str]], cut: dict = None
+    ) -> List[LocalResult]:
+        """The results of many expressions, in query order. Expressions that are not cached at the current height of their chain are requested, packed per chain.
+
+        A requested result is cached at the height of the state it was computed on, as reported by the node, which is above the height of the cut if the chain advanced since.
+
+        Args:
+            `queries` (Iterable[Tuple[int, str]]): (chain, Pact code) pairs. Code that is not a single parenthesized expression is requested alone.
+            `cut` (dict, optional): The cut that gives the height of every chain. Defaults to None, the current cut of the node.
+        """
+        queries = list(queries)
+        if cut is None:
+            cut = self.client.cut.get_current_cut()
+        if self.network_id is None:
+            self.network_id = cut["instance"]
+        heights = {int(c): h["height"] for c, h in cut["hashes"].items()}
+
+        # Results are keyed by the code without surrounding whitespace.
+        queries = [(chain, code.strip()) for chain, code in queries]
+        found: Dict[Tuple[str, int], LocalResult] = {}
+        packed: Dict[int, List[str]] = {}
+        tasks: List[Tuple[int, List[str]]] = []
+        for chain, code in queries:
+            if chain not in heights:
+                raise ValueError(f"chain {chain} is not a chain of the cut")
+            if (code, chain) in found:
+                continue
+            found[code, chain] = self._cached((code, chain, heights[chain]))
+            if found[code, chain] is not None:
+                continue
+            if self.batch_size > 1 and _form(code):
+                packed.setdefault(chain, []).append(code)
+            else:
+                tasks.append((chain, [code]))
+
+        for chain, forms in packed.items():
+            tasks.extend(
+                (chain, forms[i : i + self.batch_size])
+                for i in range(0, len(forms), self.batch_size)
+            )
+        if tasks:
+            with ThreadPoolExecutor(self.concurrency) as pool:
+                for results in pool.map(
+                    lambda t: self._execute(t[0], heights[t[0]], t[1]), tasks
+                ):
+                    for r in results:
+                        found[r.code, r.chain] = r
+        return [found[code, chain] for chain, code in queries]
+
+    def query(self, chain: int, code: str) -> LocalResult:
+        """The result of one expression, see `run`."""
+        return self.run([(chain, code)])[0]
+
+    def balances(
+        self, chain: int, accounts: Iterable[str], module: str = "coin"
+    ) -> Dict[str, object]:
+        """The balances of many accounts of a fungible token on a chain.
+
+        Args:
+            `chain` (int): The id of the chain.
+            `accounts` (Iterable[str]): The account names.
+            `module` (str, optional): The token module. Defaults to "coin".
+
+        Returns:
+            Dict[str, object]: The balance of every account as returned by Pact, None for accounts that do not exist.
+        """
+        accounts = list(accounts)
+        results = self.run(
+            (chain, f"({module}.get-balance {json.dumps(a)})") for a in accounts
+        )
+        return {a: r.data if r.ok else None for a, r in zip(accounts, results)}
+
+    def clear(self):
+        """Remove every cached result."""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,457 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Optional, Tuple
+
+PHASES = ("dns", "connect", "tls", "ttfb", "download", "decode", "total")
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_local = threading.local()
+
+
+class CallRecord(object):
+    """Measurements of one endpoint method call.
+
+    Phase durations are in seconds. A phase that did not happen during the call (e.g. `dns`, `connect` and `tls` on a reused connection, or every network phase on a cache hit) is absent from `phases`.
+
+    Args:
+        `name` (str): The name of the endpoint method, e.g. "get_current_cut".
+        `method` (str): The HTTP method.
+        `url` (str): The full request url.
+    """
+
+    __slots__ = (
+        "name",
+        "method",
+        "url",
+        "status",
+        "bytes_out",
+        "bytes_in",
+        "phases",
+        "retries",
+        "cache_hit",
+        "error",
+    )
+
+    def __init__(self, name: str, method: str, url: str):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.status = None
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.phases = {}
+        self.retries = 0
+        self.cache_hit = False
+        self.error = None
+
+    def add(self, phase: str, seconds: float):
+        """Add `seconds` to the duration of `phase`."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        return self.phases.get("total", 0.0)
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "method": self.method,
+            "url": self.url,
+            "status": self.status,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "phases": dict(self.phases),
+            "retries": self.retries,
+            "cache_hit": self.cache_hit,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"CallRecord({self.name!r}, status={self.status!r}, "
+            f"total={self.total:.6f})"
+        )
+
+
+def current_record() -> Optional[CallRecord]:
+    """Return the record of the instrumented call running in this thread, if any.
+
+    Transports and transport wrappers use it to annotate the call they are serving, e.g. with a cache hit.
+    """
+    return getattr(_local, "record", None)
+
+
+def _set_record(record: Optional[CallRecord]) -> Optional[CallRecord]:
+    previous = getattr(_local, "record", None)
+    _local.record = record
+    return previous
+
+
+class Hooks(object):
+    """Receives a `CallRecord` for every endpoint method call.
+
+    The base class does nothing and is the default of every transport. Its `enabled` flag is False, which keeps the measuring out of the call path altogether. Subclasses set `enabled` to True and implement `on_call`.
+    """
+
+    enabled = False
+
+    def on_call(self, record: CallRecord):
+        pass
+
+
+NOOP_HOOKS = Hooks()
+
+
+class MultiHooks(Hooks):
+    """Forwards every record to several hooks.
+
+    Args:
+        `hooks` (Hooks): The hooks to forward to.
+    """
+
+    enabled = True
+
+    def __init__(self, *hooks: Hooks):
+        self.hooks = hooks
+
+    def on_call(self, record: CallRecord):
+        for hooks in self.hooks:
+            hooks.on_call(record)
+
+
+class LoggingHooks(Hooks):
+    """Logs one line per call.
+
+    Args:
+        `logger` (logging.Logger, optional): The logger to write to. Defaults to the "chainwebpy.metrics" logger.
+        `level` (int, optional): The level of successful calls. Failed calls are logged as warnings. Defaults to logging.DEBUG.
+    """
+
+    enabled = True
+
+    def __init__(self, logger: "logging.Logger" = None, level: int = None):
+        import logging
+
+        self.logger = (
+            logger if logger is not None else logging.getLogger(__name__)
+        )
+        self.level = level if level is not None else logging.DEBUG
+        self._warning = logging.WARNING
+
+    def on_call(self, record: CallRecord):
+        level = self.level if record.error is None else self._warning
+        if not self.logger.isEnabledFor(level):
+            return
+
+        phases = " ".join(
+            f"{phase}={record.phases[phase] * 1000:.2f}ms"
+            for phase in PHASES
+            if phase in record.phases
+        )
+        self.logger.log(
+            level,
+            "%s %s %s status=%s in=%d out=%d retries=%d cache_hit=%s%s %s",
+            record.name,
+            record.method,
+            record.url,
+            record.status,
+            record.bytes_in,
+            record.bytes_out,
+            record.retries,
+            record.cache_hit,
+            "" if record.error is None else f" error={record.error}",
+            phases,
+        )
+
+
+class Histogram(object):
+    """A cumulative histogram with fixed bucket bounds, as exposed by Prometheus.
+
+    Args:
+        `buckets` (tuple, optional): The upper bounds of the buckets, in increasing order. Defaults to `LATENCY_BUCKETS`.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterable[Tuple[float, int]]:
+        """Yield (upper bound, number of observations <= bound) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def quantile(self, q: float) -> float:
+        """Estimate the `q` quantile by linear interpolation within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        lower = 0.0
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            if seen + count >= rank and count:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _bound(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(value)
+
+
+class MetricsHooks(Hooks):
+    """Aggregates call records into per-endpoint metrics.
+
+    Keeps a latency histogram per endpoint and phase, and counters of calls by status code, bytes in and out, retries, cache hits and errors. `exposition()` renders them in the Prometheus text format, so they can be served from any HTTP handler without a client library.
+
+    Args:
+        `buckets` (tuple, optional): The latency histogram bucket bounds in seconds. Defaults to `LATENCY_BUCKETS`.
+        `prefix` (str, optional): The prefix of the metric names. Defaults to "chainweb".
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+        prefix: str = "chainweb",
+    ):
+        self.buckets = buckets
+        self.prefix = prefix
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.calls: Dict[Tuple[str, str], int] = {}
+        self.bytes_in: Dict[str, int] = {}
+        self.bytes_out: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def on_call(self, record: CallRecord):
+        name = record.name
+        status = str(record.status) if record.status is not None else "none"
+        with self._lock:
+            for phase, seconds in record.phases.items():
+                histogram = self.histograms.get((name, phase))
+                if histogram is None:
+                    histogram = self.histograms[(name, phase)] = Histogram(
+                        self.buckets
+                    )
+                histogram.observe(seconds)
+            key = (name, status)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            self.bytes_in[name] = self.bytes_in.get(name, 0) + record.bytes_in
+            self.bytes_out[name] = (
+                self.bytes_out.get(name, 0) + record.bytes_out
+            )
+            if record.retries:
+                self.retries[name] = self.retries.get(name, 0) + record.retries
+            if record.cache_hit:
+                self.cache_hits[name] = self.cache_hits.get(name, 0) + 1
+            if record.error is not None:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def histogram(self, name: str, phase: str = "total") -> Histogram:
+        """Return the latency histogram of an endpoint method and phase."""
+        with self._lock:
+            return self.histograms.get((name, phase), Histogram(self.buckets))
+
+    def reset(self):
+        with self._lock:
+            for counters in (
+                self.histograms,
+                self.calls,
+                self.bytes_in,
+                self.bytes_out,
+                self.retries,
+                self.cache_hits,
+                self.errors,
+            ):
+                counters.clear()
+
+    def exposition(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            lines.append(
+                f"# HELP {p}_call_duration_seconds Endpoint call latency by phase."
+            )
+            lines.append(f"# TYPE {p}_call_duration_seconds histogram")
+            for (name, phase), histogram in sorted(self.histograms.items()):
+                labels = _labels(endpoint=name, phase=phase)
+                for bound, count in histogram.cumulative():
+                    lines.append(
+                        f'{p}_call_duration_seconds_bucket{{{labels},le="{_bound(bound)}"}} {count}'
+                    )
+                lines.append(
+                    f"{p}_call_duration_seconds_sum{{{labels}}} {histogram.sum!r}"
+                )
+                lines.append(
+                    f"{p}_call_duration_seconds_count{{{labels}}} {histogram.count}"
+                )
+
+            lines.append(f"# HELP {p}_calls_total Endpoint calls by status.")
+            lines.append(f"# TYPE {p}_calls_total counter")
+            for (name, status), count in sorted(self.calls.items()):
+                labels = _labels(endpoint=name, status=status)
+                lines.append(f"{p}_calls_total{{{labels}}} {count}")
+
+            lines.append(
+                f"# HELP {p}_call_bytes_total Bytes sent and received."
+            )
+            lines.append(f"# TYPE {p}_call_bytes_total counter")
+            for direction, counters in (
+                ("in", self.bytes_in),
+                ("out", self.bytes_out),
+            ):
+                for name, count in sorted(counters.items()):
+                    labels = _labels(endpoint=name, direction=direction)
+                    lines.append(f"{p}_call_bytes_total{{{labels}}} {count}")
+
+            for metric, text, counters in (
+                ("retries", "HTTP retries.", self.retries),
+                ("cache_hits", "Calls served from a cache.", self.cache_hits),
+                ("errors", "Failed calls.", self.errors),
+            ):
+                lines.append(f"# HELP {p}_call_{metric}_total {text}")
+                lines.append(f"# TYPE {p}_call_{metric}_total counter")
+                for name, count in sorted(counters.items()):
+                    labels = _labels(endpoint=name)
+                    lines.append(f"{p}_call_{metric}_total{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def timed_adapter(**kwargs):
+    """Return a `requests` HTTP adapter whose new connections report DNS, connect and TLS time to the current call record.
+
+    Connections opened outside an instrumented call are not timed.
+
+    Args:
+        `kwargs`: Passed to `requests.adapters.HTTPAdapter`.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class TimedHTTPAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": _timed_pool(HTTPConnectionPool),
+                "https": _timed_pool(HTTPSConnectionPool),
+            }
+
+    return TimedHTTPAdapter(**kwargs)
+
+
+_timed_pools = {}
+
+
+def _timed_pool(pool_class):
+    timed = _timed_pools.get(pool_class)
+    if timed is None:
+        connection_class = pool_class.ConnectionCls
+
+        class TimedConnection(connection_class):
+            def _new_conn(self):
+                record = current_record()
+                if record is None:
+                    return super()._new_conn()
+
+                import socket
+
+                from urllib3.exceptions import ConnectTimeoutError
+
+                host = self._dns_host
+                started = time.perf_counter()
+                try:
+                    infos = socket.getaddrinfo(
+                        host, self.port, 0, socket.SOCK_STREAM
+                    )
+                except OSError:
+                    infos = []
+                resolved = time.perf_counter()
+                record.add("dns", resolved - started)
+                # Connect to the resolved addresses in turn, like
+                # `create_connection` does with the host name.
+                addresses = list(dict.fromkeys(info[4][0] for info in infos))
+                try:
+                    for address in addresses[:-1]:
+                        self._dns_host = address
+                        try:
+                            return super()._new_conn()
+                        except ConnectTimeoutError:
+                            pass
+                    if addresses:
+                        self._dns_host = addresses[-1]
+                    return super()._new_conn()
+                finally:
+                    self._dns_host = host
+                    record.add("connect", time.perf_counter() - resolved)
+
+            def connect(self):
+                record = current_record()
+                if record is None or pool_class.scheme != "https":
+                    return super().connect()
+
+                before = record.phases.get("dns", 0.0) + record.phases.get(
+                    "connect", 0.0
+                )
+                started = time.perf_counter()
+                super().connect()
+                elapsed = time.perf_counter() - started
+                after = record.phases.get("dns", 0.0) + record.phases.get(
+                    "connect", 0.0
+                )
+                record.add("tls", max(elapsed - (after - before), 0.0))
+
+        TimedConnection.__name__ = TimedConnection.__qualname__ = (
+            "Timed" + connection_class.__name__
+        )
+        timed = _timed_pools[pool_class] = type(
+            "Timed" + pool_class.__name__,
+            (pool_class,),
+            {"ConnectionCls": TimedConnection},
+        )
+    return timed
@@ -0,0 +1,311 @@
+"""A local mining work proxy for many hashing workers.
+
+`MiningProxy` fetches mining work from a node once for all local workers and serves it from memory over a small binary protocol on a local TCP socket. It refreshes the work whenever the node announces a new block on its header update stream, and at least every `refresh_interval` seconds, and wakes up all workers waiting for new work. Solved work of every worker is sent to the node through the proxy, one solution at a time.
+
+```
+with MiningProxy(cw, "miner", ["f89ef46927f506c70b6a58fd322450a936311dc6ac91f4ec3d8ef949608dbf1f"]) as proxy:
+    worker = MiningWorkerClient(proxy.address)
+    generation, work = worker.work()
+    ...
+    worker.submit(solved_header)
+    generation, work = worker.wait(generation)
+```
+
+Protocol: a request is one operation byte followed by its arguments, all integers big endian.
+
+- `W`: the current work. Reply: 8 bytes generation, 2 bytes length and the work bytes, see `MiningEndpoints.get_mining_work`. The length is 0 while the proxy has no work.
+- `U` with 8 bytes generation and 4 bytes timeout in milliseconds: wait until the generation of the work differs from the given one, or the timeout passed, and reply like `W`.
+- `S` with 2 bytes length and the solved work header bytes: submit a solution. Reply: 1 byte, 1 if the node accepted the solution and 0 otherwise.
+"""
+
+import logging
+import socket
+import socketserver
+import struct
+import threading
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORK = struct.Struct(">QH")
+_WAIT = struct.Struct(">QI")
+_LENGTH = struct.Struct(">H")
+
+
+def _read(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("connection closed")
+    return data
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().setup()
+
+    def handle(self):
+        proxy: MiningProxy = self.server.proxy
+        rfile, wfile = self.rfile, self.wfile
+        try:
+            while True:
+                op = rfile.read(1)
+                if not op:
+                    return
+                if op == b"W":
+                    reply = proxy._reply()
+                elif op == b"U":
+                    generation, timeout = _WAIT.unpack(_read(rfile, _WAIT.size))
+                    proxy.wait(generation, timeout / 1000)
+                    reply = proxy._reply()
+                elif op == b"S":
+                    (size,) = _LENGTH.unpack(_read(rfile, _LENGTH.size))
+                    reply = (
+                        b"\x01" if proxy.submit(_read(rfile, size)) else b"\x00"
+                    )
+                else:
+                    return
+                wfile.write(reply)
+                wfile.flush()
+        except (EOFError, ConnectionError):
+            return
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class MiningProxy(object):
+    """Serves the mining work of one node to many local workers.
+
+    Args:
+        `client` (ChainwebClient): The client of the node, with the mining API enabled.
+        `account` (str): The miner account.
+        `public_keys` (List[str]): The public keys of the miner.
+        `predicate` (str, optional): The predicate of the miner keys, "keys-all" or "keys-any". Defaults to "keys-all".
+        `host` (str, optional): The address the proxy listens on. Defaults to "127.0.0.1".
+        `port` (int, optional): The port the proxy listens on. Defaults to 0, any free port.
+        `refresh_interval` (float, optional): The longest time in seconds between two work requests to the node. Defaults to 30.
+        `updates` (bool, optional): Refresh the work on every block of the node's header update stream. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        client,
+        account: str,
+        public_keys: List[str],
+        predicate: str = "keys-all",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        refresh_interval: float = 30.0,
+        updates: bool = True,
+    ):
+        if refresh_interval <= 0:
+            raise ValueError("refresh_interval must be greater than 0")
+        self.client = client
+        self.account = account
+        self.public_keys = list(public_keys)
+        self.predicate = predicate
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.updates = updates
+        self.work_bytes: Optional[bytes] = None
+        self.generation = 0
+        self.refreshes = 0
+        self.submitted = 0
+        self.accepted = 0
+        self._encoded = _WORK.pack(0, 0)
+        self._changed = threading.Condition()
+        self._submit_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._server: Optional[_Server] = None
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The address the proxy listens on."""
+        if self._server is None:
+            raise Exception("The proxy is not started")
+        return self._server.server_address[:2]
+
+    def refresh(self) -> bool:
+        """Fetch the current work from the node.
+
+        Returns:
+            bool: Whether the work changed.
+        """
+        with self._refresh_lock:
+            work = self.client.mining.get_mining_work(
+                self.account, self.public_keys, self.predicate
+            )
+            self.refreshes += 1
+            if work == self.work_bytes:
+                return False
+            with self._changed:
+                self.work_bytes = work
+                self.generation += 1
+                self._encoded = _WORK.pack(self.generation, len(work)) + work
+                self._changed.notify_all()
+            return True
+
+    def _reply(self) -> bytes:
+        return self._encoded
+
+    def work(self) -> Tuple[int, Optional[bytes]]:
+        """The generation and bytes of the current work."""
+        with self._changed:
+            return self.generation, self.work_bytes
+
+    def wait(self, generation: int, timeout: float = None) -> int:
+        """Wait until the work generation differs from `generation`.
+
+        Returns:
+            int: The current generation.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.generation != generation or self._stopped.is_set(),
+                timeout,
+            )
+            return self.generation
+
+    def submit(self, header: bytes) -> bool:
+        """Send solved work to the node and refresh the work if it was accepted.
+
+        Args:
+            `header` (bytes): The solved work header bytes.
+
+        Returns:
+            bool: Whether the node accepted the solution.
+        """
+        with self._submit_lock:
+            self.submitted += 1
+            try:
+                self.client.mining.solved_mining_work(header)
+            except Exception as e:
+                logger.warning("Solution rejected: %s", e)
+                return False
+            self.accepted += 1
+        # The solved block changes the work of the chain.
+        self._wake.set()
+        return True
+
+    def start(self) -> "MiningProxy":
+        """Fetch the first work, start listening and start the refresh threads."""
+        self.refresh()
+        self._stopped.clear()
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.proxy = self
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+            threading.Thread(target=self._refresh_loop, daemon=True),
+        ]
+        if self.updates:
+            self._threads.append(
+                threading.Thread(target=self._update_loop, daemon=True)
+            )
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        """Stop listening and refreshing. Workers waiting for work get the current work."""
+        self._stopped.set()
+        self._wake.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        with self._changed:
+            self._changed.notify_all()
+
+    def _refresh_loop(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Work refresh failed: %s", e)
+
+    def _update_loop(self):
+        # The stream blocks until the next event, so this thread only
+        # notices `stop` on the next block; it is a daemon thread.
+        while not self._stopped.is_set():
+            try:
+                for _ in self.client.misc.blocks_event_stream():
+                    if self._stopped.is_set():
+                        return
+                    self._wake.set()
+            except Exception as e:
+                logger.warning("Header update stream failed: %s", e)
+            self._stopped.wait(self.refresh_interval)
+
+    def __enter__(self) -> "MiningProxy":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class MiningWorkerClient(object):
+    """A connection of a hashing worker to a `MiningProxy`.
+
+    Args:
+        `address` (Tuple[str, int]): The address of the proxy.
+        `timeout` (float, optional): The socket timeout in seconds. Defaults to None.
+    """
+
+    def __init__(self, address: Tuple[str, int], timeout: float = None):
+        self.address = address
+        self._socket = socket.create_connection(address, timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._socket.makefile("rb")
+
+    def _work(self) -> Tuple[int, Optional[bytes]]:
+        generation, size = _WORK.unpack(_read(self._file, _WORK.size))
+        return generation, _read(self._file, size) if size else None
+
+    def work(self) -> Tuple[int, Optional[bytes]]:
+        """The generation and bytes of the current work; None while the proxy has no work."""
+        self._socket.sendall(b"W")
+        return self._work()
+
+    def wait(
+        self, generation: int, timeout: float = 60.0
+    ) -> Tuple[int, Optional[bytes]]:
+        """Wait until the work differs from `generation`, or the timeout passed, and return the current work.
+
+        Args:
+            `generation` (int): The generation of the work of the worker.
+            `timeout` (float, optional): The longest wait in seconds. Defaults to 60.
+        """
+        self._socket.sendall(b"U" + _WAIT.pack(generation, int(timeout * 1000)))
+        return self._work()
+
+    def submit(self, header: bytes) -> bool:
+        """Submit solved work.
+
+        Args:
+            `header` (bytes): The solved work header bytes.
+
+        Returns:
+            bool: Whether the node accepted the solution.
+        """
+        self._socket.sendall(b"S" + _LENGTH.pack(len(header)) + header)
+        return _read(self._file, 1) == b"\x01"
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "MiningWorkerClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,306 @@
+"""Lazily decoded block payloads.
+
+Payloads nest base64url encoded JSON documents for every transaction, output, the miner data and the coinbase output. `Payload` keeps the encoded strings and decodes a document on first access to one of its fields, caching the result. The encoded strings of a whole payload, or of a whole batch of payloads, are base64 decoded together in one call the first time any of them is needed.
+
+```
+for payload in cw.payloads.get_batch_of_block_payload_with_outputs(0, hashes, responseSchema="lazy"):
+    for output in payload.outputs:
+        if output.status == "failure":
+            ...
+```
+"""
+
+import binascii
+import json
+from typing import List, Optional, Sequence
+
+_URLSAFE = bytes.maketrans(b"-_", b"+/")
+
+
+def decode_batch(encoded: Sequence[str]) -> List[bytes]:
+    """Decode many base64url strings, with or without padding, in one call.
+
+    Every string is padded to whole base64 quanta so that the concatenation decodes in one pass, and the padding bytes are cut off again.
+
+    Raises:
+        `ValueError`: If a string is not valid base64url. The decoder skips invalid characters, which would shift the bytes of every later string, so the decoded length is checked against the encoded lengths.
+    """
+    if not encoded:
+        return []
+    stripped = [e.rstrip("=") for e in encoded]
+    for e in stripped:
+        if len(e) % 4 == 1:
+            raise ValueError(f"Invalid base64url string of length {len(e)}")
+    joined = "".join(e + "A" * (-len(e) % 4) for e in stripped)
+    data = binascii.a2b_base64(joined.encode("ascii").translate(_URLSAFE))
+    if len(data) * 4 != len(joined) * 3:
+        raise ValueError("Invalid characters in base64url strings")
+    result = []
+    start = 0
+    for e in stripped:
+        n = len(e)
+        result.append(data[start : start + n * 3 // 4])
+        start += (n + 3) // 4 * 3
+    return result
+
+
+class _Batch(object):
+    """Encoded strings that are decoded together on first use."""
+
+    __slots__ = ("encoded", "_decoded")
+
+    def __init__(self, encoded: List[str]):
+        self.encoded = encoded
+        self._decoded = None
+
+    def get(self, index: int) -> bytes:
+        if self._decoded is None:
+            self._decoded = decode_batch(self.encoded)
+            self.encoded = None
+        return self._decoded[index]
+
+
+class Encoded(object):
+    """A base64url encoded JSON document, decoded on first access.
+
+    Args:
+        `raw` (str): The base64url encoded document.
+    """
+
+    __slots__ = ("raw", "_batch", "_index", "_bytes", "_value")
+
+    def __init__(self, raw: str, _batch: _Batch = None, _index: int = 0):
+        self.raw = raw
+        self._batch = _batch
+        self._index = _index
+        self._bytes = None
+        self._value = None
+
+    @property
+    def bytes(self) -> bytes:
+        """The decoded bytes of the document."""
+        if self._bytes is None:
+            if self._batch is not None:
+                self._bytes = self._batch.get(self._index)
+                self._batch = None
+            else:
+                self._bytes = decode_batch([self.raw])[0]
+        return self._bytes
+
+    @property
+    def value(self):
+        """The parsed document."""
+        if self._value is None:
+            self._value = json.loads(self.bytes)
+        return self._value
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def get(self, key, default=None):
+        return self.value.get(key, default)
+
+    def __repr__(self) -> str:
+        state = "decoded" if self._value is not None else "encoded"
+        return f"{type(self).__name__}({self.raw[:16]}..., {state})"
+
+
+class Transaction(Encoded):
+    """A signed transaction of a payload."""
+
+    __slots__ = ("_cmd",)
+
+    def __init__(self, raw: str, _batch: _Batch = None, _index: int = 0):
+        super().__init__(raw, _batch, _index)
+        self._cmd = None
+
+    @property
+    def hash(self) -> str:
+        """The request key of the transaction."""
+        return self.value["hash"]
+
+    @property
+    def sigs(self) -> list:
+        return self.value["sigs"]
+
+    @property
+    def cmd(self) -> dict:
+        """The parsed command of the transaction."""
+        if self._cmd is None:
+            self._cmd = json.loads(self.value["cmd"])
+        return self._cmd
+
+
+class TxOutput(Encoded):
+    """The output of a transaction, or the coinbase output of a payload."""
+
+    __slots__ = ()
+
+    @property
+    def reqKey(self) -> str:
+        return self.value["reqKey"]
+
+    @property
+    def gas(self) -> int:
+        return self.value["gas"]
+
+    @property
+    def result(self) -> dict:
+        return self.value["result"]
+
+    @property
+    def status(self) -> str:
+        """The result status, "success" or "failure"."""
+        return self.value["result"]["status"]
+
+    @property
+    def txId(self) -> Optional[int]:
+        return self.value.get("txId")
+
+    @property
+    def logs(self) -> Optional[str]:
+        return self.value.get("logs")
+
+    @property
+    def events(self) -> list:
+        return self.value.get("events") or []
+
+    @property
+    def continuation(self) -> Optional[dict]:
+        return self.value.get("continuation")
+
+    @property
+    def metaData(self) -> Optional[dict]:
+        return self.value.get("metaData")
+
+
+class Payload(object):
+    """A block payload, with or without outputs, that decodes its documents on first access.
+
+    Args:
+        `raw` (dict): The payload object as returned by the payload endpoints.
+    """
+
+    __slots__ = (
+        "raw",
+        "_batch",
+        "_offset",
+        "_minerData",
+        "_coinbase",
+        "_transactions",
+        "_outputs",
+    )
+
+    def __init__(self, raw: dict, _batch: _Batch = None, _offset: int = None):
+        self.raw = raw
+        if _batch is None:
+            _batch = _Batch(_encoded(raw))
+            _offset = 0
+        self._batch = _batch
+        self._offset = _offset
+        self._minerData = None
+        self._coinbase = None
+        self._transactions = None
+        self._outputs = None
+
+    @property
+    def payloadHash(self) -> str:
+        return self.raw["payloadHash"]
+
+    @property
+    def transactionsHash(self) -> str:
+        return self.raw["transactionsHash"]
+
+    @property
+    def outputsHash(self) -> str:
+        return self.raw["outputsHash"]
+
+    @property
+    def has_outputs(self) -> bool:
+        return "coinbase" in self.raw
+
+    @property
+    def minerData(self) -> Encoded:
+        if self._minerData is None:
+            self._minerData = Encoded(
+                self.raw["minerData"], self._batch, self._offset
+            )
+        return self._minerData
+
+    @property
+    def coinbase(self) -> Optional[TxOutput]:
+        """The coinbase output, if the payload was requested with outputs."""
+        if not self.has_outputs:
+            return None
+        if self._coinbase is None:
+            self._coinbase = TxOutput(
+                self.raw["coinbase"], self._batch, self._offset + 1
+            )
+        return self._coinbase
+
+    @property
+    def transactions(self) -> List[Transaction]:
+        if self._transactions is None:
+            batch = self._batch
+            if self.has_outputs:
+                start = self._offset + 2
+                self._transactions = [
+                    Transaction(tx, batch, start + 2 * i)
+                    for i, (tx, _) in enumerate(self.raw["transactions"])
+                ]
+            else:
+                start = self._offset + 1
+                self._transactions = [
+                    Transaction(tx, batch, start + i)
+                    for i, tx in enumerate(self.raw["transactions"])
+                ]
+        return self._transactions
+
+    @property
+    def outputs(self) -> Optional[List[TxOutput]]:
+        """The transaction outputs, if the payload was requested with outputs."""
+        if not self.has_outputs:
+            return None
+        if self._outputs is None:
+            batch = self._batch
+            start = self._offset + 3
+            self._outputs = [
+                TxOutput(out, batch, start + 2 * i)
+                for i, (_, out) in enumerate(self.raw["transactions"])
+            ]
+        return self._outputs
+
+    def __len__(self) -> int:
+        return len(self.raw["transactions"])
+
+    def __repr__(self) -> str:
+        return f"Payload({self.payloadHash}, transactions={len(self)})"
+
+
+def _encoded(raw: dict) -> List[str]:
+    """The encoded documents of a payload in batch order: miner data, coinbase, then transactions and outputs."""
+    encoded = [raw["minerData"]]
+    if "coinbase" in raw:
+        encoded.append(raw["coinbase"])
+        for tx, out in raw["transactions"]:
+            encoded.append(tx)
+            encoded.append(out)
+    else:
+        encoded.extend(raw["transactions"])
+    return encoded
+
+
+def lazy_payload(raw: dict) -> Payload:
+    """Wrap one payload object."""
+    return Payload(raw)
+
+
+def lazy_batch(raws: List[dict]) -> List[Payload]:
+    """Wrap a batch of payload objects that share one base64 decode."""
+    encoded = []
+    offsets = []
+    for raw in raws:
+        offsets.append(len(encoded))
+        encoded.extend(_encoded(raw))
+    batch = _Batch(encoded)
+    return [Payload(raw, batch, offset) for raw, offset in zip(raws, offsets)]
@@ -0,0 +1,421 @@
+"""Peer network crawling and ranking.
+
+`PeerCrawler` walks the peer pages of the cut network, and optionally the mempool networks, of many nodes concurrently, deduplicates the peers and probes the latency and cut height of every peer. The result is a `PeerMap` of peers ranked by freshness and latency that is saved to a JSON file and loaded again for a warm start.
+
+```
+crawler = PeerCrawler([P2PBootstrapAPIEndpoint(P2PBootstrapAPIEndpoint.MainnetNode.US_E1)], depth=2)
+peers = crawler.run()
+peers.save("peers.json")
+endpoints = PeerMap.load("peers.json").endpoints(8)
+```
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from chainwebpy.header import unb64url
+from chainwebpy.transport import Transport
+from chainwebpy.url import GenericNodeAPIEndpoint
+
+
+class PeerInfo(object):
+    """A peer of the P2P network and the result of its probe.
+
+    `latency` is the fastest round trip of a cut request in seconds and `height` the height of the peer's cut; both are None until the peer answered a probe. `error` is the error of the last failed probe.
+    """
+
+    __slots__ = (
+        "id",
+        "hostname",
+        "port",
+        "networks",
+        "latency",
+        "height",
+        "error",
+        "probed",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        hostname: str,
+        port: int,
+        networks: Iterable[str] = (),
+        latency: float = None,
+        height: int = None,
+        error: str = None,
+        probed: float = None,
+    ):
+        self.id = id
+        self.hostname = hostname
+        self.port = port
+        self.networks = set(networks)
+        self.latency = latency
+        self.height = height
+        self.error = error
+        self.probed = probed
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.hostname, self.port
+
+    @property
+    def reachable(self) -> bool:
+        return self.latency is not None
+
+    def to_object(self) -> dict:
+        return {
+            "id": self.id,
+            "hostname": self.hostname,
+            "port": self.port,
+            "networks": sorted(self.networks),
+            "latency": self.latency,
+            "height": self.height,
+            "error": self.error,
+            "probed": self.probed,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"PeerInfo({self.hostname}:{self.port}, latency={self.latency}, "
+            f"height={self.height})"
+        )
+
+
+class PeerMap(object):
+    """Peers ranked by freshness and latency.
+
+    Reachable peers come first. Among them, peers whose cut height lags the highest cut by more than `max_lag` are ranked after the others, and peers are ordered by latency within both groups.
+
+    Args:
+        `peers` (Iterable[PeerInfo]): The peers.
+        `version` (str): The Chainweb version of the network, e.g. "mainnet01".
+        `api_version` (str, optional): The API version of the peers. Defaults to "0.0".
+        `max_lag` (int, optional): The largest cut height difference to the highest cut of a fresh peer. The cut height is the sum of the heights of all chains, so the default of 40 is about two blocks on every chain of a 20 chain graph. Defaults to 40.
+    """
+
+    def __init__(
+        self,
+        peers: Iterable[PeerInfo],
+        version: str,
+        api_version: str = "0.0",
+        max_lag: int = 40,
+    ):
+        self.version = version
+        self.api_version = api_version
+        self.max_lag = max_lag
+        self.peers = self._rank(list(peers))
+
+    def _rank(self, peers: List[PeerInfo]) -> List[PeerInfo]:
+        heights = [p.height for p in peers if p.height is not None]
+        best = max(heights) if heights else 0
+
+        def key(p: PeerInfo):
+            if not p.reachable:
+                return (2, 0.0, p.hostname, p.port)
+            stale = p.height is None or best - p.height > self.max_lag
+            return (int(stale), p.latency, p.hostname, p.port)
+
+        return sorted(peers, key=key)
+
+    def endpoints(
+        self, count: int = None, scheme: str = "https"
+    ) -> List[GenericNodeAPIEndpoint]:
+        """The endpoints of the best reachable peers, best first.
+
+        Args:
+            `count` (int, optional): The number of endpoints. Defaults to None, every reachable peer.
+            `scheme` (str, optional): The scheme of the peer urls. Defaults to "https".
+        """
+        peers = [p for p in self.peers if p.reachable][:count]
+        return [
+            GenericNodeAPIEndpoint(
+                scheme, p.hostname, p.port, self.api_version, self.version
+            )
+            for p in peers
+        ]
+
+    def save(self, path: str):
+        """Write the map to a JSON file, atomically."""
+        state = {
+            "version": self.version,
+            "api_version": self.api_version,
+            "max_lag": self.max_lag,
+            "peers": [p.to_object() for p in self.peers],
+        }
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PeerMap":
+        """Read a map written by `save`."""
+        with open(path) as f:
+            state = json.load(f)
+        return cls(
+            [PeerInfo(**p) for p in state["peers"]],
+            state["version"],
+            state["api_version"],
+            state["max_lag"],
+        )
+
+    def __len__(self) -> int:
+        return len(self.peers)
+
+    def __iter__(self):
+        return iter(self.peers)
+
+
+def _fingerprint(peer_id: Optional[str]) -> Optional[str]:
+    """The certificate fingerprint of a peer id as hex, or None."""
+    if not peer_id:
+        return None
+    try:
+        fingerprint = unb64url(peer_id)
+    except ValueError:
+        return None
+    return fingerprint.hex() if len(fingerprint) == 32 else None
+
+
+def _pinned_adapter(
+    pins: Dict[Tuple[str, int], str], verify: bool = True, **kwargs
+):
+    """A timed adapter that checks the certificate of pinned hosts against its SHA-256 fingerprint instead of the CA certificates, or no certificates unless `verify`."""
+    from chainwebpy.metrics import timed_adapter
+
+    class PinnedAdapter(type(timed_adapter())):
+        def send(self, request, **kwargs):
+            # Set here, since a CA bundle of the environment overrides the
+            # `verify` of the session.
+            if not verify:
+                kwargs["verify"] = False
+            return super().send(request, **kwargs)
+
+        def build_connection_pool_key_attributes(
+            self, request, verify, cert=None
+        ):
+            host, pool = super().build_connection_pool_key_attributes(
+                request, verify, cert
+            )
+            fingerprint = pins.get((host["host"], host["port"]))
+            if verify and fingerprint is not None and host["scheme"] == "https":
+                for key in ("ssl_context", "ca_certs", "ca_cert_dir"):
+                    pool.pop(key, None)
+                pool["cert_reqs"] = "CERT_NONE"
+                pool["assert_fingerprint"] = fingerprint
+            return host, pool
+
+        def cert_verify(self, conn, url, verify, cert):
+            # The fingerprint replaces the CA check of pinned pools.
+            if getattr(conn, "assert_fingerprint", None):
+                verify = False
+            super().cert_verify(conn, url, verify, cert)
+
+    return PinnedAdapter(**kwargs)
+
+
+def _versions(api) -> Tuple[str, str]:
+    """The API version and Chainweb version of an endpoint url."""
+    parts = api.endpoint.rstrip("/").split("/")
+    return parts[-2], parts[-1]
+
+
+class PeerCrawler(object):
+    """Crawls the peer networks of nodes and probes the peers.
+
+    Args:
+        `seeds` (Iterable): The endpoints of the nodes whose peers are crawled first, e.g. `P2PBootstrapAPIEndpoint`s.
+        `depth` (int, optional): The number of crawl rounds. Every round crawls the peers found in the previous one. Defaults to 1, only the seeds.
+        `chains` (Iterable[int], optional): Also crawl the mempool networks of these chains. Defaults to None, only the cut network.
+        `concurrency` (int, optional): The number of requests in flight at most. Defaults to 16.
+        `samples` (int, optional): The number of cut requests of a probe; the fastest is the latency of the peer. Defaults to 2.
+        `max_peers` (int, optional): Stop crawling once this many peers are known. Defaults to 1000.
+        `timeout` (float, optional): The timeout of every request in seconds, if no transport is given. Defaults to 5.
+        `transport` (Transport, optional): The transport of every request. Defaults to a new transport with `timeout`.
+        `endpoint` (Callable[[PeerInfo], object], optional): The endpoint of a peer. Defaults to a https `GenericNodeAPIEndpoint` with the versions of the first seed.
+        `verify` (bool, optional): Verify the certificates of nodes. Chainweb P2P peers usually serve self-signed certificates and their peer id is the SHA-256 fingerprint of the certificate, so peers with an id are verified against it and other nodes, like the bootstrap nodes, against the CA certificates. False skips verification. Only applies if no transport is given. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        seeds: Iterable,
+        depth: int = 1,
+        chains: Iterable[int] = None,
+        concurrency: int = 16,
+        samples: int = 2,
+        max_peers: int = 1000,
+        timeout: float = 5.0,
+        transport: Transport = None,
+        endpoint: Callable[[PeerInfo], object] = None,
+        verify: bool = True,
+    ):
+        self.seeds = list(seeds)
+        if not self.seeds:
+            raise ValueError("seeds must not be empty")
+        if depth < 1:
+            raise ValueError("depth must be greater than 0")
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        if samples < 1:
+            raise ValueError("samples must be greater than 0")
+
+        self.depth = depth
+        self.chains = list(chains) if chains is not None else []
+        self.concurrency = concurrency
+        self.samples = samples
+        self.max_peers = max_peers
+        self._pins: Dict[Tuple[str, int], str] = {}
+        if transport is None:
+            transport = Transport(
+                self._session(concurrency, self._pins, verify), timeout
+            )
+        self.transport = transport
+        self.api_version, self.version = _versions(self.seeds[0])
+        self.endpoint = endpoint or self._endpoint
+        self.peers: Dict[Tuple[str, int], PeerInfo] = {}
+        self.errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _session(
+        concurrency: int, pins: Dict[Tuple[str, int], str], verify: bool
+    ):
+        import requests
+
+        # Many peers can share a host, e.g. behind a load balancer.
+        session = requests.Session()
+        adapter = _pinned_adapter(pins, verify, pool_maxsize=concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _pin(self, peer: PeerInfo):
+        fingerprint = _fingerprint(peer.id)
+        if fingerprint is not None:
+            api = self.endpoint(peer)
+            url = urlsplit(getattr(api, "endpoint", ""))
+            self._pins[(url.hostname, url.port)] = fingerprint
+
+    def _endpoint(self, peer: PeerInfo) -> GenericNodeAPIEndpoint:
+        return GenericNodeAPIEndpoint(
+            "https", peer.hostname, peer.port, self.api_version, self.version
+        )
+
+    def crawl(self) -> List[PeerInfo]:
+        """Crawl the peer networks of the seeds, `depth` rounds deep.
+
+        Returns:
+            List[PeerInfo]: The peers found, not probed yet.
+        """
+        nodes = self.seeds
+        crawled = set()
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            for _ in range(self.depth):
+                found = []
+                for peers in pool.map(self._crawl_node, nodes):
+                    found.extend(peers)
+                nodes = []
+                for peer in found:
+                    if peer.address not in crawled:
+                        crawled.add(peer.address)
+                        nodes.append(self.endpoint(peer))
+                if not nodes or len(self.peers) >= self.max_peers:
+                    break
+        return list(self.peers.values())
+
+    def _crawl_node(self, api) -> List[PeerInfo]:
+        from chainwebpy.chainweb_p2p.peer_endpoints import PeerEndpoints
+
+        endpoints = PeerEndpoints(api, self.transport)
+        found = []
+        networks = [("cut", None)] + [
+            (f"mempool/{chain}", chain) for chain in self.chains
+        ]
+        try:
+            for network, chain in networks:
+                cursor = None
+                while len(self.peers) < self.max_peers:
+                    if chain is None:
+                        page = endpoints.get_cut_network_peer_info(next=cursor)
+                    else:
+                        page = endpoints.get_chain_mempool_network_peer_info(
+                            chain, next=cursor
+                        )
+                    found.extend(self._add(page["items"], network))
+                    cursor = page["next"]
+                    if cursor is None:
+                        break
+        except Exception as e:
+            with self._lock:
+                self.errors[api.endpoint] = str(e)
+        return found
+
+    def _add(self, items: list, network: str) -> List[PeerInfo]:
+        added = []
+        with self._lock:
+            for item in items:
+                address = item["address"]
+                key = (address["hostname"], address["port"])
+                peer = self.peers.get(key)
+                if peer is None:
+                    if len(self.peers) >= self.max_peers:
+                        continue
+                    peer = self.peers[key] = PeerInfo(
+                        item["id"], address["hostname"], address["port"]
+                    )
+                    self._pin(peer)
+                    added.append(peer)
+                peer.networks.add(network)
+        return added
+
+    def probe(self, peers: Iterable[PeerInfo] = None) -> List[PeerInfo]:
+        """Measure the latency and cut height of peers concurrently.
+
+        Args:
+            `peers` (Iterable[PeerInfo], optional): The peers to probe. Defaults to every crawled peer.
+        """
+        peers = list(self.peers.values() if peers is None else peers)
+        with self._lock:
+            for peer in peers:
+                self._pin(peer)
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            list(pool.map(self._probe, peers))
+        return peers
+
+    def _probe(self, peer: PeerInfo):
+        from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+
+        cut = CutEndpoints(self.endpoint(peer), self.transport)
+        latency: Optional[float] = None
+        try:
+            for _ in range(self.samples):
+                started = time.perf_counter()
+                height = cut.get_current_cut()["height"]
+                elapsed = time.perf_counter() - started
+                latency = elapsed if latency is None else min(latency, elapsed)
+        except Exception as e:
+            peer.latency = peer.height = None
+            peer.error = str(e)
+        else:
+            peer.latency = latency
+            peer.height = height
+            peer.error = None
+        peer.probed = time.time()
+
+    def run(self, max_lag: int = 40) -> PeerMap:
+        """Crawl, probe every peer and rank them.
+
+        Args:
+            `max_lag` (int, optional): See `PeerMap`. Defaults to 40.
+        """
+        self.crawl()
+        self.probe()
+        return PeerMap(
+            self.peers.values(), self.version, self.api_version, max_lag
+        )
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, Iterable
+
+from chainwebpy.transport import Request, Transport, TransportWrapper
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key.
+
+    While a call for a key is in flight, further calls with the same key do not run their function; they wait for the outstanding call and receive its result (or its exception). Threads and asyncio tasks share the same in-flight calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def _join(self, key: Hashable):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result, error):
+        with self._lock:
+            del self._calls[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable):
+        """Run `fn` unless a call with the same key is already in flight, in which case wait for it.
+
+        Args:
+            `key` (Hashable): The call key.
+            `fn` (Callable): A function without arguments.
+
+        Returns:
+            The result of the call that was in flight for `key`.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, None, e)
+            raise
+
+        self._finish(key, future, result, None)
+        return result
+
+    async def do_async(self, key: Hashable, fn: Callable):
+        """Coroutine version of `do`. `fn` is a blocking function and runs in the loop's default executor if no call with the same key is in flight.
+
+        Args:
+            `key` (Hashable): The call key.
+            `fn` (Callable): A function without arguments.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, fn)
+        except BaseException as e:
+            self._finish(key, future, None, e)
+            raise
+
+        self._finish(key, future, result, None)
+        return result
+
+    def in_flight(self) -> int:
+        """Return the number of keys with an outstanding call."""
+        with self._lock:
+            return len(self._calls)
+
+
+class SingleFlightTransport(TransportWrapper):
+    """Transport that shares one outstanding HTTP call between concurrent identical requests.
+
+    Requests are identical if their method, url, params and body are equal. All callers receive the same response object. Streamed requests are never shared.
+
+    Asyncio tasks that call endpoint methods through `asyncio.to_thread` or an executor share in-flight calls with threads. `send_async` can be awaited directly.
+
+    Args:
+        `inner` (Transport, optional): The wrapped transport. Defaults to a new `Transport`.
+        `methods` (Iterable[str], optional): The HTTP methods whose requests are deduplicated. Defaults to ("GET",).
+    """
+
+    def __init__(
+        self, inner: Transport = None, methods: Iterable[str] = ("GET",)
+    ):
+        super().__init__(inner)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.flight = SingleFlight()
+
+    def send(self, request: Request):
+        if request.stream or request.method not in self.methods:
+            return self.inner.send(request)
+
+        return self.flight.do(request.key, lambda: self.inner.send(request))
+
+    async def send_async(self, request: Request):
+        """Send a request from a coroutine without blocking the event loop.
+
+        Args:
+            `request` (Request): The request to send.
+        """
+        if request.stream or request.method not in self.methods:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.inner.send, request
+            )
+
+        return await self.flight.do_async(
+            request.key, lambda: self.inner.send(request)
+        )
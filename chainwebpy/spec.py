@@ -0,0 +1,449 @@
+import json
+from operator import itemgetter
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from chainwebpy.transport import Transport, default_transport
+from chainwebpy.url import (
+    GenericNodeAPIEndpoint,
+    P2PBootstrapAPIEndpoint,
+    ServiceAPIEndpoint,
+)
+
+_REQUIRED = object()
+
+_TYPES = {
+    int: (int, "an integer"),
+    str: (str, "a string"),
+    list: (List[str], "a list of strings"),
+    bytes: (bytes, "bytes"),
+}
+
+
+class Param(object):
+    """One argument of an endpoint method.
+
+    Args:
+        `name` (str): The argument name.
+        `type` (type, optional): One of int, str, list or bytes, or None for an unchecked argument. Integers must not be negative. Defaults to int.
+        `location` (str, optional): Where the argument goes: "path" (a field of the path template), "query", "body" (the JSON request body), "field" (a field of a JSON object request body), "raw" (the raw request body) or "accept" (selects the Accept header and response kind, see `EndpointSpec`). Defaults to "query".
+        `default` (optional): The default value. Arguments without a default are required.
+        `choices` (tuple, optional): The allowed values. Defaults to None.
+        `wire` (str, optional): The name of a "query" or "field" argument on the wire. Defaults to `name`.
+        `query` (bool, optional): Also send a "path" argument as a query parameter named `wire`, as the methods of the first releases did. Defaults to False.
+        `error` (type, optional): The exception raised if the argument is not of `type`. Defaults to TypeError.
+    """
+
+    __slots__ = (
+        "name",
+        "type",
+        "location",
+        "default",
+        "choices",
+        "wire",
+        "query",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        type: type = int,
+        location: str = "query",
+        default=_REQUIRED,
+        choices: tuple = None,
+        wire: str = None,
+        query: bool = False,
+        error: type = TypeError,
+    ):
+        if location not in ("path", "query", "body", "field", "raw", "accept"):
+            raise ValueError(f"Invalid location {location!r}")
+        if type is not None and type not in _TYPES:
+            raise ValueError(f"Invalid type {type!r}")
+
+        self.name = name
+        self.type = type
+        self.location = location
+        self.default = default
+        self.choices = choices
+        self.wire = wire if wire is not None else name
+        self.query = query
+        self.error = error
+
+    @property
+    def required(self) -> bool:
+        return self.default is _REQUIRED
+
+    def __repr__(self) -> str:
+        return f"Param({self.name!r}, {self.location!r})"
+
+
+class EndpointSpec(object):
+    """Declarative description of an endpoint method.
+
+    Endpoint classes declare specs as class attributes; `EndpointGroup` turns every spec into a method with the same name when the class is created.
+
+    Args:
+        `method` (str): The HTTP method.
+        `path` (str): The path template relative to the node endpoint, e.g. "/chain/{chain}/header/{blockHash}". Fields are "path" parameters.
+        `params` (Param): The method arguments, in signature order.
+        `accept` (Union[str, Dict[str, tuple]], optional): The Accept header, or a map from the values of the "accept" parameter to (Accept header, response kind) or (Accept header, response kind, decoder), where the decoder is applied to the decoded response. Defaults to None.
+        `response` (str, optional): How the body is decoded, see `Transport.call`. Defaults to "json".
+        `content_type` (str, optional): The Content-type header. Defaults to "application/json".
+        `stream` (str, optional): The streaming response kind of the method, "items" or "array" (see `Transport.call`). The method gets a trailing `stream` argument that returns a `chainwebpy.stream.ItemStream` instead of the decoded body. Defaults to None.
+        `doc` (str, optional): The docstring of the method.
+    """
+
+    __slots__ = (
+        "name",
+        "method",
+        "path",
+        "params",
+        "accept",
+        "response",
+        "content_type",
+        "stream",
+        "doc",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        *params: Param,
+        accept: Union[str, Dict[str, tuple]] = None,
+        response: str = "json",
+        content_type: str = "application/json",
+        stream: str = None,
+        doc: str = None,
+    ):
+        if stream not in (None, "items", "array"):
+            raise ValueError(f"Invalid stream {stream!r}")
+
+        self.name = None
+        self.method = method
+        self.path = path
+        self.params = params
+        self.accept = accept
+        self.response = response
+        self.content_type = content_type
+        self.stream = stream
+        self.doc = doc
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def headers(self) -> Dict[str, Tuple[dict, str, Callable]]:
+        """The request headers, built once and shared by every call.
+
+        Returns a map from the values of the "accept" parameter to (headers, response kind, decoder), or {None: (headers, response kind, None)} if the spec has no "accept" parameter.
+        """
+        if isinstance(self.accept, dict):
+            return {
+                choice: (
+                    {"Content-type": self.content_type, "Accept": accept[0]},
+                    accept[1],
+                    accept[2] if len(accept) > 2 else None,
+                )
+                for choice, accept in self.accept.items()
+            }
+
+        headers = {"Content-type": self.content_type}
+        if self.accept is not None:
+            headers["Accept"] = self.accept
+        return {None: (headers, self.response, None)}
+
+    def _path(self) -> Tuple[str, Tuple[int, ...]]:
+        """The path as a %-format template and the argument index of every field."""
+        parsed = list(Formatter().parse(self.path))
+        fields = {f for _, f, _, _ in parsed if f}
+        path = {p.name for p in self.params if p.location == "path"}
+        if fields != path:
+            raise ValueError(
+                f"{self.name}: path fields {sorted(fields)} do not match path parameters {sorted(path)}"
+            )
+        names = [p.name for p in self.params]
+        template = "".join(
+            literal.replace("%", "%%") + ("%s" if f else "")
+            for literal, f, _, _ in parsed
+        )
+        return template, tuple(names.index(f) for _, f, _, _ in parsed if f)
+
+    def signature(self):
+        """The `inspect.Signature` of the method of this spec."""
+        import inspect
+
+        parameters = [
+            inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        ]
+        for p in self.params:
+            parameters.append(
+                inspect.Parameter(
+                    p.name,
+                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    default=(
+                        inspect.Parameter.empty if p.required else p.default
+                    ),
+                    annotation=(
+                        _TYPES[p.type][0]
+                        if p.type is not None
+                        else inspect.Parameter.empty
+                    ),
+                )
+            )
+        if self.stream is not None:
+            parameters.append(
+                inspect.Parameter(
+                    "stream",
+                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    default=False,
+                    annotation=bool,
+                )
+            )
+        return inspect.Signature(parameters)
+
+    def compile(self, module: str = None, qualname: str = None):
+        """Build the method of this spec.
+
+        The url template, headers, argument checks and the positions of the query, body and path arguments are prepared here once, and the method is a closure over them.
+        """
+        template, path = self._path()
+        table = self.headers()
+        name, method, kind = self.name, self.method, self.stream
+
+        names = [p.name for p in self.params]
+        defaults = [p.default for p in self.params]
+        if kind is not None:
+            names.append("stream")
+            defaults.append(False)
+        count = len(names)
+        positions = {n: i for i, n in enumerate(names)}
+        # Required arguments come first, so the defaults of the arguments
+        # after the given positional ones complete a call.
+        least = sum(p.required for p in self.params)
+        tails = [tuple(defaults[i:]) for i in range(count + 1)]
+        checks = tuple(
+            (i, check)
+            for i, check in enumerate(_check(p) for p in self.params)
+            if check is not None
+        )
+        build = _query(self.params)
+        encode = _body(self.params)
+        accept = next(
+            (i for i, p in enumerate(self.params) if p.location == "accept"),
+            None,
+        )
+        single = path[0] if len(path) == 1 else None
+        fields_of = itemgetter(*path) if len(path) > 1 else None
+
+        def bind(args: tuple, kwargs: dict) -> list:
+            given = len(args)
+            if given > count:
+                raise TypeError(
+                    f"{name}() takes {count + 1} positional arguments but {given + 1} were given"
+                )
+            values = list(args)
+            values += tails[given]
+            for key, value in kwargs.items():
+                i = positions.get(key, -1)
+                if i < given:
+                    if i < 0:
+                        raise TypeError(
+                            f"{name}() got an unexpected keyword argument {key!r}"
+                        )
+                    raise TypeError(
+                        f"{name}() got multiple values for argument {key!r}"
+                    )
+                values[i] = value
+            if given < least:
+                for i in range(given, least):
+                    if values[i] is _REQUIRED:
+                        raise TypeError(
+                            f"{name}() missing required argument: {names[i]!r}"
+                        )
+            return values
+
+        def call(self, *args, **kwargs):
+            given = len(args)
+            if kwargs or given < least or given > count:
+                args = bind(args, kwargs)
+            elif given != count:
+                args += tails[given]
+            if self.validate:
+                for i, check in checks:
+                    check(self, args[i])
+
+            headers, response, decoder = table[
+                None if accept is None else args[accept]
+            ]
+            if kind is not None and args[-1]:
+                if decoder is not None:
+                    raise ValueError(
+                        f"stream is not supported with {names[accept]} {args[accept]!r}"
+                    )
+                response = kind
+
+            if single is not None:
+                url = template % (args[single],)
+            elif fields_of is not None:
+                url = template % fields_of(args)
+            else:
+                url = template
+            result = self.transport.call(
+                name,
+                method,
+                self.node.endpoint + url,
+                params=None if build is None else build(args),
+                headers=headers,
+                data=None if encode is None else encode(args),
+                response=response,
+            )
+            return result if decoder is None else decoder(result)
+
+        call.__name__ = name
+        call.__qualname__ = name if qualname is None else f"{qualname}.{name}"
+        if module is not None:
+            call.__module__ = module
+        call.__doc__ = self.doc
+        call.__signature__ = self.signature()
+        call.__annotations__ = {
+            p: parameter.annotation
+            for p, parameter in call.__signature__.parameters.items()
+            if parameter.annotation is not parameter.empty
+        }
+        call.spec = self
+        return call
+
+    def __repr__(self) -> str:
+        return f"EndpointSpec({self.method!r}, {self.path!r})"
+
+
+def _query(params: Tuple[Param, ...]) -> Optional[Callable]:
+    """The function from the arguments to the query parameters, or None if there are none. Optional arguments that are None are left out."""
+    query = tuple(
+        (p.wire, i, p.required)
+        for i, p in enumerate(params)
+        if p.location == "query" or p.query
+    )
+    if not query:
+        return None
+
+    def build(args) -> dict:
+        result = {}
+        for wire, i, required in query:
+            if required or args[i] is not None:
+                result[wire] = args[i]
+        return result
+
+    return build
+
+
+def _body(params: Tuple[Param, ...]) -> Optional[Callable]:
+    """The function from the arguments to the request body, or None if there is none."""
+    fields = tuple(
+        (p.wire, i) for i, p in enumerate(params) if p.location == "field"
+    )
+    if fields:
+        return lambda args: json.dumps({wire: args[i] for wire, i in fields})
+
+    for i, p in enumerate(params):
+        if p.location == "body":
+            return lambda args: json.dumps(args[i])
+        if p.location == "raw":
+            return itemgetter(i)
+    return None
+
+
+def _check(p: Param) -> Optional[Callable]:
+    """The argument check of a parameter, a function of the endpoint object and the value, or None if the parameter is unchecked."""
+    if p.type is None and p.choices is None:
+        return None
+
+    name, cls = p.name, p.type
+    article = _TYPES[cls][1] if cls is not None else None
+    chain = name == "chain" and cls is int
+    choices = frozenset(p.choices) if p.choices is not None else None
+    if choices is not None:
+        names = ", ".join(repr(c) for c in p.choices[:-1])
+        if len(p.choices) > 1:
+            names = f"{names} or {p.choices[-1]!r}"
+        else:
+            names = repr(p.choices[0])
+    optional = p.default is None
+    error = p.error
+
+    def check(group, value):
+        if optional and value is None:
+            return
+        if cls is not None:
+            if not isinstance(value, cls):
+                raise error(f"{name} must be {article}")
+            elif cls is int and value < 0:
+                raise ValueError(f"{name} must be greater than 0")
+            elif (
+                chain and group.chains is not None and value not in group.chains
+            ):
+                raise ValueError(
+                    f"chain {value} is not a chain of the chain graph"
+                )
+        if choices is not None and value not in choices:
+            raise ValueError(f"{name} must be one of {names}")
+
+    return check
+
+
+class EndpointGroup(object):
+    """Base class of the endpoint classes.
+
+    Every `EndpointSpec` class attribute of a subclass is replaced by the method built from it. The specs of a class are listed in its `specs` attribute.
+
+    Args:
+        `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
+        `transport` (Transport, optional): The transport that sends the requests. Defaults to the shared default transport.
+        `validate` (bool, optional): Check the types and values of the arguments of every call. Trusted callers that build their arguments from node responses can turn the checks off. Defaults to True.
+        `chains` (Iterable[int], optional): The chain ids of the node, e.g. `ChainGraph.chains` (see `chainwebpy.chain_graph`). If set, the chain argument is checked locally instead of by a round trip. Defaults to None.
+    """
+
+    specs: Dict[str, EndpointSpec] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        specs = dict(cls.specs)
+        for name, value in list(vars(cls).items()):
+            if isinstance(value, EndpointSpec):
+                specs[name] = value
+                setattr(
+                    cls,
+                    name,
+                    value.compile(cls.__module__, cls.__qualname__),
+                )
+        cls.specs = specs
+
+    def __init__(
+        self,
+        api: Union[
+            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
+        ],
+        transport: Transport = None,
+        validate: bool = True,
+        chains: Iterable[int] = None,
+    ):
+        self.node = api
+        self.transport = (
+            transport if transport is not None else default_transport()
+        )
+        self.validate = validate
+        self.chains = frozenset(chains) if chains is not None else None
+
+    def set_node_endpoint(
+        self,
+        api: Union[
+            GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint
+        ],
+    ):
+        """Set the node url that serves endpoints.
+
+        Args:
+            `api` (Union[GenericNodeAPIEndpoint, P2PBootstrapAPIEndpoint, ServiceAPIEndpoint]): The node url that serves endpoints.
+        """
+        self.node = api
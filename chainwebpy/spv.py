@@ -0,0 +1,227 @@
+"""SPV proofs of transaction outputs and their local verification.
+
+`SpvClient` requests proofs from the Pact `spv` endpoint of a node, many at once, and keeps them in an LRU cache keyed by request key and target chain. A proof is a Merkle path from the output of a transaction to the hash of a block of the target chain; `verify` runs the path and checks that the root is the hash of a block header that was added to the client, without any request to a node.
+
+```
+spv = SpvClient(cw)
+spv.add_headers(cw.headers.get_block_headers(1, minheight=4_000_000)["items"])
+proof = spv.proof(0, "IgZ0l7Uu3TPkEUn6A5RFqLjs5uuPbHcUaWfu5Mi1N-E", 1)
+spv.verify(proof)
+```
+"""
+
+import hashlib
+import json
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from chainwebpy.header import b64url, unb64url
+
+_STEP = 33
+
+
+def _leaf(data: bytes) -> bytes:
+    return hashlib.new("sha512_256", b"\x00" + data).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.new("sha512_256", b"\x01" + left + right).digest()
+
+
+class SpvProof(object):
+    """A parsed SPV proof.
+
+    `chain` is the target chain, `subject` the proven transaction output as JSON bytes, `position` the index of the subject among the outputs of its block and `steps` the Merkle path from the subject to a block hash of the target chain as (side, sibling hash) pairs, with side 0 if the sibling is the left child.
+
+    Args:
+        `raw` (str): The proof as returned by `PactEndpoints.spv`.
+    """
+
+    __slots__ = ("raw", "chain", "subject", "position", "steps", "algorithm")
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        proof = json.loads(unb64url(raw))
+        self.chain = int(proof["chain"])
+        self.subject = unb64url(proof["subject"]["input"])
+        self.algorithm = proof.get("algorithm", "SHA512t_256")
+        if self.algorithm != "SHA512t_256":
+            raise ValueError(f"Unsupported proof algorithm {self.algorithm!r}")
+        obj = unb64url(proof["object"])
+        count, self.position = struct.unpack_from(">IQ", obj)
+        if len(obj) != 12 + count * _STEP:
+            raise ValueError("Malformed proof object")
+        self.steps = [
+            (obj[i], obj[i + 1 : i + _STEP]) for i in range(12, len(obj), _STEP)
+        ]
+
+    @property
+    def output(self) -> dict:
+        """The proven transaction output."""
+        return json.loads(self.subject)
+
+    def root(self) -> bytes:
+        """The root of the Merkle path, the hash of the block the proof ends in."""
+        h = _leaf(self.subject)
+        for side, sibling in self.steps:
+            h = _node(sibling, h) if side == 0 else _node(h, sibling)
+        return h
+
+    def __repr__(self) -> str:
+        return f"SpvProof(chain={self.chain}, steps={len(self.steps)})"
+
+
+class SpvClient(object):
+    """Fetches, caches and verifies SPV proofs.
+
+    Args:
+        `client` (ChainwebClient): The client of a node with the Pact API.
+        `concurrency` (int, optional): The number of proof requests in flight at most in `proofs`. Defaults to 8.
+        `cache_size` (int, optional): The number of proofs cached at most; the least recently used are evicted first. Defaults to 10000.
+    """
+
+    def __init__(self, client, concurrency: int = 8, cache_size: int = 10000):
+        if concurrency < 1:
+            raise ValueError("concurrency must be greater than 0")
+        if cache_size < 0:
+            raise ValueError("cache_size must be positive")
+        self.client = client
+        self.concurrency = concurrency
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Tuple[str, int], SpvProof]" = OrderedDict()
+        self._blocks: Dict[bytes, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def add_headers(self, headers: Iterable) -> int:
+        """Add block headers that proofs are verified against.
+
+        Args:
+            `headers` (Iterable): Headers as objects or `chainwebpy.header.BlockHeader` records.
+
+        Returns:
+            int: The number of headers added.
+        """
+        blocks = {}
+        for h in headers:
+            if isinstance(h, dict):
+                blocks[unb64url(h["hash"])] = (h["chainId"], h["height"])
+            else:
+                blocks[h.hash] = (h.chainId, h.height)
+        with self._lock:
+            self._blocks.update(blocks)
+        return len(blocks)
+
+    def _cached(self, key: Tuple[str, int]):
+        with self._lock:
+            proof = self._cache.get(key)
+            if proof is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(key)
+            return proof
+
+    def _store(self, key: Tuple[str, int], proof: SpvProof):
+        if self.cache_size == 0:
+            return
+        with self._lock:
+            self._cache[key] = proof
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _fetch(self, chain: int, request_key: str, target: int) -> SpvProof:
+        proof = SpvProof(self.client.pact.spv(chain, request_key, str(target)))
+        self._store((request_key, target), proof)
+        return proof
+
+    def proof(self, chain: int, request_key: str, target: int) -> SpvProof:
+        """The proof of a transaction output for a target chain, from the cache or the node.
+
+        Args:
+            `chain` (int): The id of the chain of the transaction.
+            `request_key` (str): The request key of the transaction.
+            `target` (int): The id of the target chain.
+        """
+        proof = self._cached((request_key, target))
+        if proof is None:
+            proof = self._fetch(chain, request_key, target)
+        return proof
+
+    def proofs(
+        self, requests: Iterable[Tuple[int, str, int]]
+    ) -> List[SpvProof]:
+        """The proofs of many transaction outputs, in request order. Proofs that are not cached are requested concurrently.
+
+        Args:
+            `requests` (Iterable[Tuple[int, str, int]]): (chain, request key, target chain) triples.
+        """
+        requests = list(requests)
+        found = [self._cached((key, target)) for _, key, target in requests]
+        missing = {}
+        for request, proof in zip(requests, found):
+            if proof is None:
+                missing.setdefault((request[1], request[2]), request)
+        if missing:
+            with ThreadPoolExecutor(self.concurrency) as pool:
+                fetched = dict(
+                    zip(
+                        missing,
+                        pool.map(lambda r: self._fetch(*r), missing.values()),
+                    )
+                )
+            found = [
+                proof if proof is not None else fetched[(key, target)]
+                for (_, key, target), proof in zip(requests, found)
+            ]
+        return found
+
+    def verify(self, proof, fetch: bool = False) -> Tuple[int, int]:
+        """Check that a proof ends in a known block of its target chain.
+
+        Args:
+            `proof` (Union[SpvProof, str]): The proof, parsed or as returned by the node.
+            `fetch` (bool, optional): Request the header of an unknown root from the node instead of failing. Defaults to False.
+
+        Raises:
+            `ValueError`: If the root of the proof is not the hash of a known block of the target chain.
+
+        Returns:
+            Tuple[int, int]: The chain and height of the block the proof ends in.
+        """
+        if not isinstance(proof, SpvProof):
+            proof = SpvProof(proof)
+        root = proof.root()
+        block = self._blocks.get(root)
+        if block is None and fetch:
+            try:
+                header = self.client.headers.get_block_headers_by_hash(
+                    proof.chain, b64url(root)
+                )
+            except Exception:
+                header = None
+            if header is not None:
+                self.add_headers([header])
+                block = self._blocks.get(root)
+        if block is None:
+            raise ValueError(
+                f"Proof root {b64url(root)} is not a known block of chain {proof.chain}"
+            )
+        if block[0] != proof.chain:
+            raise ValueError(
+                f"Proof root is a block of chain {block[0]}, not of chain {proof.chain}"
+            )
+        return block
+
+    def clear(self):
+        """Drop the cached proofs."""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
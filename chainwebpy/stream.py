@@ -0,0 +1,266 @@
+"""Incremental parsing of large JSON responses and server sent events.
+
+`ItemStream` parses a response body as it is downloaded and yields the items of its `items` array, or the elements of a top level array, one at a time. Only the item being parsed and the chunk being read are held in memory, so the peak memory of a call is bounded by the largest item rather than the whole response. `EventStream` yields the server sent events of a response as they arrive.
+"""
+
+import codecs
+import json
+import re
+from typing import Callable, Iterable, Iterator, Optional
+
+CHUNK_SIZE = 65536
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_NUMBER_START = frozenset("-0123456789")
+
+_NUMBER_REST = frozenset(("",) + tuple("0123456789.eE+-"))
+
+_decode = json.JSONDecoder().raw_decode
+
+
+class _Reader(object):
+    """A text buffer over a byte chunk iterator that only keeps the unparsed rest of the body."""
+
+    __slots__ = ("_chunks", "_decoder", "buffer", "pos", "eof")
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int) -> bool:
+        """Read chunks until at least `size` unparsed characters are buffered. Returns False at the end of the body."""
+        parts = [self.buffer[self.pos :]]
+        available = len(parts[0])
+        read = False
+        while available < size and not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._decoder.decode(b"", True)
+            else:
+                text = self._decoder.decode(chunk)
+            if text:
+                parts.append(text)
+                available += len(text)
+                read = True
+        self.buffer = "".join(parts)
+        self.pos = 0
+        return read
+
+    def skip(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill(1):
+                return
+
+    def char(self) -> str:
+        """Consume and return the next non-whitespace character."""
+        self.skip()
+        if self.pos >= len(self.buffer):
+            raise ValueError("Unexpected end of JSON response")
+        c = self.buffer[self.pos]
+        self.pos += 1
+        return c
+
+    def peek(self) -> str:
+        self.skip()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def value(self):
+        """Parse one JSON value, reading more of the body as needed."""
+        self.skip()
+        while True:
+            try:
+                value, end = _decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: at least double the buffered text before
+                # trying again, so a large item is parsed in linear time.
+                available = len(self.buffer) - self.pos
+                if not self.fill(max(2 * available, available + 1)):
+                    raise
+                continue
+            if (
+                not self.eof
+                and self.buffer[self.pos] in _NUMBER_START
+                and self.buffer[end : end + 1] in _NUMBER_REST
+            ):
+                # A number at the end of the buffer may continue in the next chunk.
+                self.fill(len(self.buffer) - self.pos + 1)
+                continue
+            self.pos = end
+            return value
+
+
+class ItemStream(object):
+    """The items of a JSON response, parsed as the body is downloaded.
+
+    Iterate the stream once to receive the items. The other members of a paged response, such as `next`, come after the items on the wire and are available in `fields` once the items are exhausted. The response is closed when the items are exhausted or the stream is closed; streams are also context managers.
+
+    Args:
+        `chunks` (Iterable[bytes]): The chunks of the response body.
+        `key` (str, optional): The member of the top level object whose array items are yielded, or None to yield the elements of a top level array. Defaults to "items".
+        `close` (Callable, optional): Called when the stream is exhausted or closed, e.g. to release the connection. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        key: Optional[str] = "items",
+        close: Callable = None,
+    ):
+        self.key = key
+        self.fields = {}
+        self._close = close
+        self._items = self._parse(_Reader(chunks))
+
+    @property
+    def next(self) -> Optional[str]:
+        """The cursor of the next page, available once the items are exhausted."""
+        return self.fields.get("next")
+
+    @property
+    def limit(self) -> Optional[int]:
+        """The number of items of the page, available once the items are exhausted."""
+        return self.fields.get("limit")
+
+    def __iter__(self) -> Iterator:
+        return self._items
+
+    def __next__(self):
+        return next(self._items)
+
+    def close(self):
+        """Stop parsing and release the response."""
+        self._items.close()
+        self._release()
+
+    def __enter__(self) -> "ItemStream":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _parse(self, reader: _Reader) -> Iterator:
+        try:
+            if self.key is None:
+                yield from _array(reader)
+                return
+
+            if reader.char() != "{":
+                raise ValueError("Expected a JSON object")
+            if reader.peek() == "}":
+                reader.char()
+                return
+            while True:
+                key = reader.value()
+                if reader.char() != ":":
+                    raise ValueError("Expected ':' in JSON object")
+                if key == self.key and reader.peek() == "[":
+                    yield from _array(reader)
+                else:
+                    self.fields[key] = reader.value()
+                c = reader.char()
+                if c == "}":
+                    return
+                if c != ",":
+                    raise ValueError("Expected ',' or '}' in JSON object")
+        finally:
+            self._release()
+
+    def _release(self):
+        close, self._close = self._close, None
+        if close is not None:
+            close()
+
+
+def _array(reader: _Reader) -> Iterator:
+    if reader.char() != "[":
+        raise ValueError("Expected a JSON array")
+    if reader.peek() == "]":
+        reader.char()
+        return
+    while True:
+        yield reader.value()
+        c = reader.char()
+        if c == "]":
+            return
+        if c != ",":
+            raise ValueError("Expected ',' or ']' in JSON array")
+
+
+class EventStream(object):
+    """The server sent events of a response, parsed as they arrive.
+
+    The response is closed when the events are exhausted or the stream is closed; streams are also context managers.
+
+    Args:
+        `lines` (Iterable[bytes]): The lines of the response body.
+        `close` (Callable, optional): Called when the stream is exhausted or closed, e.g. to release the connection. Defaults to None.
+    """
+
+    def __init__(self, lines: Iterable[bytes], close: Callable = None):
+        self._close = close
+        self._events = iter_events(lines)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self
+
+    def __next__(self) -> dict:
+        try:
+            return next(self._events)
+        except BaseException:
+            self._release()
+            raise
+
+    def close(self):
+        """Stop reading and release the response."""
+        self._events.close()
+        self._release()
+
+    def __enter__(self) -> "EventStream":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _release(self):
+        close, self._close = self._close, None
+        if close is not None:
+            close()
+
+
+def iter_events(lines: Iterable[bytes]) -> Iterator[dict]:
+    """Parse server sent events.
+
+    Args:
+        `lines` (Iterable[bytes]): The lines of an event stream, e.g. `response.iter_lines()`.
+
+    Returns:
+        Iterator[dict]: The events, as dictionaries with the "event" type and the JSON decoded "data".
+    """
+    event = None
+    data = []
+    for line in lines:
+        line = line.decode("utf-8") if isinstance(line, bytes) else line
+        if not line:
+            if data:
+                yield {
+                    "event": event or "message",
+                    "data": json.loads("\n".join(data)),
+                }
+            event = None
+            data = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
@@ -0,0 +1,280 @@
+import time
+from typing import Optional
+
+from chainwebpy.metrics import (
+    NOOP_HOOKS,
+    CallRecord,
+    Hooks,
+    _set_record,
+    current_record,
+    timed_adapter,
+)
+
+_STREAMED = frozenset(("items", "array", "events"))
+
+
+class Request(object):
+    """A single HTTP request issued by an endpoint method.
+
+    Args:
+        `name` (str): The name of the endpoint method issuing the request, e.g. "get_current_cut".
+        `method` (str): The HTTP method.
+        `url` (str): The full request url.
+        `params` (dict, optional): The query parameters. Defaults to None.
+        `headers` (dict, optional): The request headers. Defaults to None.
+        `data` (Union[str, bytes], optional): The request body. Defaults to None.
+        `stream` (bool, optional): Whether the response body is read lazily. Defaults to False.
+    """
+
+    __slots__ = ("name", "method", "url", "params", "headers", "data", "stream")
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        params: dict = None,
+        headers: dict = None,
+        data=None,
+        stream: bool = False,
+    ):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = headers
+        self.data = data
+        self.stream = stream
+
+    @property
+    def key(self) -> tuple:
+        """The identity of the request: method, url, params, body and the Accept header."""
+        params = self.params
+        if params:
+            params = tuple(
+                sorted((k, v) for k, v in params.items() if v is not None)
+            )
+        headers = self.headers
+        accept = headers.get("Accept") if headers else None
+        return (self.method, self.url, params or None, self.data, accept)
+
+    def __repr__(self) -> str:
+        return f"Request({self.name!r}, {self.method!r}, {self.url!r})"
+
+
+class Transport(object):
+    """Sends the HTTP requests of the endpoint classes.
+
+    The default implementation sends requests through one `requests.Session`, so connections to a node are pooled and reused between calls. Transports can be wrapped (see `TransportWrapper`) to add behaviour such as request deduplication.
+
+    Args:
+        `session` (requests.Session, optional): The session used to send requests. Defaults to a new session.
+        `timeout` (float, optional): Timeout in seconds for every request. Defaults to None.
+        `hooks` (Hooks, optional): Receive a `CallRecord` for every call, see `chainwebpy.metrics`. Defaults to no hooks.
+    """
+
+    def __init__(
+        self, session=None, timeout: float = None, hooks: Hooks = None
+    ):
+        self._session = session
+        self.timeout = timeout
+        self.hooks = hooks if hooks is not None else NOOP_HOOKS
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+
+            session = requests.Session()
+            session.mount("http://", timed_adapter())
+            session.mount("https://", timed_adapter())
+            self._session = session
+        return self._session
+
+    def send(self, request: Request):
+        """Send a request and return the response.
+
+        Args:
+            `request` (Request): The request to send.
+        """
+        record = current_record()
+        if record is None:
+            return self.session.request(
+                request.method,
+                request.url,
+                params=request.params,
+                headers=request.headers,
+                data=request.data,
+                stream=request.stream,
+                timeout=self.timeout,
+            )
+
+        phases = record.phases
+        connecting = (
+            phases.get("dns", 0.0)
+            + phases.get("connect", 0.0)
+            + phases.get("tls", 0.0)
+        )
+        started = time.perf_counter()
+        r = self.session.request(
+            request.method,
+            request.url,
+            params=request.params,
+            headers=request.headers,
+            data=request.data,
+            stream=True,
+            timeout=self.timeout,
+        )
+        first_byte = time.perf_counter()
+        connecting = (
+            phases.get("dns", 0.0)
+            + phases.get("connect", 0.0)
+            + phases.get("tls", 0.0)
+            - connecting
+        )
+        record.add("ttfb", max(first_byte - started - connecting, 0.0))
+        if request.data is not None:
+            record.bytes_out += len(request.data)
+        retries = getattr(r.raw, "retries", None)
+        if retries is not None and retries.history:
+            record.retries += len(retries.history)
+        if request.stream:
+            record.bytes_in += int(r.headers.get("Content-Length") or 0)
+        else:
+            record.bytes_in += len(r.content)
+            record.add("download", time.perf_counter() - first_byte)
+        return r
+
+    def call(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        params: dict = None,
+        headers: dict = None,
+        data=None,
+        response: str = "json",
+    ):
+        """Send a request on behalf of an endpoint method and decode the response.
+
+        Args:
+            `name` (str): The name of the endpoint method.
+            `method` (str): The HTTP method.
+            `url` (str): The full request url.
+            `params` (dict, optional): The query parameters. Defaults to None.
+            `headers` (dict, optional): The request headers. Defaults to None.
+            `data` (Union[str, bytes], optional): The request body. Defaults to None.
+            `response` (str, optional): How the body is decoded. Can be one of "json", "bytes", "text", "none", which accepts any 2xx status and returns None, "items", which streams the items of the `items` array of a JSON object, "array", which streams the elements of a JSON array, or "events", which streams server sent events. The streaming kinds return a `chainwebpy.stream.ItemStream`, or a `chainwebpy.stream.EventStream` for "events", that parses the body as it is downloaded. Defaults to "json".
+
+        Raises:
+            `Exception`: If the request fails.
+        """
+        request = Request(
+            name, method, url, params, headers, data, response in _STREAMED
+        )
+        hooks = self.hooks
+        if hooks.enabled:
+            return self._call_instrumented(hooks, request, response)
+
+        r = self.send(request)
+        self._check(r, response)
+        return self._decode(r, response)
+
+    def _call_instrumented(self, hooks: Hooks, request: Request, response):
+        record = CallRecord(request.name, request.method, request.url)
+        previous = _set_record(record)
+        started = time.perf_counter()
+        try:
+            r = self.send(request)
+            record.status = r.status_code
+            self._check(r, response)
+
+            decoding = time.perf_counter()
+            result = self._decode(r, response)
+            finished = time.perf_counter()
+            record.add("decode", finished - decoding)
+            record.add("total", finished - started)
+            return result
+        except BaseException as e:
+            record.error = type(e).__name__
+            record.add("total", time.perf_counter() - started)
+            raise
+        finally:
+            _set_record(previous)
+            hooks.on_call(record)
+
+    @staticmethod
+    def _check(r, response: str):
+        status = r.status_code
+        if status != 200 and (response != "none" or not 200 <= status < 300):
+            raise Exception(f"Status {status}: {r.text}")
+
+    @staticmethod
+    def _decode(r, response: str):
+        if response == "bytes":
+            return r.content
+
+        elif response == "text":
+            return r.text
+
+        elif response == "none":
+            return None
+
+        elif response == "events":
+            from chainwebpy.stream import EventStream
+
+            return EventStream(r.iter_lines(), r.close)
+
+        elif response in _STREAMED:
+            from chainwebpy.stream import CHUNK_SIZE, ItemStream
+
+            return ItemStream(
+                r.iter_content(CHUNK_SIZE),
+                "items" if response == "items" else None,
+                r.close,
+            )
+
+        return r.json()
+
+
+class TransportWrapper(Transport):
+    """Base class of transports that wrap another transport.
+
+    Args:
+        `inner` (Transport, optional): The wrapped transport. Defaults to a new `Transport`.
+    """
+
+    def __init__(self, inner: Transport = None):
+        self.inner = inner if inner is not None else Transport()
+        self._hooks = None
+
+    @property
+    def session(self):
+        return self.inner.session
+
+    @property
+    def hooks(self) -> Hooks:
+        """The hooks of this transport; those of the wrapped transport unless set."""
+        return self._hooks if self._hooks is not None else self.inner.hooks
+
+    @hooks.setter
+    def hooks(self, hooks: Hooks):
+        self._hooks = hooks
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self.inner.timeout
+
+    def send(self, request: Request):
+        return self.inner.send(request)
+
+
+_default_transport = None
+
+
+def default_transport() -> Transport:
+    """Return the transport shared by endpoint objects that are created without one."""
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = Transport()
+    return _default_transport
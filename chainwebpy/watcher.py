@@ -0,0 +1,202 @@
+"""Polling of the current cut with per-chain change events.
+
+A `CutWatcher` is an alternative to the block header event stream for networks where server sent events are unavailable, e.g. blocked by a proxy.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ChainAdvanced = namedtuple(
+    "ChainAdvanced",
+    (
+        "chain",
+        "height",
+        "hash",
+        "previous_height",
+        "previous_hash",
+        "cut_height",
+    ),
+)
+ChainAdvanced.__doc__ = """A chain advanced to a new block between two polled cuts.
+
+`previous_height` and `previous_hash` are those of the chain in the previous cut; the chain may have advanced by more than one block. `cut_height` is the height of the cut in which the chain advanced."""
+
+
+class CutWatcher(object):
+    """Polls the current cut on an adaptive interval and notifies subscribers of the chains that advanced.
+
+    All subscribers share one poll thread, which runs while there are subscribers. Consecutive cuts are compared chain by chain and every chain whose height grew produces a `ChainAdvanced` event. A cut lower than the last one, e.g. from a lagging node behind a load balancer, is skipped, so chains never appear to move backwards.
+
+    `latest` is the last polled cut.
+
+    The poll interval follows the expected block times: the watcher sleeps until the next block of the chain that advanced longest ago is due, then polls every `min_interval` seconds, doubling the interval after every poll without a change up to `max_interval`.
+
+    Args:
+        `endpoints` (CutEndpoints): The cut endpoints of the node to poll.
+        `block_time` (float, optional): The expected time between two blocks of a chain in seconds. Defaults to 30.
+        `min_interval` (float, optional): The shortest time between two polls in seconds. Defaults to 0.5.
+        `max_interval` (float, optional): The longest time between two polls in seconds. Defaults to 10.
+        `maxheight` (int, optional): Passed to every `get_current_cut` call, so that all subscribers see cuts up to the same height. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        endpoints,
+        block_time: float = 30.0,
+        min_interval: float = 0.5,
+        max_interval: float = 10.0,
+        maxheight: int = None,
+    ):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError(
+                "min_interval must be greater than 0 and at most max_interval"
+            )
+
+        self.endpoints = endpoints
+        self.block_time = block_time
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.maxheight = maxheight
+        self.latest = None
+        self.polls = 0
+        self._heights: Dict[int, dict] = {}
+        self._advanced: Dict[int, float] = {}
+        self._idle = 0
+        self._subscribers: List[Callable] = []
+        self._lock = threading.Lock()
+        # Serializes polls, e.g. of a stopping and a new poll thread. It is
+        # reentrant, so subscribers may poll from their callbacks.
+        self._poll_lock = threading.RLock()
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[ChainAdvanced], None]):
+        """Call `callback` with every `ChainAdvanced` event, from the poll thread.
+
+        Args:
+            `callback` (Callable[[ChainAdvanced], None]): The subscriber.
+
+        Returns:
+            Callable[[], None]: Cancels the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+            if self._stop is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._stop,),
+                    name="chainwebpy-cut-watcher",
+                    daemon=True,
+                )
+                self._thread.start()
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: Callable[[ChainAdvanced], None]):
+        """Cancel a subscription. The poll thread stops with the last subscription; unless called from the poll thread, this waits until it stopped."""
+        thread = None
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+            if not self._subscribers and self._stop is not None:
+                self._stop.set()
+                self._stop = None
+                thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def events(self, timeout: float = None) -> Iterator[ChainAdvanced]:
+        """Iterate the `ChainAdvanced` events of a new subscription, which starts at once and ends when the iterator is closed.
+
+        Args:
+            `timeout` (float, optional): Stop after this many seconds without an event. Defaults to None, which waits forever.
+        """
+        events = queue.Queue()
+        self.subscribe(events.put)
+        return self._drain(events, timeout)
+
+    def _drain(self, events: queue.Queue, timeout: Optional[float]):
+        try:
+            while True:
+                try:
+                    yield events.get(timeout=timeout)
+                except queue.Empty:
+                    return
+        finally:
+            self.unsubscribe(events.put)
+
+    def poll(self) -> List[ChainAdvanced]:
+        """Poll the current cut once and notify the subscribers.
+
+        Returns:
+            List[ChainAdvanced]: The chains that advanced since the previous poll.
+        """
+        with self._poll_lock:
+            return self._poll()
+
+    def _poll(self) -> List[ChainAdvanced]:
+        cut = self.endpoints.get_current_cut(self.maxheight)
+        self.polls += 1
+        now = time.monotonic()
+
+        if self.latest is not None and cut["height"] < self.latest["height"]:
+            self._idle += 1
+            return []
+
+        first = self.latest is None
+        self.latest = cut
+        events = []
+        for chain, block in cut["hashes"].items():
+            chain = int(chain)
+            previous = self._heights.get(chain)
+            if previous is not None and block["height"] <= previous["height"]:
+                continue
+            self._heights[chain] = block
+            if previous is not None:
+                self._advanced[chain] = now
+                events.append(
+                    ChainAdvanced(
+                        chain,
+                        block["height"],
+                        block["hash"],
+                        previous["height"],
+                        previous["hash"],
+                        cut["height"],
+                    )
+                )
+
+        self._idle = 0 if events or first else self._idle + 1
+        for callback in list(self._subscribers):
+            for event in events:
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Cut watcher subscriber failed")
+        return events
+
+    def interval(self) -> float:
+        """The time until the next poll in seconds."""
+        if self._advanced:
+            due = min(self._advanced.values()) + self.block_time
+            wait = due - time.monotonic()
+            if wait > self.min_interval:
+                return min(wait, self.max_interval)
+        return min(
+            self.min_interval * 2 ** min(self._idle, 32), self.max_interval
+        )
+
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                with self._poll_lock:
+                    self._idle += 1
+                logger.warning("Polling the current cut failed: %s", e)
+            stop.wait(self.interval())
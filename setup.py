@@ -14,16 +14,21 @@ setup(
     url="https://github.com/justmert/chainweb.py",
     download_url="https://github.com/justmert/chainweb.py/archive/refs/tags/0.1.7.tar.gz",
     keywords=["Kadena", "Rest", "Chainweb", "API"],
+    python_requires=">=3.7",
     install_requires=[
         "requests",
         "typing",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+        "parquet": ["pyarrow"],
+        "http2": ["httpx[http2]"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",  # Chose either "3 - Alpha", "4 - Beta" or "5 - Production/Stable" as the current state of your package
         "Intended Audience :: Developers",  # Define that your audience are developers
         "Topic :: Software Development :: Libraries :: Python Modules",
         "License :: OSI Approved :: MIT License",  # Again, pick a license
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
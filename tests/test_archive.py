@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy import archive as archive_module
+from chainwebpy.archive import HeaderArchive
+from chainwebpy.client import ChainwebClient
+from chainwebpy.header import decode
+
+np = pytest.importorskip("numpy")
+
+
+def test_append_lookup_and_scan(tmp_path, monkeypatch):
+    # Small steps, so that the files grow and the hash table is rebuilt.
+    monkeypatch.setattr(archive_module, "_RECORD_STEP", 16)
+    monkeypatch.setattr(archive_module, "_HEIGHT_STEP", 32)
+    monkeypatch.setattr(archive_module, "_HASH_CAPACITY", 8)
+    path = str(tmp_path / "5")
+
+    with SimulatedNode(chains=10, height=300) as node:
+        cw = ChainwebClient(node.api())
+        pages, cursor = [], None
+        while True:
+            page = cw.headers.get_block_headers(
+                5, limit=40, next=cursor, responseSchema="binary"
+            )
+            pages.append(page["items"])
+            cursor = page["next"]
+            if cursor is None:
+                break
+        headers = [h for items in pages for h in items]
+        assert len(headers) == 300
+
+    with HeaderArchive(path, writable=True) as writer:
+        with pytest.raises(Exception):
+            HeaderArchive(path, writable=True)
+        reader = HeaderArchive(path)
+        errors = []
+
+        def read():
+            while len(reader) < len(headers):
+                n = len(reader)
+                if n and reader.get(n - 1) != headers[n - 1]:
+                    errors.append(n)
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        for items in pages:
+            assert writer.append(items) == len(items)
+        thread.join(10)
+        assert not thread.is_alive() and not errors
+
+        assert writer.append(headers[:50]) == 0
+        assert writer.append(b"".join(headers[:3])) == 0
+        assert writer.chain == 5
+
+    reader.refresh()
+    assert len(reader) == 300
+    for height in (0, 17, 299):
+        assert reader.get(height) == headers[height]
+        block = decode(headers[height])
+        assert reader.by_hash(block.hash) == headers[height]
+        assert reader.record(height) == block
+    assert reader.get(300) is None and reader.by_hash(b"\0" * 32) is None
+
+    view = reader.scan(100, 200)
+    assert np.array_equal(view["height"], np.arange(100, 200))
+    assert view.tobytes() == b"".join(headers[100:200])
+    del view
+    reader.close()
+
+
+def test_reader_probes_the_table_it_opened(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "_HASH_CAPACITY", 8)
+    path = str(tmp_path / "0")
+    with SimulatedNode(chains=10, height=40) as node:
+        cw = ChainwebClient(node.api())
+        headers = cw.headers.get_block_headers(
+            0, limit=40, responseSchema="binary"
+        )["items"]
+
+    with HeaderArchive(path, writable=True) as writer:
+        writer.append(headers)
+        # The capacity a reader read before the writer rebuilt the table.
+        writer._meta[24:32] = (8).to_bytes(8, "little")
+
+    with HeaderArchive(path) as reader:
+        for header in headers:
+            assert reader.by_hash(decode(header).hash) == header
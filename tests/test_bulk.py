@@ -0,0 +1,91 @@
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.bulk import BulkDownloader, Checkpoint
+from chainwebpy.chainweb_p2p.block_header_endpoints import (
+    BlockHeaderEndpoints,
+)
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=400, latency=0.001) as node:
+        yield node
+
+
+def test_ordered_download_with_rebalancing(node):
+    dl = BulkDownloader(
+        BlockHeaderEndpoints(node.api()),
+        concurrency=6,
+        shard_size=150,
+        limit=20,
+        min_steal=10,
+    )
+    batches = list(dl.iter([1, 2, 3], 5, 389))
+    assert [c for c, _ in batches] == sorted(c for c, _ in batches)
+    for chain in (1, 2, 3):
+        heights = [h["height"] for c, b in batches if c == chain for h in b]
+        assert heights == list(range(5, 390))
+    assert dl.stats.items == 3 * 385 and dl.stats.steals > 0
+
+
+def test_sink_resumes_from_checkpoint(node, tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "sync.json"))
+    headers = BlockHeaderEndpoints(node.api())
+    seen = []
+
+    def failing(chain, items):
+        if len(seen) > 200:
+            raise RuntimeError("sink full")
+        seen.extend((chain, r.height) for r in items)
+
+    dl = BulkDownloader(
+        headers,
+        concurrency=4,
+        shard_size=100,
+        limit=25,
+        responseSchema="records",
+        checkpoint=checkpoint,
+    )
+    with pytest.raises(RuntimeError, match="sink full"):
+        dl.run(failing, range(4), 0, 399)
+    assert 0 < len(seen) < 1600
+
+    dl = BulkDownloader(
+        headers,
+        concurrency=4,
+        limit=25,
+        responseSchema="records",
+        checkpoint=checkpoint,
+    )
+    with pytest.raises(ValueError, match="not of chains"):
+        dl.run(lambda c, items: None, range(4), 0, 499)
+    dl.run(
+        lambda c, items: seen.extend((c, r.height) for r in items),
+        range(4),
+        0,
+        399,
+    )
+    assert sorted(seen) == [(c, h) for c in range(4) for h in range(400)]
+    assert all(s.next > s.hi for s in checkpoint.load())
+
+
+def test_read_ahead_is_bounded(node):
+    import time
+
+    dl = BulkDownloader(
+        BlockHeaderEndpoints(node.api()),
+        concurrency=4,
+        shard_size=50,
+        limit=10,
+        read_ahead=3,
+    )
+    consumed = 0
+    ahead = []
+    for chain, headers in dl.iter(range(10), 0, 199):
+        ahead.append(dl.stats.items - consumed)
+        consumed += len(headers)
+        time.sleep(0.002)
+    assert consumed == 10 * 200
+    # The buffer, the consumer's shard and a page in every worker.
+    assert max(ahead) <= (2 * 3 + 2 * 4) * 10
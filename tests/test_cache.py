@@ -0,0 +1,88 @@
+import time
+
+from chainwebpy.cache import CachePolicy, CachingTransport
+from chainwebpy.transport import Request, Transport
+
+
+class FakeResponse:
+    def __init__(self, value, status_code=200):
+        self.value = value
+        self.status_code = status_code
+        self.text = str(value)
+
+    def json(self):
+        return self.value
+
+
+class CountingTransport(Transport):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request):
+        self.calls += 1
+        return FakeResponse(self.calls)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_responses_are_served_from_cache():
+    from chainwebpy.url import ServiceAPIEndpoint
+    from chainwebpy.chainweb_p2p.config_endpoints import ConfigEndpoints
+
+    inner, clock = CountingTransport(), Clock()
+    transport = CachingTransport(inner, clock=clock)
+    cw = ConfigEndpoints(ServiceAPIEndpoint("mainnet"), transport=transport)
+
+    assert [cw.get_config() for _ in range(5)] == [1] * 5
+    assert inner.calls == 1
+    assert transport.hit_rate("get_config") == 0.8
+
+    clock.now += 7 * 60 * 60
+    assert cw.get_config() == 1
+
+
+def test_stale_while_revalidate_refreshes_in_background():
+    inner, clock = CountingTransport(), Clock()
+    transport = CachingTransport(
+        inner, policies={"get_current_cut": CachePolicy(1.0, 5.0)}, clock=clock
+    )
+    request = Request("get_current_cut", "GET", "http://node/cut")
+
+    assert transport.call("get_current_cut", "GET", "http://node/cut") == 1
+    clock.now = 2.0
+    assert transport.send(request).json() == 1
+
+    deadline = time.time() + 2
+    while transport.stats("get_current_cut").refreshes == 0:
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+    assert transport.send(request).json() == 2
+    stats = transport.stats()["get_current_cut"]
+    assert stats["misses"] == 1 and stats["stale_hits"] == 1
+
+    clock.now = 100.0
+    assert transport.send(request).json() == 3
+
+
+def test_uncached_endpoints_and_errors_pass_through():
+    inner, clock = CountingTransport(), Clock()
+    transport = CachingTransport(
+        inner, policies={"get_config": 10}, clock=clock
+    )
+
+    for _ in range(3):
+        transport.send(Request("get_block_headers", "GET", "http://node/h"))
+    assert inner.calls == 3
+
+    inner.send = lambda request: FakeResponse("down", status_code=503)
+    assert transport.send(Request("get_config", "GET", "u")).status_code == 503
+    assert transport.send(Request("get_config", "GET", "u")).status_code == 503
+    assert transport.stats("get_config").misses == 2
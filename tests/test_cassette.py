@@ -0,0 +1,96 @@
+import gzip
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.cassette import (
+    Cassette,
+    RecordingTransport,
+    ReplayTransport,
+    replay,
+)
+
+
+def record(node, path):
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.block_payload_endpoints import (
+        BlockPayloadEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+
+    transport = RecordingTransport(str(path))
+    headers = BlockHeaderEndpoints(node.api(), transport)
+    payloads = BlockPayloadEndpoints(node.api(), transport)
+
+    results = [CutEndpoints(node.api(), transport).get_current_cut()]
+    page = headers.get_block_headers(0, limit=20)
+    results.append(page)
+    results.append(
+        headers.get_block_headers_by_hash(
+            0, page["items"][3]["hash"], responseSchema="binary"
+        )
+    )
+    results.append(
+        payloads.get_batch_of_block_payload_with_outputs(
+            0, [h["payloadHash"] for h in page["items"]]
+        )
+    )
+    transport.close()
+    return results
+
+
+def test_replay_serves_recorded_responses_offline(tmp_path):
+    path = tmp_path / "traffic.cwc"
+    with SimulatedNode(chains=10, height=100) as node:
+        api = node.api()
+        recorded = record(node, path)
+
+    interactions = Cassette(str(path)).interactions()
+    assert [i.name for i in interactions] == [
+        "get_current_cut",
+        "get_block_headers",
+        "get_block_headers_by_hash",
+        "get_batch_of_block_payload_with_outputs",
+    ]
+    assert all(i.elapsed > 0 for i in interactions)
+
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+
+    transport = ReplayTransport(str(path))
+    assert CutEndpoints(api, transport).get_current_cut() == recorded[0]
+    headers = BlockHeaderEndpoints(api, transport)
+    assert headers.get_block_headers(0, limit=20) == recorded[1]
+    assert (
+        headers.get_block_headers_by_hash(
+            0, recorded[1]["items"][3]["hash"], responseSchema="binary"
+        )
+        == recorded[2]
+    )
+    with pytest.raises(LookupError):
+        headers.get_block_headers(1, limit=20)
+
+
+def test_concurrent_replay_clients(tmp_path):
+    path = tmp_path / "traffic.cwc"
+    with SimulatedNode(chains=10, height=100) as node:
+        record(node, path)
+
+    stats = replay(str(path), clients=4, speed=0)
+    assert stats.calls == 16 and stats.errors == 0
+    assert stats.bytes > 0
+
+
+def test_truncated_cassette_is_read_up_to_last_record(tmp_path):
+    path = tmp_path / "traffic.cwc"
+    with SimulatedNode(chains=10, height=100) as node:
+        record(node, path)
+
+    raw = gzip.decompress(path.read_bytes())
+    broken = tmp_path / "broken.cwc"
+    broken.write_bytes(gzip.compress(raw[:-10]))
+    assert len(Cassette(str(broken)).interactions()) == 3
@@ -0,0 +1,61 @@
+import pytest
+
+from benchmarks.simnode import SimulatedNode, encode_header
+from chainwebpy import header
+from chainwebpy.chain_graph import PETERSEN_GRAPH, ChainGraph
+from chainwebpy.client import ChainwebClient
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=60) as node:
+        yield node
+
+
+def test_graph_history():
+    graph = ChainGraph.for_version("mainnet01")
+    assert len(graph.at(852053)) == 10 and len(graph.at(852054)) == 20
+    assert graph.at(0).diameter == 2 and graph.latest.diameter == 3
+    assert graph.at(0).distances[0][1] == 2
+
+    with pytest.raises(ValueError, match="not symmetric"):
+        ChainGraph([(0, {0: (1,), 1: ()})])
+    with pytest.raises(ValueError, match="Unknown chainweb version"):
+        ChainGraph.for_version("development")
+
+
+def test_cut_and_header_validation(node):
+    cw = ChainwebClient(node.api())
+    graph = ChainGraph.from_config(cw.config.get_config())
+    assert (
+        graph.at(0).adjacents
+        == ChainGraph([(0, PETERSEN_GRAPH)]).at(0).adjacents
+    )
+    assert ChainGraph.from_info(cw.misc.general_node_info()).chains == set(
+        range(10)
+    )
+
+    cut = cw.cut.get_current_cut()
+    assert graph.cut_errors(cut) == []
+    tip = cut["hashes"]["0"]["height"]
+    cut["hashes"]["0"]["height"] += 1
+    cut["hashes"]["1"]["height"] -= 2
+    assert graph.cut_errors(cut) == [
+        f"Chains 0 at {tip + 1} and 1 at {tip - 2} are not concurrent",
+    ] + [
+        f"Chains 1 at {tip - 2} and {c} at {tip} are not concurrent"
+        for c in (3, 4, 6)
+    ]
+    del cut["hashes"]["9"]
+    assert "Cut misses chains [9]" in graph.cut_errors(cut)
+
+    headers = cw.headers.get_block_headers(4, limit=5)["items"]
+    records = [header.decode(encode_header(h)) for h in headers]
+    assert graph.header_errors(headers + records) == []
+    headers[2]["adjacents"] = {"0": "x", "1": "x", "2": "x"}
+    assert [i for i, _ in graph.header_errors(headers)] == [2]
+
+    cw.set_chain_graph(graph)
+    with pytest.raises(ValueError, match="chain 20 is not a chain"):
+        cw.headers.get_block_headers(20)
+    assert cw.cut.chains == graph.chains
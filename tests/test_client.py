@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.transport import Transport
+
+
+def test_import_defers_endpoint_modules_and_requests():
+    code = (
+        "import sys\n"
+        "from chainwebpy import ChainwebClient, ServiceAPIEndpoint\n"
+        "cw = ChainwebClient(ServiceAPIEndpoint('mainnet'))\n"
+        "print(sorted(m for m in sys.modules if m == 'requests' or m.endswith('_endpoints')))\n"
+        "cw.headers\n"
+        "print(sorted(m for m in sys.modules if m == 'requests' or m.endswith('_endpoints')))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, stdout=subprocess.PIPE
+    ).stdout.decode()
+    assert out.splitlines() == [
+        "[]",
+        "['chainwebpy.chainweb_p2p.block_header_endpoints']",
+    ]
+
+
+def test_groups_share_node_and_transport():
+    transport = Transport()
+    with SimulatedNode(chains=10, height=50) as node, SimulatedNode(
+        chains=20, height=80
+    ) as other:
+        cw = ChainwebClient(node.api(), transport)
+        assert cw.headers is cw.headers
+        assert cw.headers.transport is transport
+        assert len(cw.cut.get_current_cut()["hashes"]) == 10
+        assert cw.config.get_config()["chainwebVersion"] == "mainnet01"
+
+        cw.set_node_endpoint(other.api())
+        assert len(cw.cut.get_current_cut()["hashes"]) == 20
+        assert cw.payloads.node.endpoint == other.api().endpoint
@@ -0,0 +1,73 @@
+import pytest
+
+from benchmarks.simnode import EPOCH_LENGTH, SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.difficulty import HeaderAnalytics, header_arrays
+from chainwebpy.header import unb64url
+
+np = pytest.importorskip("numpy")
+
+
+def test_series_from_all_header_forms():
+    with SimulatedNode(chains=10, height=150) as node:
+        cw = ChainwebClient(node.api())
+        objects = cw.headers.get_block_headers(3)
+        records = cw.headers.get_block_headers(
+            3, minheight=50, responseSchema="records"
+        )
+        array = cw.headers.get_block_headers(4, responseSchema="array")
+        for a, b in zip(
+            header_arrays(objects["items"][50:]).values(),
+            header_arrays(records["items"][:50]).values(),
+        ):
+            assert np.array_equal(a, b)
+
+        analytics = HeaderAnalytics()
+        analytics.add(objects)
+        analytics.add(array)
+        assert analytics.chains == [3, 4]
+        series = analytics.series(3)
+        assert analytics.series(3) is series
+        assert np.array_equal(series["height"], np.arange(100))
+
+        # Overlapping headers are kept once and invalidate the cache.
+        analytics.add(records)
+        series = analytics.series(3)
+        assert np.array_equal(series["height"], np.arange(150))
+        items = objects["items"] + [
+            h.to_object() for h in records["items"][50:]
+        ]
+        weights = [
+            int.from_bytes(unb64url(h["weight"]), "little") for h in items
+        ]
+        targets = [
+            int.from_bytes(unb64url(h["target"]), "little") for h in items
+        ]
+        assert np.allclose(series["weight"], weights, rtol=1e-12)
+        assert np.allclose(
+            series["difficulty"], [2**256 / t for t in targets], rtol=1e-12
+        )
+        assert np.isnan(series["block_time"][0])
+        assert np.allclose(
+            series["hashrate"][1:],
+            series["difficulty"][1:] / series["block_time"][1:],
+        )
+
+        rolling = analytics.rolling(3, 10)
+        assert np.array_equal(rolling["height"], np.arange(10, 150))
+        span = (series["time"][10:] - series["time"][:-10]) / 1e6
+        assert np.allclose(rolling["block_time"], span / 10)
+        assert np.isclose(
+            rolling["hashrate"][0], series["difficulty"][1:11].sum() / span[0]
+        )
+
+        epochs = analytics.epochs(3)
+        assert np.array_equal(epochs["height"], np.arange(0, 150, EPOCH_LENGTH))
+        assert epochs["blocks"].sum() == 150
+
+        starts, hashrate = analytics.network_hashrate(3600)
+        assert np.all(np.diff(starts) > 0) and np.all(hashrate > 0)
+        work = (
+            series["difficulty"].sum() + analytics.series(4)["difficulty"].sum()
+        )
+        assert np.isclose(hashrate.sum() * 3600, work)
@@ -0,0 +1,104 @@
+from collections import Counter, defaultdict
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.events import PactEvent, Transfers, iter_events
+
+
+@pytest.fixture(scope="module")
+def blocks():
+    with SimulatedNode(chains=10, height=80, txs_per_block=6) as node:
+        cw = ChainwebClient(node.api())
+        result = []
+        for chain in (0, 4):
+            page = cw.headers.get_block_headers(chain)["items"]
+            hashes = [h["payloadHash"] for h in page]
+            result.append(
+                (
+                    page,
+                    cw.payloads.get_batch_of_block_payload_with_outputs(
+                        chain, hashes
+                    ),
+                )
+            )
+        yield result
+
+
+def test_iter_events(blocks):
+    page, payloads = blocks[0]
+    events = list(iter_events(payloads, page, coinbase=False))
+    assert events and {e.qualname for e in events} == {"coin.TRANSFER"}
+    assert [e.height for e in events] == sorted(e.height for e in events)
+    assert all(e.chain == 0 and len(e.request_key) == 43 for e in events)
+    assert events[0].time == page[events[0].height]["creationTime"]
+    assert list(iter_events(payloads, page, "coin.TRANSFER", False)) == events
+    assert list(iter_events(payloads, page, "free.other.EVENT")) == []
+
+
+def test_transfer_aggregation(blocks):
+    transfers = Transfers()
+    events = []
+    for page, payloads in blocks:
+        batch = list(iter_events(payloads, page))
+        events += batch
+        assert transfers.add(batch) == len(batch)
+
+    volume, count = defaultdict(float), Counter()
+    for e in events:
+        volume[e.params[1]] += e.params[2]
+        count[e.params[1]] += 1
+    received = transfers.volume("receiver")
+    for account, total in volume.items():
+        i = transfers.accounts.index(account)
+        assert received[i] == pytest.approx(total)
+        assert transfers.count("receiver")[i] == count[account]
+
+    top = transfers.top(3, by="receiver")
+    expected = sorted(volume.items(), key=lambda a: -a[1])[:3]
+    assert [a for a, _ in top] == [a for a, _ in expected]
+    assert transfers.top(2, by="receiver", stat="count")[0][1] == max(
+        count.values()
+    )
+
+    hour = 3600 * 1_000_000
+    starts, sums, counts = transfers.windows(3600)
+    assert counts.sum() == len(transfers) and sums.sum() == pytest.approx(
+        sum(volume.values())
+    )
+    assert list(starts) == sorted({e.time // hour * hour for e in events})
+    _, miner, _ = transfers.windows(3600, account="miner", by="receiver")
+    assert miner.sum() == pytest.approx(volume["miner"])
+
+
+def test_transfers_skip_other_shapes():
+    def transfer(module, *params):
+        return PactEvent(0, 1, 2, "rk", module, "TRANSFER", list(params))
+
+    transfers = Transfers()
+    added = transfers.add(
+        [
+            transfer("marmalade.ledger", "t:abc", "k:alice", "k:bob", 1.0),
+            transfer("free.token", "k:alice", "k:bob", "t:abc"),
+            transfer("coin", "k:alice", "k:bob", {"decimal": "2.5"}),
+            transfer("coin", "", "k:bob", 3),
+        ],
+        module=None,
+    )
+    assert added == len(transfers) == 2
+    assert list(transfers.column("amount")) == [2.5, 3.0]
+    assert transfers.accounts == ["k:alice", "k:bob", ""]
+
+
+def test_transfers_of_one_module():
+    def transfer(module, amount):
+        return PactEvent(0, 1, 2, "rk", module, "TRANSFER", ["a", "b", amount])
+
+    events = [transfer("coin", 1.0), transfer("free.token", 100.0)]
+    transfers = Transfers()
+    assert transfers.add(events) == 1
+    assert list(transfers.volume("receiver")) == [0.0, 1.0]
+    assert transfers.add(events, module="free.token") == 1
+    assert transfers.add(events, module=None) == 2
+    assert len(transfers) == 4
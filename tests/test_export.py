@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode, encode_header
+from chainwebpy import header
+from chainwebpy.header import b64url, unb64url
+from chainwebpy.client import ChainwebClient
+from chainwebpy.export import (
+    HEADER_COLUMNS,
+    OUTPUT_COLUMNS,
+    ColumnarWriter,
+    header_columns,
+    output_columns,
+    read_columns,
+)
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=60, txs_per_block=3) as node:
+        yield node
+
+
+def export(cw, path, format):
+    heights = []
+    with ColumnarWriter(
+        path + "-headers", HEADER_COLUMNS, format=format, row_group_size=16
+    ) as headers, ColumnarWriter(
+        path + "-outputs", OUTPUT_COLUMNS, format=format, row_group_size=16
+    ) as outputs:
+        for chain in (2, 5):
+            page = cw.headers.get_block_headers(chain, limit=25)["items"]
+            headers.write(header_columns(page))
+            batch = cw.payloads.get_batch_of_block_payload_with_outputs(
+                chain, [h["payloadHash"] for h in page]
+            )
+            outputs.write(output_columns(batch, page))
+            for h, payload in zip(page, batch):
+                heights += [h["height"]] * len(payload["transactions"])
+    return headers, outputs, heights
+
+
+def test_npz_export_in_row_groups(node, tmp_path):
+    cw = ChainwebClient(node.api())
+    headers, outputs, heights = export(cw, str(tmp_path / "dump"), "npz")
+    assert headers.path.endswith(".npz") and headers.rows == 50
+    assert headers.row_groups == 4 and outputs.rows == len(heights) > 16
+
+    columns = read_columns(headers.path, ["chain", "height"])
+    assert sorted(columns) == ["chain", "height"]
+    assert list(columns["height"]) == list(range(25)) * 2
+    assert list(columns["chain"]) == [2] * 25 + [5] * 25
+
+    columns = read_columns(outputs.path)
+    assert list(columns["height"]) == heights
+    assert set(columns["status"]) <= {"success", "failure"}
+    assert all(len(k) == 43 for k in columns["request_key"])
+    assert (
+        columns["gas"].dtype.kind == "i" and columns["creation_time"].min() > 0
+    )
+
+    page = cw.headers.get_block_headers(2, limit=3)["items"]
+    records = [header.decode(encode_header(h)) for h in page]
+    assert header_columns(records) == header_columns(page)
+    with pytest.raises(ValueError, match="No header for payload"):
+        output_columns(
+            cw.payloads.get_batch_of_block_payload_with_outputs(
+                2, [page[0]["payloadHash"]]
+            ),
+            [],
+        )
+
+
+def test_outputs_of_shared_payloads(node):
+    cw = ChainwebClient(node.api())
+    page = cw.headers.get_block_headers(2, limit=25)["items"]
+    batch = cw.payloads.get_batch_of_block_payload_with_outputs(
+        2, [h["payloadHash"] for h in page]
+    )
+    payload = next(p for p in batch if p["transactions"])
+    first = next(h for h in page if h["payloadHash"] == payload["payloadHash"])
+    # Another block with the same payload, like a repeated empty payload.
+    second = dict(first, height=first["height"] + 100)
+
+    columns = output_columns([payload, payload], [first, second])
+    count = len(payload["transactions"])
+    assert (
+        columns["height"]
+        == [first["height"]] * count + [second["height"]] * count
+    )
+    assert columns["request_key"][:count] == columns["request_key"][count:]
+
+
+def test_outputs_without_tx_id(node):
+    cw = ChainwebClient(node.api())
+    page = cw.headers.get_block_headers(3, limit=25)["items"]
+    batch = cw.payloads.get_batch_of_block_payload_with_outputs(
+        3, [h["payloadHash"] for h in page]
+    )
+    payload = next(p for p in batch if p["transactions"])
+    block = next(h for h in page if h["payloadHash"] == payload["payloadHash"])
+    tx, out = payload["transactions"][0]
+    output = dict(json.loads(unb64url(out)), txId=None)
+    payload = dict(
+        payload, transactions=[[tx, b64url(json.dumps(output).encode())]]
+    )
+    assert output_columns([payload], [block])["tx_id"] == [-1]
+
+
+def test_parquet_export(node, tmp_path):
+    pytest.importorskip("pyarrow")
+    cw = ChainwebClient(node.api())
+    headers, outputs, _ = export(cw, str(tmp_path / "dump"), "parquet")
+    assert read_columns(headers.path, ["height"])["height"].tolist() == (
+        list(range(25)) * 2
+    )
+    assert len(read_columns(outputs.path)["request_key"]) == outputs.rows
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.gas import GasEstimator
+from chainwebpy.header import unb64url
+
+np = pytest.importorskip("numpy")
+
+
+def test_refresh_and_estimate():
+    with SimulatedNode(chains=10, height=60, txs_per_block=6) as node:
+        cw = ChainwebClient(node.api())
+        gas = GasEstimator(window=20)
+        assert gas.refresh(cw, chains=[2, 5]) == {2: 20, 5: 20}
+        assert gas.heights() == {2: (40, 59), 5: (40, 59)}
+        assert gas.pending(2) == node.data.mempool_size
+
+        prices = []
+        for h in cw.headers.get_block_headers(2, minheight=40)["items"]:
+            payload = cw.payloads.get_block_payload_with_outputs(
+                2, h["payloadHash"]
+            )
+            for tx, _ in payload["transactions"]:
+                cmd = json.loads(json.loads(unb64url(tx))["cmd"])
+                prices.append(cmd["meta"]["gasPrice"])
+        assert gas.percentile(2, "price", 50) == np.percentile(prices, 50)
+        assert gas.gas_limit(2) > gas.percentile(2, "used", 99)
+
+        estimates = [gas.price(2, blocks) for blocks in (1, 2, 5, 20)]
+        assert estimates == sorted(estimates, reverse=True)
+        assert all(e >= gas.min_price for e in estimates)
+        assert gas.price(2, 1) == estimates[0]
+
+        node.advance(chains=[2], blocks=3)
+        assert gas.refresh(cw, chains=[2], mempool=False) == {2: 3}
+        assert gas.heights()[2] == (43, 62)
+        assert np.isnan(gas.percentile(7, "price", 50))
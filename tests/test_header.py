@@ -0,0 +1,129 @@
+import pytest
+
+from benchmarks.simnode import SimulatedNode, encode_header
+from chainwebpy import header
+from chainwebpy.chainweb_p2p.block_header_endpoints import (
+    BlockHeaderEndpoints,
+)
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=200) as node:
+        yield node
+
+
+def test_codec_roundtrip(node):
+    obj = node.data.header(3, 42)
+    binary = encode_header(obj)
+    record = header.decode(binary)
+    assert record.height == 42 and record.chainId == 3
+    assert record.to_bytes() == binary
+    assert record.to_object() == obj
+    assert len(header.b64url(binary)) == header.ENCODED_HEADER_SIZE
+
+    with pytest.raises(ValueError, match="424 characters"):
+        header.decode_base64url(["abc"])
+
+
+# A mainnet01 header of chain 0 at height 1, written field by field at
+# the byte offsets of the chainweb-node binary format, independently of
+# the codec and of the simulated node. Integers are little endian.
+LAYOUT_HEADER = bytes.fromhex(
+    "".join(
+        [
+            "0000000000000000",  # 0: featureFlags
+            "8063c36b15960500",  # 8: creationTime 1572393630000000
+            "11" * 32,  # 16: parent
+            "0300",  # 48: adjacent count
+            "05000000",  # 50: adjacent chain 5
+            "22" * 32,  # 54: its hash
+            "0a000000",  # 86: adjacent chain 10
+            "33" * 32,  # 90: its hash
+            "0f000000",  # 122: adjacent chain 15
+            "44" * 32,  # 126: its hash
+            "ff" * 31 + "00",  # 158: target
+            "55" * 32,  # 190: payloadHash
+            "00000000",  # 222: chainId 0
+            "66" * 32,  # 226: weight
+            "0100000000000000",  # 258: height 1
+            "05000000",  # 266: chainwebVersion mainnet01
+            "00a0f96915960500",  # 270: epochStart 1572393600000000
+            "efcdab8967452301",  # 278: nonce
+            "77" * 32,  # 286: hash
+        ]
+    )
+)
+
+
+def test_decode_documented_layout():
+    assert len(LAYOUT_HEADER) == header.HEADER_SIZE
+    record = header.decode(LAYOUT_HEADER)
+    assert record.featureFlags == 0
+    assert record.creationTime == 1572393630000000
+    assert record.parent == b"\x11" * 32
+    assert record.adjacents == {
+        5: b"\x22" * 32,
+        10: b"\x33" * 32,
+        15: b"\x44" * 32,
+    }
+    assert record.target == b"\xff" * 31 + b"\x00"
+    assert record.payloadHash == b"\x55" * 32
+    assert record.chainId == 0
+    assert record.weight == b"\x66" * 32
+    assert record.height == 1
+    assert record.epochStart == 1572393600000000
+    assert record.hash == b"\x77" * 32
+
+    obj = record.to_object()
+    assert obj["chainwebVersion"] == "mainnet01"
+    assert obj["nonce"] == str(0x0123456789ABCDEF)
+    assert obj["hash"] == "d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3d3c"
+    assert encode_header(obj) == LAYOUT_HEADER
+    assert record.to_bytes() == LAYOUT_HEADER
+
+
+def test_compact_page_schemas(node):
+    cw = BlockHeaderEndpoints(node.api())
+    objects = cw.get_block_headers(1, limit=20, minheight=10)
+
+    encoded = cw.get_block_headers(
+        1, limit=20, minheight=10, responseSchema="base64url"
+    )
+    assert encoded["next"] == objects["next"]
+    assert all(len(i) == header.ENCODED_HEADER_SIZE for i in encoded["items"])
+
+    binary = cw.get_block_headers(
+        1, limit=20, minheight=10, responseSchema="binary"
+    )
+    assert binary["items"][0] == encode_header(objects["items"][0])
+
+    records = cw.get_block_headers(
+        1, limit=20, minheight=10, responseSchema="records"
+    )
+    assert [r.to_object() for r in records["items"]] == objects["items"]
+
+    np = pytest.importorskip("numpy")
+    array = cw.get_block_headers(
+        1, limit=20, minheight=10, responseSchema="array"
+    )["items"]
+    assert array.dtype.itemsize == header.HEADER_SIZE
+    assert list(array["height"]) == list(range(10, 30))
+    assert bytes(array["hash"][0]) == records["items"][0].hash
+    assert np.all(array["chainId"] == 1)
+
+
+def test_branch_schemas(node):
+    cw = BlockHeaderEndpoints(node.api())
+    top = node.data.block_hash(0, 150)
+    default = cw.get_block_header_branches(0, [], [top], limit=5)
+    assert all(isinstance(i, str) for i in default["items"])
+
+    records = cw.get_block_header_branches(
+        0, [], [top], limit=5, responseSchema="records"
+    )
+    assert [r.height for r in records["items"]] == [150, 149, 148, 147, 146]
+    objects = cw.get_block_header_branches(
+        0, [], [top], limit=5, responseSchema="object"
+    )
+    assert objects["items"][0]["hash"] == top
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("h2")
+
+from benchmarks.simnode import SimulatedH2Node  # noqa: E402
+from chainwebpy.client import ChainwebClient  # noqa: E402
+from chainwebpy.http2 import HTTP2Transport  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedH2Node(chains=10, height=50, latency=0.005) as node:
+        yield node
+
+
+def test_requests_share_one_connection(node):
+    node.reset_counters()
+    transport = HTTP2Transport(http1=False, timeout=5)
+    cw = ChainwebClient(node.api(), transport=transport)
+    with ThreadPoolExecutor(16) as pool:
+        pages = list(
+            pool.map(
+                lambda c: cw.headers.get_block_headers(c % 10, limit=3),
+                range(64),
+            )
+        )
+    assert [p["items"][0]["chainId"] for p in pages] == [
+        c % 10 for c in range(64)
+    ]
+    assert node.connections == 1
+    assert transport.client.get(node.host).http_version == "HTTP/2"
+
+    with pytest.raises(Exception, match="Status 404"):
+        cw.headers.get_block_headers_by_hash(0, "A" * 43)
+    transport.close()
+
+
+def test_streamed_and_binary_responses(node):
+    cw = ChainwebClient(node.api(), transport=HTTP2Transport(http1=False))
+    page = cw.headers.get_block_headers(2)["items"]
+    hashes = [h["payloadHash"] for h in page]
+    with cw.payloads.get_batch_of_block_payload_with_outputs(
+        2, hashes, stream=True
+    ) as payloads:
+        assert [p["payloadHash"] for p in payloads] == hashes
+    records = cw.headers.get_block_headers(
+        2, limit=5, responseSchema="records"
+    )["items"]
+    assert [r.height for r in records] == [0, 1, 2, 3, 4]
@@ -0,0 +1,39 @@
+import json
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.header import unb64url
+from chainwebpy.index import RequestKeyIndex, TxLocation
+
+
+def test_sync_and_lookup(tmp_path):
+    with SimulatedNode(chains=10, height=40) as node:
+        cw = ChainwebClient(node.api())
+        path = str(tmp_path / "txs.sqlite")
+        with RequestKeyIndex(path) as index:
+            added = index.sync(cw, chains=[3, 7], limit=15)
+            assert added == len(index) > 0
+            assert index.heights() == {3: 39, 7: 39}
+
+            block = cw.headers.get_block_headers(7, minheight=21, limit=1)
+            block = block["items"][0]
+            payload = cw.payloads.get_block_payload_with_outputs(
+                7, block["payloadHash"]
+            )
+            for i, (_, out) in enumerate(payload["transactions"]):
+                key = json.loads(unb64url(out))["reqKey"]
+                assert index.lookup(key) == [
+                    TxLocation(7, 21, block["hash"], i)
+                ]
+            assert index.lookup("A" * 43) == []
+            # Blocks below the indexed height keep the height.
+            assert index.add([payload], [block]) == 0
+            assert index.heights() == {3: 39, 7: 39}
+
+            node.advance(chains=[3], blocks=5)
+            assert index.sync(cw, chains=[3, 7]) > 0
+            assert index.heights() == {3: 44, 7: 39}
+            count = len(index)
+
+        with RequestKeyIndex(path) as index:
+            assert len(index) == count and index.sync(cw, chains=[3]) == 0
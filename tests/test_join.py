@@ -0,0 +1,67 @@
+import itertools
+import threading
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.join import PayloadJoiner
+
+
+def test_join_pages_in_order_without_duplicates():
+    with SimulatedNode(chains=10, height=100) as node:
+        cw = ChainwebClient(node.api())
+        pages = [cw.headers.get_block_headers(c)["items"] for c in (0, 1)]
+        headers = [h for pair in zip(*pages) for h in pair]
+        hashes = {h["payloadHash"] for h in headers}
+        assert len(hashes) < len(headers)
+
+        node.reset_counters()
+        joiner = PayloadJoiner(cw, batch_size=16, read_ahead=2)
+        joined = list(joiner.join(iter(headers)))
+        assert [j.header for j in joined] == headers
+        for header, payload in joined:
+            assert payload["payloadHash"] == header["payloadHash"]
+            assert "coinbase" in payload
+        assert joiner.duplicates == len(headers) - len(hashes)
+        assert joiner.payloads == len(hashes)
+        assert joiner.requests == node.requests["payload/outputs/batch"]
+
+        records = cw.headers.get_block_headers(
+            2, limit=10, responseSchema="records"
+        )["items"]
+        lazy = PayloadJoiner(cw, lazy=True)
+        for header, payload in lazy.join(records):
+            assert payload.outputs is not None and len(payload) >= 0
+
+
+def test_join_event_stream():
+    with SimulatedNode(chains=10, height=20) as node:
+        cw = ChainwebClient(node.api())
+        joiner = PayloadJoiner(cw, batch_size=50, linger=0.01)
+        events = cw.misc.blocks_event_stream()
+        joined = joiner.join(e["data"]["header"] for e in events)
+
+        timer = threading.Timer(0.2, node.advance, kwargs={"blocks": 2})
+        timer.start()
+        blocks = list(itertools.islice(joined, 20))
+        joined.close()
+        assert [b.header["height"] for b in blocks] == [20] * 10 + [21] * 10
+        assert all(
+            b.payload["payloadHash"] == b.header["payloadHash"] for b in blocks
+        )
+
+
+def test_unmatched_batches_fail_the_join():
+    class Payloads(object):
+        def get_batch_of_block_payload_with_outputs(self, chain, hashes, **kw):
+            return [{"payloadHash": "other"}]
+
+    class Client(object):
+        payloads = Payloads()
+
+    joiner = PayloadJoiner(Client())
+    headers = [{"chainId": 0, "payloadHash": "a"}]
+    with pytest.raises(Exception, match="Payloads of 1 blocks on chain 0"):
+        list(joiner.join(headers))
+    assert joiner.requests == 1
@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.local import LocalQueryEngine
+
+
+def test_packed_queries_and_height_cache():
+    with SimulatedNode(chains=10, height=20) as node:
+        cw = ChainwebClient(node.api())
+        engine = LocalQueryEngine(cw, batch_size=25)
+        accounts = [node.data.account(i) for i in range(60)]
+        queries = [
+            (chain, f'(coin.get-balance "{a}")')
+            for chain in (0, 3)
+            for a in accounts
+        ]
+
+        node.reset_counters()
+        results = engine.run(queries)
+        # 60 expressions per chain in packs of at most 25.
+        assert node.requests["pact/local"] == 6 == engine.requests
+        for (chain, code), result in zip(queries, results):
+            assert result.ok and result.chain == chain and result.height == 19
+            account = code.split('"')[1]
+            assert result.data == node.data.balance(chain, account)
+
+        assert engine.run(queries) == results
+        assert node.requests["pact/local"] == 6
+        assert engine.hits == len(queries)
+
+        node.advance([0], 1)
+        balances = engine.balances(0, accounts)
+        assert node.requests["pact/local"] == 9
+        assert balances == {a: node.data.balance(0, a) for a in accounts}
+        assert engine.balances(3, accounts[:10]) == {
+            a: node.data.balance(3, a) for a in accounts[:10]
+        }
+        assert node.requests["pact/local"] == 9
+
+
+def test_failing_expressions_are_isolated():
+    with SimulatedNode(chains=10, height=20) as node:
+        cw = ChainwebClient(node.api())
+        engine = LocalQueryEngine(cw, batch_size=8)
+        accounts = [node.data.account(i) for i in range(8)]
+        accounts[5] = "missing"
+
+        balances = engine.balances(1, accounts)
+        assert balances["missing"] is None
+        assert all(balances[a] is not None for a in accounts if a != "missing")
+        # 8, then 4 and 4, then 2 and 2 of the failing half, then 1 and 1.
+        assert engine.requests == 7
+
+        result = engine.query(1, "(+ 1 2)")
+        assert not result.ok and "Cannot resolve" in result.data["message"]
+
+
+def test_results_keep_the_height_of_their_state():
+    with SimulatedNode(chains=10, height=20) as node:
+        cw = ChainwebClient(node.api())
+        engine = LocalQueryEngine(cw)
+        account = node.data.account(0)
+        code = f'(coin.get-balance "{account}")'
+
+        stale = cw.cut.get_current_cut()
+        node.advance([2], 3)
+        result = engine.run([(2, code)], cut=stale)[0]
+        assert result.height == 22
+        assert engine.query(2, code) == result
+        assert engine.hits == 1 and node.requests["pact/local"] == 1
+
+        with pytest.raises(ValueError, match="chain 99 is not a chain"):
+            engine.query(99, code)
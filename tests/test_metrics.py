@@ -0,0 +1,104 @@
+import logging
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.cache import CachingTransport
+from chainwebpy.metrics import LoggingHooks, MetricsHooks, MultiHooks
+from chainwebpy.transport import Transport
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=100) as node:
+        yield node
+
+
+def test_call_records_phases_bytes_and_status(node):
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+
+    records = []
+
+    class Collect(MetricsHooks):
+        def on_call(self, record):
+            records.append(record)
+            super().on_call(record)
+
+    hooks = Collect()
+    cw = BlockHeaderEndpoints(node.api(), Transport(hooks=hooks))
+    cw.get_block_headers(0, limit=10)
+    cw.get_block_headers(0, limit=10)
+    with pytest.raises(Exception, match="Status 404"):
+        cw.get_block_headers_by_hash(0, "A" * 43)
+
+    first, second, failed = records
+    assert first.status == 200 and first.bytes_in > 0
+    assert {"dns", "connect", "ttfb", "download", "decode", "total"} <= set(
+        first.phases
+    )
+    assert "connect" not in second.phases
+    assert failed.status == 404 and failed.error == "Exception"
+
+    histogram = hooks.histogram("get_block_headers")
+    assert histogram.count == 2
+    text = hooks.exposition()
+    assert (
+        'chainweb_calls_total{endpoint="get_block_headers",status="200"} 2'
+        in text
+    )
+    assert (
+        'chainweb_call_duration_seconds_count{endpoint="get_block_headers",phase="ttfb"} 2'
+        in text
+    )
+    assert (
+        'chainweb_call_errors_total{endpoint="get_block_headers_by_hash"} 1'
+        in text
+    )
+
+
+def test_cache_hits_and_logging(node, caplog):
+    from chainwebpy.chainweb_p2p.config_endpoints import ConfigEndpoints
+
+    metrics = MetricsHooks()
+    transport = CachingTransport(Transport())
+    transport.hooks = MultiHooks(metrics, LoggingHooks(level=logging.INFO))
+    cw = ConfigEndpoints(node.api(), transport)
+    with caplog.at_level(logging.INFO, logger="chainwebpy.metrics"):
+        cw.get_config()
+        cw.get_config()
+
+    assert metrics.cache_hits == {"get_config": 1}
+    assert len(caplog.records) == 2
+    assert "cache_hit=True" in caplog.records[1].getMessage()
+
+
+def test_no_hooks_by_default(node):
+    transport = Transport()
+    assert not transport.hooks.enabled
+    assert not CachingTransport(transport).hooks.enabled
+
+
+def test_connect_falls_back_to_next_address(node, monkeypatch):
+    import socket
+
+    from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+    from chainwebpy.url import GenericNodeAPIEndpoint
+
+    resolve = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host == "chainweb.test":
+            # The node only listens on 127.0.0.1, so 127.0.0.2 refuses.
+            return resolve("127.0.0.2", port, *args, **kwargs) + resolve(
+                "127.0.0.1", port, *args, **kwargs
+            )
+        return resolve(host, port, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    api = GenericNodeAPIEndpoint(
+        "http", "chainweb.test", node.port, "0.0", node.version
+    )
+    cw = CutEndpoints(api, Transport(hooks=MetricsHooks()))
+    assert cw.get_current_cut()["hashes"]
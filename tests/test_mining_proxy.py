@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.mining_proxy import MiningProxy, MiningWorkerClient
+
+
+def test_workers_share_work_and_refresh():
+    with SimulatedNode(chains=10, height=20) as node:
+        cw = ChainwebClient(node.api())
+        with MiningProxy(cw, "miner", ["00" * 32]) as proxy:
+            node.reset_counters()
+            workers = [MiningWorkerClient(proxy.address) for _ in range(8)]
+            for _ in range(50):
+                found = {w.work() for w in workers}
+                assert len(found) == 1
+            generation, work = found.pop()
+            assert generation == 1 and len(work) == 4 + 32 + 286 - 32 + 32
+            assert node.requests.get("mining/work", 0) == 0
+
+            with ThreadPoolExecutor(len(workers)) as pool:
+                waiting = [pool.submit(w.wait, generation, 10) for w in workers]
+                node.advance(chains=[0])
+                updated = {f.result() for f in waiting}
+            assert len(updated) == 1
+            new_generation, new_work = updated.pop()
+            assert new_generation > generation and new_work != work
+
+            assert workers[0].submit(new_work[36:])
+            assert not workers[1].submit(b"bad")
+            assert (proxy.submitted, proxy.accepted) == (2, 1)
+            assert workers[2].wait(new_generation, 0.01)[0] >= new_generation
+            for w in workers:
+                w.close()
@@ -0,0 +1,62 @@
+import base64
+import json
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.header import unb64url
+from chainwebpy.payload import Payload, decode_batch
+
+
+def test_decode_batch():
+    values = [b"", b"a", b"ab", b"abc", bytes(range(256)) * 3, b"\xfb\xff"]
+    encoded = [base64.urlsafe_b64encode(v).decode() for v in values]
+    assert decode_batch(encoded) == values
+    assert decode_batch([e.rstrip("=") for e in encoded]) == values
+
+    for bad in (["YWJj", "YW!i", "YQ"], ["YWJj", "Y", "YQ"], ["YQ==YWJj"]):
+        with pytest.raises(ValueError):
+            decode_batch(bad)
+
+
+def test_lazy_payloads():
+    with SimulatedNode(chains=10, height=20, txs_per_block=4) as node:
+        cw = ChainwebClient(node.api())
+        page = cw.headers.get_block_headers(1, limit=10)["items"]
+        hashes = [h["payloadHash"] for h in page]
+        plain = cw.payloads.get_batch_of_block_payload_with_outputs(1, hashes)
+        lazy = cw.payloads.get_batch_of_block_payload_with_outputs(
+            1, hashes, responseSchema="lazy"
+        )
+
+        assert [p.payloadHash for p in lazy] == [
+            p["payloadHash"] for p in plain
+        ]
+        for raw, payload in zip(plain, lazy):
+            assert payload.raw == raw and len(payload) == len(
+                raw["transactions"]
+            )
+            for (tx, out), t, o in zip(
+                raw["transactions"], payload.transactions, payload.outputs
+            ):
+                assert o._value is None and t._value is None
+                decoded = json.loads(unb64url(out))
+                assert o.reqKey == decoded["reqKey"] == t.hash
+                assert o.status == decoded["result"]["status"]
+                assert o.bytes == unb64url(out) and o.raw == out
+                assert t.cmd == json.loads(json.loads(unb64url(tx))["cmd"])
+            assert payload.coinbase.value == json.loads(
+                unb64url(raw["coinbase"])
+            )
+            assert payload.minerData.value == json.loads(
+                unb64url(raw["minerData"])
+            )
+
+        single = cw.payloads.get_block_payload(
+            1, hashes[3], responseSchema="lazy"
+        )
+        assert isinstance(single, Payload) and single.outputs is None
+        assert [t.hash for t in single.transactions] == [
+            t.hash for t in lazy[3].transactions
+        ]
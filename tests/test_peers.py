@@ -0,0 +1,97 @@
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.peers import PeerCrawler, PeerMap
+from chainwebpy.url import GenericNodeAPIEndpoint
+
+
+def test_crawl_probe_and_rank(tmp_path):
+    with SimulatedNode(
+        chains=10, height=30, peers=30, page_limit=7
+    ) as fast, SimulatedNode(
+        chains=10, height=30, peers=30, latency=0.02
+    ) as slow:
+        slow.advance(blocks=5)
+        refused = GenericNodeAPIEndpoint(
+            "http", "127.0.0.1", 1, "0.0", "mainnet01"
+        )
+        nodes = [fast.api(), slow.api(), refused]
+
+        def endpoint(peer):
+            return nodes[int(peer.hostname.rsplit(".", 1)[1]) % 3]
+
+        crawler = PeerCrawler(
+            [fast.api()], depth=2, chains=[3], endpoint=endpoint
+        )
+        peers = crawler.run()
+        assert len(peers) == 30 and len(crawler.peers) == 30
+        assert all(p.networks == {"cut", "mempool/3"} for p in peers)
+        assert list(crawler.errors) == [refused.endpoint]
+
+        ranked = [endpoint(p).endpoint for p in peers]
+        expected = [slow.api(), fast.api(), refused]
+        assert ranked == [n.endpoint for n in expected for _ in range(10)]
+        assert all(p.error for p in peers.peers[20:])
+        assert peers.peers[0].height - peers.peers[10].height == 50
+
+        path = str(tmp_path / "peers.json")
+        peers.save(path)
+        loaded = PeerMap.load(path)
+        assert [p.to_object() for p in loaded] == [p.to_object() for p in peers]
+        endpoints = loaded.endpoints(3)
+        assert [e.endpoint for e in endpoints] == [
+            f"https://{p.hostname}:1789/chainweb/0.0/mainnet01"
+            for p in peers.peers[:3]
+        ]
+        assert len(loaded.endpoints()) == 20
+
+
+def test_probe_self_signed_peers(tmp_path):
+    import hashlib
+    import shutil
+    import ssl
+    import subprocess
+    import warnings
+
+    import pytest
+    from urllib3.exceptions import InsecureRequestWarning
+
+    from chainwebpy.header import b64url
+    from chainwebpy.peers import PeerInfo
+
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is required to create a certificate")
+    cert, key = str(tmp_path / "node.crt"), str(tmp_path / "node.key")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes"]
+        + ["-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=node"],
+        check=True,
+        capture_output=True,
+    )
+    with open(cert) as f:
+        der = ssl.PEM_cert_to_DER_cert(f.read())
+    peer_id = b64url(hashlib.sha256(der).digest())
+
+    with SimulatedNode(chains=10, height=30, tls=(cert, key)) as node:
+        crawler = PeerCrawler([node.api()], endpoint=lambda peer: node.api())
+        pinned = PeerInfo(peer_id, "127.0.0.1", node.port)
+        other = PeerInfo(b64url(bytes(32)), "127.0.0.2", node.port)
+        unknown = PeerInfo(None, "127.0.0.3", node.port)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            crawler.probe([pinned])
+        assert pinned.reachable, pinned.error
+        assert not [w for w in caught if w.category is InsecureRequestWarning]
+        assert pinned.height == 10 * 29
+
+        # Another fingerprint, or no id and no CA, fails the handshake.
+        for peer in (other, unknown):
+            crawler = PeerCrawler([node.api()], endpoint=lambda p: node.api())
+            crawler.probe([peer])
+            assert not peer.reachable and peer.error
+
+        crawler = PeerCrawler(
+            [node.api()], endpoint=lambda peer: node.api(), verify=False
+        )
+        # Probing without verification is allowed, but not silent.
+        with pytest.warns(InsecureRequestWarning):
+            crawler.probe([unknown])
+        assert unknown.reachable, unknown.error
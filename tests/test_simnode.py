@@ -0,0 +1,80 @@
+import pytest
+
+from benchmarks.simnode import HEADER_SIZE, SimulatedNode
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=300, txs_per_block=3) as node:
+        yield node
+
+
+def test_cut_and_header_endpoints(node):
+    from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+    from chainwebpy.chainweb_p2p.block_header_endpoints import (
+        BlockHeaderEndpoints,
+    )
+
+    cut = CutEndpoints(node.api()).get_current_cut()
+    assert len(cut["hashes"]) == 10
+
+    cw = BlockHeaderEndpoints(node.api())
+    r1 = cw.get_block_headers(0, limit=10, minheight=5)
+    assert [h["height"] for h in r1["items"]] == list(range(5, 15))
+
+    r2 = cw.get_block_headers(0, limit=10, next=r1["next"], minheight=5)
+    assert r2["items"][0]["height"] == 15
+
+    top = cut["hashes"]["0"]["hash"]
+    assert cw.get_block_headers_by_hash(0, blockHash=top)["hash"] == top
+    binary = cw.get_block_headers_by_hash(
+        0, blockHash=top, responseSchema="binary"
+    )
+    assert isinstance(binary, bytes) and len(binary) == HEADER_SIZE
+
+    r3 = cw.get_block_header_branches(
+        0, lower=[r1["items"][0]["hash"]], upper=[top], limit=5
+    )
+    assert len(r3["items"]) == 5 and r3["next"] is not None
+
+
+def test_payload_mempool_and_peer_endpoints(node):
+    from chainwebpy.chainweb_p2p.block_payload_endpoints import (
+        BlockPayloadEndpoints,
+    )
+    from chainwebpy.chainweb_p2p.mempool_endpoints import MempoolEndpoints
+    from chainwebpy.chainweb_p2p.peer_endpoints import PeerEndpoints
+
+    payload_hashes = [
+        node.data.header(1, h)["payloadHash"] for h in range(20, 30)
+    ]
+    cw = BlockPayloadEndpoints(node.api())
+    batch = cw.get_batch_of_block_payload_with_outputs(1, payload_hashes)
+    assert len(batch) == 10
+    assert all(len(tx) == 2 for p in batch for tx in p["transactions"])
+    single = cw.get_block_payload(1, payload_hashes[0])
+    assert single["payloadHash"] == payload_hashes[0]
+
+    mempool = MempoolEndpoints(node.api())
+    pending = mempool.get_pending_transactions_from_the_mempool(chain=1)
+    keys = pending["hashes"][:2]
+    assert mempool.check_for_pending_transactions_in_the_mempool(
+        1, keys + ["missing"]
+    ) == [True, True, False]
+
+    peers = PeerEndpoints(node.api()).get_cut_network_peer_info(limit=5)
+    assert len(peers["items"]) == 5
+
+
+def test_latency_and_fault_injection(node):
+    from chainwebpy.chainweb_p2p.config_endpoints import ConfigEndpoints
+
+    cw = ConfigEndpoints(node.api())
+    node.configure(fault_rate=1.0)
+    try:
+        with pytest.raises(Exception, match="Status 503"):
+            cw.get_config()
+    finally:
+        node.configure(fault_rate=0.0)
+
+    assert cw.get_config()["chainwebVersion"] == "mainnet01"
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from chainwebpy.singleflight import SingleFlight, SingleFlightTransport
+from chainwebpy.transport import Request, Transport
+
+
+class FakeResponse:
+    status_code = 200
+    text = "{}"
+
+    def __init__(self, value):
+        self.value = value
+
+    def json(self):
+        return self.value
+
+
+class SlowTransport(Transport):
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send(self, request):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return FakeResponse({"url": request.url, "params": request.params})
+
+
+def test_concurrent_identical_requests_share_one_call():
+    from chainwebpy.url import P2PBootstrapAPIEndpoint
+    from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+
+    inner = SlowTransport()
+    cw = CutEndpoints(
+        P2PBootstrapAPIEndpoint(P2PBootstrapAPIEndpoint.TestnetNode.US1),
+        transport=SingleFlightTransport(inner),
+    )
+
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda _: cw.get_current_cut(), range(16)))
+
+    assert inner.calls == 1
+    assert all(r == results[0] for r in results)
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda h: cw.get_current_cut(maxheight=h), range(4)))
+
+    assert inner.calls == 5
+
+
+def test_post_requests_are_not_deduplicated_by_default():
+    inner = SlowTransport(delay=0.01)
+    transport = SingleFlightTransport(inner)
+    request = Request("insert", "POST", "http://node/insert", data="[]")
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: transport.send(request), range(4)))
+
+    assert inner.calls == 4
+
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def run(_):
+        with pytest.raises(RuntimeError):
+            flight.do("k", fail)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(run, range(8)))
+
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", fail)
+    assert len(calls) == 2
+
+
+def test_asyncio_tasks_and_threads_share_calls():
+    inner = SlowTransport(delay=0.1)
+    transport = SingleFlightTransport(inner)
+    request = Request("get_config", "GET", "http://node/config")
+
+    async def main():
+        thread = threading.Thread(target=transport.send, args=(request,))
+        thread.start()
+        await asyncio.sleep(0.01)
+        responses = await asyncio.gather(
+            *(transport.send_async(request) for _ in range(8))
+        )
+        thread.join()
+        return responses
+
+    responses = asyncio.run(main())
+    assert inner.calls == 1
+    assert len(set(map(id, responses))) == 1
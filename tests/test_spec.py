@@ -0,0 +1,121 @@
+import inspect
+
+import pytest
+
+from benchmarks.simnode import HEADER_SIZE, SimulatedNode
+from chainwebpy.chainweb_p2p.block_header_endpoints import (
+    BlockHeaderEndpoints,
+)
+from chainwebpy.spec import EndpointGroup, EndpointSpec
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=100) as node:
+        yield node
+
+
+def test_generated_methods_keep_signature_and_docs():
+    method = BlockHeaderEndpoints.get_block_headers
+    assert list(inspect.signature(method).parameters) == [
+        "self",
+        "chain",
+        "limit",
+        "next",
+        "minheight",
+        "maxheight",
+        "responseSchema",
+        "stream",
+    ]
+    assert method.__qualname__ == "BlockHeaderEndpoints.get_block_headers"
+    assert inspect.getdoc(method).startswith("A page of a collection")
+    assert "get_block_headers" in BlockHeaderEndpoints.specs
+
+    with pytest.raises(ValueError, match="path fields"):
+
+        class Broken(EndpointGroup):
+            get = EndpointSpec("GET", "/chain/{chain}/x")
+
+
+def test_methods_are_closures_with_python_binding(node):
+    method = BlockHeaderEndpoints.get_block_headers_by_hash
+    assert method.__code__.co_filename.endswith("spec.py")
+    assert method.__annotations__["chain"] is int
+
+    cw = BlockHeaderEndpoints(node.api())
+    top = cw.get_block_headers(0, limit=1)["items"][0]["hash"]
+    assert cw.get_block_headers_by_hash(blockHash=top, chain=0)["hash"] == top
+    with pytest.raises(TypeError, match="missing required argument"):
+        cw.get_block_headers_by_hash(0)
+    with pytest.raises(TypeError, match="multiple values"):
+        cw.get_block_headers_by_hash(0, top, chain=0)
+    with pytest.raises(TypeError, match="unexpected keyword argument"):
+        cw.get_block_headers_by_hash(0, top, schema="binary")
+    with pytest.raises(TypeError, match="positional arguments"):
+        cw.get_block_headers_by_hash(0, top, "object", 1)
+
+
+def test_validation_and_trusted_fast_path(node):
+    cw = BlockHeaderEndpoints(node.api())
+    with pytest.raises(TypeError, match="chain must be an integer"):
+        cw.get_block_headers("0")
+    with pytest.raises(ValueError, match="limit must be greater than 0"):
+        cw.get_block_headers(0, limit=-1)
+    with pytest.raises(ValueError, match="responseSchema must be one of"):
+        cw.get_block_headers(0, responseSchema="xml")
+
+    page = cw.get_block_headers(0, limit=3, responseSchema="base64url")
+    assert all(isinstance(h, str) for h in page["items"])
+
+    trusted = BlockHeaderEndpoints(node.api(), validate=False)
+    top = trusted.get_block_headers(0, limit=1)["items"][0]["hash"]
+    binary = trusted.get_block_headers_by_hash(0, top, "binary")
+    assert len(binary) == HEADER_SIZE
+    assert trusted.get_block_headers_by_hash(0, top)["hash"] == top
+
+
+def test_response_kinds(node):
+    from chainwebpy.chainweb_service.mining_endpoints import MiningEndpoints
+    from chainwebpy.chainweb_service.miscellaneous_endpoints import (
+        MiscellaneousEndpoints,
+    )
+
+    assert isinstance(MiscellaneousEndpoints(node.api()).health_check(), str)
+
+    mining = MiningEndpoints(node.api())
+    work = mining.get_mining_work("miner", ["ab" * 32])
+    assert isinstance(work, bytes) and len(work) == 4 + 32 + HEADER_SIZE - 32
+    assert mining.solved_mining_work(work[36:]) is None
+    with pytest.raises(Exception, match="Status 400"):
+        mining.solved_mining_work(b"short")
+
+
+def test_requests_of_the_first_releases():
+    from chainwebpy.chainweb_service.miscellaneous_endpoints import (
+        MiscellaneousEndpoints,
+    )
+    from chainwebpy.transport import Transport
+    from chainwebpy.url import GenericNodeAPIEndpoint
+
+    sent = []
+
+    class Recording(Transport):
+        def call(self, name, method, url, params=None, **kwargs):
+            sent.append((url, params))
+
+    api = GenericNodeAPIEndpoint("http", "127.0.0.1", 1848, "0.0", "x")
+    cw = BlockHeaderEndpoints(api, Recording())
+    cw.get_block_headers_by_hash(3, "abc")
+    cw.get_block_headers(3, limit=5)
+    assert sent == [
+        (
+            api.endpoint + "/chain/3/header/abc",
+            {"chain": 3, "blockHash": "abc"},
+        ),
+        (api.endpoint + "/chain/3/header", {"chain": 3, "limit": 5}),
+    ]
+
+    misc = MiscellaneousEndpoints(api, Recording())
+    with pytest.raises(Exception, match="backupId must be a string") as e:
+        misc.check_the_status_of_a_backup_job(1)
+    assert type(e.value) is Exception
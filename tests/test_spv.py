@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.client import ChainwebClient
+from chainwebpy.header import unb64url
+from chainwebpy.spv import SpvClient, SpvProof
+
+
+def _request_keys(cw, chain, height):
+    block = cw.headers.get_block_headers(chain, minheight=height, limit=1)
+    payload = cw.payloads.get_block_payload_with_outputs(
+        chain, block["items"][0]["payloadHash"]
+    )
+    return [
+        json.loads(unb64url(out))["reqKey"]
+        for _, out in payload["transactions"]
+    ]
+
+
+def test_fetch_cache_and_verify():
+    with SimulatedNode(chains=10, height=30, merkle=True) as node:
+        cw = ChainwebClient(node.api())
+        spv = SpvClient(cw)
+        keys = _request_keys(cw, 0, 11)
+        assert keys
+
+        for target in range(10):
+            spv.add_headers(cw.headers.get_block_headers(target)["items"])
+        requests = [(0, key, target) for key in keys for target in (0, 1, 7)]
+        proofs = spv.proofs(requests)
+        assert spv.misses == len(requests) and len(spv) == len(requests)
+        for (_, key, target), proof in zip(requests, proofs):
+            assert proof.chain == target
+            assert proof.output["reqKey"] == key
+            chain, height = spv.verify(proof)
+            # The proof ends in the first block of the target that depends
+            # on the block of the transaction, one block per hop.
+            assert chain == target and height >= 11
+
+        assert spv.proof(0, keys[0], 7) is proofs[2]
+        assert spv.hits == 1
+
+        # A tampered output changes the root.
+        forged = SpvProof(proofs[2].raw)
+        forged.subject = forged.subject.replace(b'"gas":', b'"gas":1')
+        with pytest.raises(ValueError):
+            spv.verify(forged)
+
+
+def test_verify_unknown_root():
+    with SimulatedNode(chains=10, height=30, merkle=True) as node:
+        cw = ChainwebClient(node.api())
+        spv = SpvClient(cw, cache_size=1)
+        key = _request_keys(cw, 3, 12)[0]
+        proof = spv.proof(3, key, 5)
+        with pytest.raises(ValueError):
+            spv.verify(proof)
+        assert spv.verify(proof, fetch=True)[0] == 5
+        assert spv.verify(proof.raw)[0] == 5
+
+        spv.proof(3, key, 6)
+        assert len(spv) == 1
@@ -0,0 +1,99 @@
+import json
+import threading
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.chainweb_p2p.block_header_endpoints import (
+    BlockHeaderEndpoints,
+)
+from chainwebpy.chainweb_p2p.block_payload_endpoints import (
+    BlockPayloadEndpoints,
+)
+from chainwebpy.chainweb_service.miscellaneous_endpoints import (
+    MiscellaneousEndpoints,
+)
+from chainwebpy.stream import ItemStream, iter_events
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=100) as node:
+        yield node
+
+
+def chunked(document, size):
+    body = json.dumps(document, ensure_ascii=False).encode("utf-8")
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 4096])
+def test_items_across_chunk_boundaries(size):
+    items = [12345, -0.5e3, 'é ✓ "q"', None, True, {"a": [1, {}]}, []]
+    page = {"limit": 7, "items": items, "next": "inclusive:7"}
+    closed = []
+    stream = ItemStream(chunked(page, size), close=lambda: closed.append(1))
+    assert list(stream) == items
+    assert stream.next == "inclusive:7" and stream.limit == 7
+    assert closed == [1]
+
+    assert list(ItemStream(chunked(items, size), None)) == items
+    assert list(ItemStream(chunked({"items": []}, size))) == []
+
+    with pytest.raises(ValueError):
+        list(ItemStream([b'{"items": [1, 2'], None))
+
+
+def test_streamed_endpoints(node):
+    headers = BlockHeaderEndpoints(node.api())
+    page = headers.get_block_headers(2, limit=30, minheight=5)
+    with headers.get_block_headers(
+        2, limit=30, minheight=5, stream=True
+    ) as stream:
+        assert list(stream) == page["items"]
+        assert stream.next == page["next"]
+    with pytest.raises(ValueError, match="stream is not supported"):
+        headers.get_block_headers(2, responseSchema="records", stream=True)
+
+    payloads = BlockPayloadEndpoints(node.api())
+    hashes = [i["payloadHash"] for i in page["items"]]
+    batch = payloads.get_batch_of_block_payload_with_outputs(2, hashes)
+    stream = payloads.get_batch_of_block_payload_with_outputs(
+        2, hashes, stream=True
+    )
+    assert next(stream) == batch[0]
+    stream.close()
+    assert len(batch) == 30
+
+
+def test_blocks_event_stream(node):
+    lines = [b"event:BlockHeader", b'data:{"a": 1}', b"", b": ping", b""]
+    assert list(iter_events(lines)) == [
+        {"event": "BlockHeader", "data": {"a": 1}}
+    ]
+
+    events = MiscellaneousEndpoints(node.api()).blocks_event_stream()
+    threading.Timer(0.2, node.advance).start()
+    event = next(events)
+    events.close()
+    assert event["event"] == "BlockHeader"
+    header = event["data"]["header"]
+    assert header["height"] == node.data.tips[header["chainId"]]
+
+
+def test_blocks_event_stream_is_sent_eagerly(node):
+    from chainwebpy.metrics import MetricsHooks
+    from chainwebpy.transport import Transport
+    from chainwebpy.url import GenericNodeAPIEndpoint
+
+    hooks = MetricsHooks()
+    misc = MiscellaneousEndpoints(node.api(), Transport(hooks=hooks))
+    with misc.blocks_event_stream():
+        pass
+    assert hooks.histogram("blocks_event_stream").count == 1
+
+    unknown = GenericNodeAPIEndpoint(
+        "http", "127.0.0.1", node.port, "0.0", "unknown01"
+    )
+    with pytest.raises(Exception, match="Status 404"):
+        MiscellaneousEndpoints(unknown).blocks_event_stream()
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from benchmarks.simnode import SimulatedNode
+from chainwebpy.chainweb_p2p.cut_endpoints import CutEndpoints
+from chainwebpy.watcher import ChainAdvanced, CutWatcher
+
+
+@pytest.fixture(scope="module")
+def node():
+    with SimulatedNode(chains=10, height=50) as node:
+        yield node
+
+
+class ScriptedCuts(object):
+    def __init__(self, *heights):
+        self.cuts = [
+            {
+                "height": sum(h),
+                "hashes": {
+                    str(c): {"height": x, "hash": f"{c}:{x}"}
+                    for c, x in enumerate(h)
+                },
+            }
+            for h in heights
+        ]
+
+    def get_current_cut(self, maxheight=None):
+        return self.cuts.pop(0)
+
+
+def test_diff_skips_lagging_cuts():
+    watcher = CutWatcher(
+        ScriptedCuts((5, 5), (7, 5), (6, 5), (7, 6)),
+        block_time=0.0,
+        min_interval=0.1,
+        max_interval=1.0,
+    )
+    assert watcher.poll() == []
+    assert watcher.poll() == [ChainAdvanced(0, 7, "0:7", 5, "0:5", 12)]
+    assert watcher.poll() == []
+    assert watcher.interval() == 0.2
+    assert watcher.poll() == [ChainAdvanced(1, 6, "1:6", 5, "1:5", 13)]
+    assert watcher.interval() == 0.1
+
+    watcher.block_time = 30.0
+    assert watcher.interval() == 1.0
+
+
+def test_subscribers_share_one_poll(node):
+    watcher = CutWatcher(
+        CutEndpoints(node.api()), block_time=0.05, min_interval=0.01
+    )
+    seen = []
+    cancel = watcher.subscribe(seen.append)
+    events = watcher.events(timeout=2)
+    while watcher.latest is None:
+        time.sleep(0.001)
+    node.advance(chains=[3])
+    event = next(events)
+    events.close()
+    cancel()
+
+    assert event.chain == 3
+    assert event.height == event.previous_height + 1 == node.data.tips[3]
+    assert seen == [event]
+
+
+def test_resubscribing_never_polls_concurrently():
+    import threading
+
+    class SlowCuts(object):
+        def __init__(self):
+            self.active = self.most = self.calls = 0
+            self.lock = threading.Lock()
+
+        def get_current_cut(self, maxheight=None):
+            with self.lock:
+                self.calls += 1
+                self.active += 1
+                self.most = max(self.most, self.active)
+            time.sleep(0.05)
+            with self.lock:
+                self.active -= 1
+            return {"height": 0, "hashes": {"0": {"height": 0, "hash": "0"}}}
+
+    cuts = SlowCuts()
+    watcher = CutWatcher(cuts, min_interval=0.01, max_interval=0.01)
+    for _ in range(5):
+        cancel = watcher.subscribe(lambda event: None)
+        while cuts.calls == 0:
+            time.sleep(0.001)
+        cancel()
+    assert cuts.most == 1
+    assert not any(
+        t.name == "chainwebpy-cut-watcher" for t in threading.enumerate()
+    )